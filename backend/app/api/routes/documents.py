@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from typing import Literal, Optional
+import logging
+
+from ...models.document_schemas import DocumentDiffResponse, DocumentHistoryResponse, DocumentResponse
+from ...services.document_storage import document_storage
+from ...services.executor import run_blocking
+
+router = APIRouter(prefix="/api/documents", tags=["documents"])
+logger = logging.getLogger(__name__)
+
+DocType = Literal["tos", "privacy"]
+
+
+def _document_response(document: dict, response: Response, if_none_match: Optional[str]):
+    tag = f'"{document["etag"]}"'
+    if if_none_match is not None and tag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": tag})
+    response.headers["ETag"] = tag
+    return DocumentResponse(**document)
+
+
+@router.get("/{profile_id}/{doc_type}", response_model=DocumentResponse)
+async def get_document(
+    profile_id: str,
+    doc_type: DocType,
+    response: Response,
+    profile_version: Optional[int] = None,
+    model: Optional[str] = None,
+    prompt_version: Optional[str] = None,
+    tone: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Return the latest stored document of a profile, optionally restricted to
+    a profile version, model, prompt version or tone. Honours If-None-Match
+    with 304, so repeat views transfer nothing.
+    """
+    document = await run_blocking(
+        document_storage.find, profile_id, doc_type,
+        profile_version=profile_version, model=model, prompt_version=prompt_version, tone=tone
+    )
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No stored {doc_type} document for profile {profile_id}"
+        )
+    return _document_response(document, response, if_none_match)
+
+
+@router.get("/{profile_id}/{doc_type}/history", response_model=DocumentHistoryResponse)
+async def get_document_history(profile_id: str, doc_type: DocType):
+    documents = await run_blocking(document_storage.history, profile_id, doc_type)
+    if not documents:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No stored {doc_type} document for profile {profile_id}"
+        )
+    return DocumentHistoryResponse(profile_id=profile_id, doc_type=doc_type, documents=documents)
+
+
+@router.get("/{profile_id}/{doc_type}/versions/{version}", response_model=DocumentResponse)
+async def get_document_version(
+    profile_id: str,
+    doc_type: DocType,
+    version: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
+    document = await run_blocking(document_storage.find, profile_id, doc_type, version=version)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Version {version} of the {doc_type} document for profile {profile_id} not found"
+        )
+    return _document_response(document, response, if_none_match)
+
+
+@router.get("/{profile_id}/{doc_type}/diff", response_model=DocumentDiffResponse)
+async def diff_documents(
+    profile_id: str,
+    doc_type: DocType,
+    from_version: int = Query(..., alias="from"),
+    to_version: Optional[int] = Query(None, alias="to")
+):
+    """Compare two stored versions section by section; "to" defaults to the latest."""
+    result = await run_blocking(document_storage.diff, profile_id, doc_type, from_version, to_version)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Version not found for the {doc_type} document of profile {profile_id}"
+        )
+    return DocumentDiffResponse(**result)
@@ -0,0 +1,138 @@
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from pydantic import BaseModel
+from typing import List, Optional, Type
+import logging
+from datetime import datetime
+
+from ...models.schemas import FormHistoryResponse
+from ...services.executor import run_blocking
+from ...services.form_storage import form_storage
+from ...services.versioning import VersionConflict, etag, parse_if_match
+
+logger = logging.getLogger(__name__)
+
+def _form_fields(form_data: dict) -> dict:
+    return {
+        "profile_id": form_data["profile_id"],
+        "created_at": datetime.fromisoformat(form_data["created_at"]),
+        "updated_at": datetime.fromisoformat(form_data["updated_at"]),
+        "version": form_data["version"]
+    }
+
+def form_router(
+    form_type: str,
+    label: str,
+    prefix: str,
+    request_model: Type[BaseModel],
+    response_model: Type[BaseModel],
+    list_model: Type[BaseModel]
+) -> APIRouter:
+    """
+    Build the router of one form type under `prefix`, with its save, list,
+    read, history and version routes. `label` names the form in messages
+    ("ToS", "privacy"); the caller adds its generate endpoint to the router.
+    """
+    router = APIRouter(prefix=prefix, tags=[form_type])
+    title = label[0].upper() + label[1:]
+
+    @router.post("/{profile_id}", response_model=response_model, status_code=status.HTTP_201_CREATED)
+    @router.put("/{profile_id}", response_model=response_model)
+    async def save_form(
+        profile_id: str,
+        request: request_model,
+        response: Response,
+        if_match: Optional[str] = Header(None)
+    ):
+        """
+        Save the form of a profile. With an If-Match header carrying the ETag
+        from a previous read, the save fails with 412 if the form has changed since;
+        any If-Match, including "*", fails with 412 when no form is saved yet.
+        """
+        try:
+            form_data = await run_blocking(
+                form_storage.save,
+                form_type, profile_id, request.form.model_dump(), parse_if_match(if_match),
+                must_exist=if_match is not None
+            )
+
+            logger.info("Saved %s form for profile: %s (version %s)", label, profile_id, form_data["version"])
+
+            response.headers["ETag"] = etag(form_data["version"])
+            return response_model(form=request.form, **_form_fields(form_data))
+
+        except VersionConflict as e:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail=f"{title} form for profile {profile_id} has changed (current version {e.current})"
+            ) from e
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e)
+            ) from e
+        except Exception as e:
+            logger.error("Error saving %s form for profile %s: %s", label, profile_id, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save {label} form"
+            ) from e
+
+    @router.get("", response_model=list_model)
+    async def list_forms(profile_id: List[str] = Query(...)):
+        """Return the current forms of the given profiles; profiles without one are left out."""
+        try:
+            forms = await run_blocking(form_storage.read_many, form_type, profile_id)
+            return list_model(forms=[
+                response_model(form=form_data["form"], **_form_fields(form_data)) for form_data in forms.values()
+            ])
+        except Exception as e:
+            logger.error("Error reading %s forms: %s", label, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to read {label} forms"
+            ) from e
+
+    @router.get("/{profile_id}", response_model=response_model)
+    async def get_form(profile_id: str, response: Response):
+        try:
+            form_data = await run_blocking(form_storage.read, form_type, profile_id)
+            if form_data is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"{title} form for profile {profile_id} not found"
+                )
+
+            response.headers["ETag"] = etag(form_data["version"])
+            return response_model(form=form_data["form"], **_form_fields(form_data))
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Error reading %s form for profile %s: %s", label, profile_id, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to read {label} form"
+            ) from e
+
+    @router.get("/{profile_id}/history", response_model=FormHistoryResponse)
+    async def get_form_history(profile_id: str):
+        versions = await run_blocking(form_storage.history, form_type, profile_id)
+        if not versions:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{title} form for profile {profile_id} not found"
+            )
+        return FormHistoryResponse(profile_id=profile_id, versions=versions)
+
+    @router.get("/{profile_id}/versions/{version}", response_model=response_model)
+    async def get_form_version(profile_id: str, version: int, response: Response):
+        form_data = await run_blocking(form_storage.read_version, form_type, profile_id, version)
+        if form_data is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Version {version} of the {label} form for profile {profile_id} not found"
+            )
+        response.headers["ETag"] = etag(form_data["version"])
+        return response_model(form=form_data["form"], **_form_fields(form_data))
+
+    return router
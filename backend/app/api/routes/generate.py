@@ -1,17 +1,20 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.models.schemas import GenerateRequest, GenerateResponse, ConfigResponse
-from app.services.generator import generate_legal_documents
+from app.services.generator import agenerate_legal_documents, stream_legal_documents
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 @router.post("/generate", response_model=GenerateResponse)
 async def generate_documents(request: GenerateRequest):
     try:
         logger.info(f"Generating documents for {request.product_vars.product_name}")
         
-        result = generate_legal_documents(
+        result = await agenerate_legal_documents(
             product_vars=request.product_vars.model_dump(),
             docs=request.docs,
             tone=request.tone,
@@ -24,6 +27,27 @@ async def generate_documents(request: GenerateRequest):
         logger.error(f"Error generating documents: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
+@router.post("/generate/stream")
+async def stream_documents(request: GenerateRequest, stream_tokens: bool = False):
+    """
+    Stream generated sections as Server-Sent Events as soon as each one is done.
+    
+    Set stream_tokens=true to also receive "token" events from inside each section.
+    """
+    logger.info(f"Streaming documents for {request.product_vars.product_name}")
+    
+    return StreamingResponse(
+        stream_legal_documents(
+            product_vars=request.product_vars.model_dump(),
+            docs=request.docs,
+            tone=request.tone,
+            jurisdictions=request.jurisdictions,
+            stream_tokens=stream_tokens
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
 @router.get("/config", response_model=ConfigResponse)
 async def get_config():
     return ConfigResponse()
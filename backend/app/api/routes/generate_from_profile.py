@@ -1,47 +1,48 @@
 from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
 import logging
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
 
-from backend.app.models.profile_schemas import CompanyProfile
-from backend.app.models.schemas import GenerateResponse
-from backend.app.services.profile_storage import profile_storage
-from src.profile_generator import generate_from_profile
+from ...models.profile_schemas import CompanyProfile
+from ...models.job_schemas import JobResponse
+from ...models.schemas import GenerateBatchRequest, GenerateFromProfileRequest, GenerateResponse, RegenerateResponse
+from ...services.profile_storage import profile_storage
+from ...services.document_storage import document_storage
+from ...services.executor import run_blocking
+from ...services.generator import stream_events
+from ...services.job_queue import job_queue
+from src.profile_generator import agenerate_from_profile, aregenerate_from_profile, astream_from_profile
 
 router = APIRouter(prefix="/api", tags=["generate"])
 logger = logging.getLogger(__name__)
 
 
-class GenerateFromProfileRequest(BaseModel):
-    profile_id: str
-    doc_types: list[str]
-    tone: str = "plain"
-
-
 @router.post("/generate-from-profile", response_model=GenerateResponse)
 async def generate_documents_from_profile(request: GenerateFromProfileRequest):
     """
     Generate legal documents from an existing company profile.
     """
     try:
-        profile = profile_storage.read(request.profile_id)
+        entry = await run_blocking(profile_storage.read_versioned, request.profile_id)
         
-        if not profile:
+        if not entry:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Profile {request.profile_id} not found"
             )
+        profile, version = entry
         
         logger.info(f"Generating documents from profile: {profile.profile_name}")
         
-        results = generate_from_profile(
+        results = await agenerate_from_profile(
             profile=profile,
             docs=request.doc_types,
             tone=request.tone
         )
+        await run_blocking(document_storage.save, profile, version, request.tone, results["sections"])
         
         return GenerateResponse(
             tos_md=results.get("tos_md"),
@@ -57,3 +58,94 @@ async def generate_documents_from_profile(request: GenerateFromProfileRequest):
             detail=f"Document generation failed: {str(e)}"
         ) from e
 
+
+
+@router.post("/generate-from-profile/stream")
+async def stream_documents_from_profile(request: GenerateFromProfileRequest, stream_tokens: bool = False):
+    """
+    Stream documents generated from a profile as Server-Sent Events, one
+    section at a time, ending with a "done" event carrying checklist warnings.
+    """
+    entry = await run_blocking(profile_storage.read_versioned, request.profile_id)
+    
+    if not entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {request.profile_id} not found"
+        )
+    profile, version = entry
+    
+    logger.info(f"Streaming documents from profile: {profile.profile_name}")
+    
+    events = astream_from_profile(
+        profile=profile,
+        docs=request.doc_types,
+        tone=request.tone,
+        stream_tokens=stream_tokens
+    )
+
+    async def save(result: dict) -> None:
+        await run_blocking(document_storage.save, profile, version, request.tone, result["sections"])
+
+    return StreamingResponse(
+        stream_events(events, save),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/regenerate-from-profile", response_model=RegenerateResponse)
+async def regenerate_documents_from_profile(request: GenerateFromProfileRequest):
+    """
+    Regenerate documents after a profile update, re-running only the sections
+    whose profile inputs changed since the stored documents were generated.
+    """
+    try:
+        entry = await run_blocking(profile_storage.read_versioned, request.profile_id)
+        
+        if not entry:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Profile {request.profile_id} not found"
+            )
+        profile, version = entry
+        
+        logger.info(f"Regenerating documents from profile: {profile.profile_name}")
+        
+        previous = await run_blocking(document_storage.read, request.profile_id, tone=request.tone)
+        results = await aregenerate_from_profile(
+            profile=profile,
+            previous=previous,
+            docs=request.doc_types,
+            tone=request.tone
+        )
+        await run_blocking(document_storage.save, profile, version, request.tone, results["sections"])
+        
+        return RegenerateResponse(
+            tos_md=results.get("tos_md"),
+            privacy_md=results.get("privacy_md"),
+            regenerated_sections=results["regenerated"]
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error regenerating from profile: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Document regeneration failed: {str(e)}"
+        ) from e
+
+
+@router.post("/generate-batch", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def generate_documents_batch(request: GenerateBatchRequest):
+    """
+    Enqueue document generation for many profiles as one background job.
+    
+    Identical section prompts are generated once across the batch and every
+    section call shares one concurrency limit. Poll /api/jobs/{job_id} for
+    per-profile progress and results.
+    """
+    job = await run_blocking(job_queue.enqueue, "generate_batch", request.model_dump(mode="json"))
+    logger.info(f"Enqueued batch generation for {len(request.profile_ids)} profiles: {job['job_id']}")
+    return JobResponse(**job)
@@ -1,30 +1,27 @@
-from fastapi import APIRouter
+import sys
 from pathlib import Path
+from fastapi import APIRouter
 from app.models.schemas import HealthResponse
-from app.core.config import settings
+from app.services.executor import run_probe
+from app.services.profile_storage import profile_storage
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from src.vectordb import vectorstore_stats
 
 router = APIRouter()
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
-    chroma_db = Path(settings.chroma_dir) / "chroma.sqlite3"
-    exists = chroma_db.exists()
-    
-    chunk_count = None
-    if exists:
-        try:
-            import sqlite3
-            conn = sqlite3.connect(str(chroma_db))
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM embeddings")
-            chunk_count = cursor.fetchone()[0]
-            conn.close()
-        except Exception:
-            pass
+    try:
+        stats = await run_probe(vectorstore_stats)
+    except Exception:
+        stats = {"backend": None, "exists": False, "count": None}
     
     return HealthResponse(
-        status="healthy" if exists else "no_vectorstore",
-        vectorstore_exists=exists,
-        chunk_count=chunk_count
+        status="healthy" if stats["exists"] else "no_vectorstore",
+        vectorstore_exists=stats["exists"],
+        vectorstore_backend=stats["backend"],
+        chunk_count=stats["count"],
+        profile_cache=profile_storage.cache_stats()
     )
-
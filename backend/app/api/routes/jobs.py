@@ -0,0 +1,54 @@
+from fastapi import APIRouter, HTTPException, status
+from pydantic import ValidationError
+import logging
+
+from ...models.job_schemas import JobRequest, JobResponse
+from ...services.job_handlers import JOB_REQUEST_MODELS
+from ...services.executor import run_blocking
+from ...services.job_queue import job_queue
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+logger = logging.getLogger(__name__)
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(request: JobRequest):
+    """
+    Enqueue a generation job. The payload is the request body of the matching
+    endpoint (/api/generate, /api/generate-from-profile, /api/tos/generate,
+    /api/privacy/generate).
+    """
+    try:
+        payload = JOB_REQUEST_MODELS[request.kind](**request.payload)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False)
+        ) from e
+    
+    job = await run_blocking(job_queue.enqueue, request.kind, payload.model_dump(mode="json"))
+    logger.info("Enqueued %s job: %s", request.kind, job["job_id"])
+    return JobResponse(**job)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    job = await run_blocking(job_queue.get, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    return JobResponse(**job)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    job = await run_blocking(job_queue.cancel, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    logger.info("Cancellation requested for job: %s", job_id)
+    return JobResponse(**job)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from typing import Literal, Optional
 import logging
 
 from ...models.profile_schemas import (
@@ -7,17 +8,21 @@ from ...models.profile_schemas import (
     ProfileResponse
 )
 from ...services.profile_storage import profile_storage
+from ...services.document_storage import document_storage
+from ...services.executor import run_blocking
+from ...services.versioning import VersionConflict, etag, parse_if_match
 
 router = APIRouter(prefix="/api/profiles", tags=["profiles"])
 logger = logging.getLogger(__name__)
 
 
 @router.post("", response_model=ProfileResponse, status_code=status.HTTP_201_CREATED)
-async def create_profile(profile: CompanyProfile):
+async def create_profile(profile: CompanyProfile, response: Response):
     try:
-        created_profile = profile_storage.create(profile)
+        created_profile, version = await run_blocking(profile_storage.create, profile)
         logger.info(f"Created profile: {created_profile.profile_id} - {created_profile.profile_name}")
-        return ProfileResponse(profile=created_profile)
+        response.headers["ETag"] = etag(version)
+        return ProfileResponse(profile=created_profile, version=version)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -32,10 +37,30 @@ async def create_profile(profile: CompanyProfile):
 
 
 @router.get("", response_model=ProfileListResponse)
-async def list_profiles():
+async def list_profiles(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    company: Optional[str] = None,
+    jurisdiction: Optional[str] = None,
+    sort: Literal["profile_name", "company_legal_name", "created_at", "updated_at"] = "profile_name",
+    order: Literal["asc", "desc"] = "asc"
+):
+    """
+    List one page of profile summaries (100 by default), optionally filtered
+    by company name prefix and jurisdiction, and sorted. `total` counts every
+    matching profile, so clients can page through them with offset.
+    """
     try:
-        profiles = profile_storage.list_all()
-        return ProfileListResponse(profiles=profiles)
+        profiles, total = await run_blocking(
+            profile_storage.list_summaries,
+            limit=limit,
+            offset=offset,
+            company=company,
+            jurisdiction=jurisdiction,
+            sort=sort,
+            descending=order == "desc"
+        )
+        return ProfileListResponse(profiles=profiles, total=total, limit=limit, offset=offset)
     except Exception as e:
         logger.error(f"Error listing profiles: {e}")
         raise HTTPException(
@@ -45,15 +70,23 @@ async def list_profiles():
 
 
 @router.get("/{profile_id}", response_model=ProfileResponse)
-async def get_profile(profile_id: str):
+async def get_profile(
+    profile_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
     try:
-        profile = profile_storage.read(profile_id)
-        if not profile:
+        entry = await run_blocking(profile_storage.read_versioned, profile_id)
+        if not entry:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Profile {profile_id} not found"
             )
-        return ProfileResponse(profile=profile)
+        profile, version = entry
+        if if_none_match is not None and parse_if_match(if_none_match) == version:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag(version)})
+        response.headers["ETag"] = etag(version)
+        return ProfileResponse(profile=profile, version=version)
     except HTTPException:
         raise
     except Exception as e:
@@ -65,11 +98,28 @@ async def get_profile(profile_id: str):
 
 
 @router.put("/{profile_id}", response_model=ProfileResponse)
-async def update_profile(profile_id: str, profile: CompanyProfile):
+async def update_profile(
+    profile_id: str,
+    profile: CompanyProfile,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """
+    Replace a profile. With an If-Match header carrying the ETag from a previous
+    read, the update fails with 412 if the profile has changed since.
+    """
     try:
-        updated_profile = profile_storage.update(profile_id, profile)
+        updated_profile, version = await run_blocking(
+            profile_storage.update, profile_id, profile, parse_if_match(if_match)
+        )
         logger.info(f"Updated profile: {profile_id} - {updated_profile.profile_name}")
-        return ProfileResponse(profile=updated_profile)
+        response.headers["ETag"] = etag(version)
+        return ProfileResponse(profile=updated_profile, version=version)
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Profile {profile_id} has changed (current version {e.current})"
+        ) from e
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -86,12 +136,13 @@ async def update_profile(profile_id: str, profile: CompanyProfile):
 @router.delete("/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_profile(profile_id: str):
     try:
-        deleted = profile_storage.delete(profile_id)
+        deleted = await run_blocking(profile_storage.delete, profile_id)
         if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Profile {profile_id} not found"
             )
+        await run_blocking(document_storage.delete, profile_id)
         logger.info(f"Deleted profile: {profile_id}")
     except HTTPException:
         raise
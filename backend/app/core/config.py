@@ -9,6 +9,12 @@ class Settings(BaseSettings):
     chroma_dir: str = "../storage/vectorstore"
     csv_path: str = "../data/saas_links.csv"
     cors_origins: str = "http://localhost:5173,http://localhost:3000"
+    blocking_workers: int = 8
+    job_db_path: str = "jobs.db"
+    job_workers: int = 2
+    job_stale_after: float = 60.0
+    profile_db_path: str = "profiles.db"
+    profile_cache_size: int = 1024
     
     @property
     def cors_origins_list(self) -> List[str]:
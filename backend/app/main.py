@@ -3,19 +3,32 @@ FastAPI backend for Legal Docs Generator.
 
 Provides REST API endpoints for generating legal documents using RAG.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import generate, health, profiles, generate_from_profile, privacy, tos
+from app.api.routes import generate, health, profiles, generate_from_profile, privacy, tos, jobs, documents
 from app.core.config import settings
+from app.services.executor import shutdown_executor
+from app.services.job_handlers import register_handlers
+from app.services.job_queue import job_queue
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    register_handlers(job_queue)
+    job_queue.start()
+    yield
+    job_queue.stop()
+    shutdown_executor()
+
 app = FastAPI(
     title="Legal Docs Generator API",
     description="RAG-powered legal document generation API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -32,6 +45,8 @@ app.include_router(profiles.router, tags=["profiles"])
 app.include_router(generate_from_profile.router, tags=["generate"])
 app.include_router(privacy.router, tags=["privacy"])
 app.include_router(tos.router, tags=["tos"])
+app.include_router(jobs.router, tags=["jobs"])
+app.include_router(documents.router, tags=["documents"])
 
 @app.get("/")
 async def root():
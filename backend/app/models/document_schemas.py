@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import datetime
+
+class DocumentSummary(BaseModel):
+    profile_id: str
+    doc_type: str
+    version: int
+    profile_version: int = Field(..., description="Version of the profile the document was generated from")
+    model: str
+    prompt_version: str
+    tone: str
+    generated_at: datetime
+    sections: List[str]
+
+class DocumentResponse(DocumentSummary):
+    markdown: str
+
+class DocumentHistoryResponse(BaseModel):
+    profile_id: str
+    doc_type: str
+    documents: List[DocumentSummary]
+
+class SectionDiff(BaseModel):
+    section: str
+    status: Literal["unchanged", "changed", "added", "removed"]
+    before: Optional[str] = None
+    after: Optional[str] = None
+    diff: Optional[str] = Field(None, description="Unified diff of a changed section")
+
+class DocumentDiffResponse(BaseModel):
+    profile_id: str
+    doc_type: str
+    from_version: int
+    to_version: int
+    sections: List[SectionDiff]
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Literal, Optional
+from datetime import datetime
+
+JobKind = Literal["generate", "generate_from_profile", "generate_batch", "tos", "privacy"]
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+class JobRequest(BaseModel):
+    kind: JobKind
+    payload: Dict[str, Any] = Field(..., description="Request body of the matching generation endpoint")
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: JobStatus
+    progress: Dict[str, Any] = Field(default_factory=dict, description="Per-document section progress")
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: datetime
+    updated_at: datetime
@@ -57,10 +57,15 @@ class PrivacyFormResponse(BaseModel):
     form: PrivacyForm
     profile_id: str
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    version: int = 1
+
+class PrivacyFormListResponse(BaseModel):
+    forms: List[PrivacyFormResponse]
 
 class PrivacyGenerateRequest(BaseModel):
     profile_id: str
-    form: PrivacyForm
+    form: Optional[PrivacyForm] = Field(None, description="Form answers; defaults to the profile's saved form")
 
 class PrivacyGenerateResponse(BaseModel):
     markdown: str
@@ -166,10 +166,23 @@ class CompanyProfile(BaseModel):
     export_controls: Optional[ExportControls] = None
 
 
+class ProfileSummary(BaseModel):
+    profile_id: str
+    profile_name: str
+    company_legal_name: str
+    jurisdictions: list[str] = []
+    created_at: str
+    updated_at: str
+
+
 class ProfileListResponse(BaseModel):
-    profiles: list[dict[str, str]]
+    profiles: list[ProfileSummary]
+    total: int
+    limit: int
+    offset: int = 0
 
 
 class ProfileResponse(BaseModel):
     profile: CompanyProfile
+    version: Optional[int] = None
 
@@ -1,4 +1,5 @@
-from typing import List, Literal, Dict, Optional
+from datetime import datetime
+from typing import Any, List, Literal, Dict, Optional
 from pydantic import BaseModel, Field, EmailStr
 
 Jurisdiction = Literal["US", "EU", "UK", "CA", "AU", "IL", "Other"]
@@ -20,15 +21,38 @@ class GenerateRequest(BaseModel):
     tone: Tone = "plain"
     jurisdictions: List[Jurisdiction] = Field(default_factory=lambda: ["US", "EU"])
 
+class GenerateFromProfileRequest(BaseModel):
+    profile_id: str
+    doc_types: list[str]
+    tone: str = "plain"
+
+class GenerateBatchRequest(BaseModel):
+    profile_ids: List[str] = Field(..., min_length=1)
+    doc_types: list[str]
+    tone: str = "plain"
+
 class GenerateResponse(BaseModel):
     tos_md: Optional[str] = None
     privacy_md: Optional[str] = None
     warnings: Dict[str, List[str]] = Field(default_factory=dict)
 
+class RegenerateResponse(GenerateResponse):
+    regenerated_sections: Dict[str, List[str]] = Field(default_factory=dict)
+
+class FormVersion(BaseModel):
+    version: int
+    saved_at: datetime
+
+class FormHistoryResponse(BaseModel):
+    profile_id: str
+    versions: List[FormVersion]
+
 class HealthResponse(BaseModel):
     status: str
     vectorstore_exists: bool
+    vectorstore_backend: Optional[str] = None
     chunk_count: Optional[int] = None
+    profile_cache: Optional[Dict[str, Any]] = None
 
 class ConfigResponse(BaseModel):
     jurisdictions: List[str] = ["US", "EU", "UK", "CA", "AU", "IL", "Other"]
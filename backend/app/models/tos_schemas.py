@@ -39,10 +39,15 @@ class ToSFormResponse(BaseModel):
     form: ToSForm
     profile_id: str
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    version: int = 1
+
+class ToSFormListResponse(BaseModel):
+    forms: List[ToSFormResponse]
 
 class ToSGenerateRequest(BaseModel):
     profile_id: str
-    form: ToSForm
+    form: Optional[ToSForm] = Field(None, description="Form answers; defaults to the profile's saved form")
 
 class ToSGenerateResponse(BaseModel):
     markdown: str
@@ -0,0 +1,414 @@
+"""
+Generated document storage, kept in the profile database.
+
+Each generated document is stored under (profile, doc type, profile version,
+model, prompt version, tone), numbered per profile and doc type so earlier
+documents stay readable. A document is its ordered list of section names and
+content hashes. Section bodies and profile snapshots live once per hash,
+zlib-compressed, in document_blobs. A section that did not change between
+versions therefore costs no storage, and a diff can tell unchanged sections
+apart without decompressing them. Documents are deleted with their profile,
+and a blob is deleted once no document references it.
+
+The latest document generated with the current model and prompt for a tone,
+with the profile snapshot it came from, feeds incremental regeneration.
+"""
+import difflib
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from ..models.profile_schemas import CompanyProfile
+from .database import transaction
+from .profile_storage import ProfileStorage, profile_storage
+from src.chains import PROMPT_VERSION
+from src.config import OPENAI_MODEL
+from src.generator import assemble_document
+from src.profile_generator import DOC_SPECS
+
+_BLOB_CACHE_SIZE = 2048
+_MAX_PARAMS = 900
+
+_UNREFERENCED = (
+    "NOT EXISTS (SELECT 1 FROM document_sections s WHERE s.hash = document_blobs.hash)"
+    " AND NOT EXISTS (SELECT 1 FROM documents d WHERE d.profile_hash = document_blobs.hash)"
+)
+
+_SELECT_DOCUMENT = (
+    "SELECT document_id, profile_id, doc_type, version, profile_version, model, prompt_version,"
+    " tone, effective_date, profile_hash, generated_at FROM documents"
+)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class DocumentStorage:
+    def __init__(self, profiles: ProfileStorage):
+        self.profiles = profiles
+        self._blob_cache: OrderedDict[str, str] = OrderedDict()
+        self._blob_lock = threading.Lock()
+        conn = profiles.conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " document_id INTEGER PRIMARY KEY,"
+            " profile_id TEXT NOT NULL,"
+            " doc_type TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " profile_version INTEGER NOT NULL,"
+            " model TEXT NOT NULL,"
+            " prompt_version TEXT NOT NULL,"
+            " tone TEXT NOT NULL,"
+            " effective_date TEXT NOT NULL,"
+            " profile_hash TEXT NOT NULL,"
+            " generated_at TEXT NOT NULL,"
+            " UNIQUE (profile_id, doc_type, version),"
+            " UNIQUE (profile_id, doc_type, profile_version, model, prompt_version, tone))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_sections ("
+            " document_id INTEGER NOT NULL,"
+            " position INTEGER NOT NULL,"
+            " section TEXT NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " PRIMARY KEY (document_id, position)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_document_sections_hash ON document_sections(hash)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_profile_hash ON documents(profile_hash)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_blobs ("
+            " hash TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL) WITHOUT ROWID"
+        )
+        # Recreated so databases made before the trigger pruned blobs get the
+        # current definition, and cleared of the blobs orphaned until then.
+        with transaction(conn):
+            conn.execute(f"DELETE FROM document_blobs WHERE {_UNREFERENCED}")
+            conn.execute("DROP TRIGGER IF EXISTS delete_profile_documents")
+            conn.execute(
+                "CREATE TRIGGER delete_profile_documents AFTER DELETE ON profiles BEGIN"
+                " DELETE FROM document_blobs WHERE hash IN"
+                " (SELECT s.hash FROM document_sections s JOIN documents d ON d.document_id = s.document_id"
+                " WHERE d.profile_id = old.profile_id"
+                " UNION SELECT profile_hash FROM documents WHERE profile_id = old.profile_id)"
+                " AND NOT EXISTS (SELECT 1 FROM document_sections s JOIN documents d ON d.document_id = s.document_id"
+                " WHERE s.hash = document_blobs.hash AND d.profile_id != old.profile_id)"
+                " AND NOT EXISTS (SELECT 1 FROM documents d"
+                " WHERE d.profile_hash = document_blobs.hash AND d.profile_id != old.profile_id);"
+                " DELETE FROM document_sections WHERE document_id IN"
+                " (SELECT document_id FROM documents WHERE profile_id = old.profile_id);"
+                " DELETE FROM documents WHERE profile_id = old.profile_id;"
+                " END"
+            )
+
+    def _put_blob(self, conn: sqlite3.Connection, text: str) -> str:
+        digest = _digest(text)
+        conn.execute(
+            "INSERT OR IGNORE INTO document_blobs (hash, data) VALUES (?, ?)",
+            (digest, zlib.compress(text.encode('utf-8')))
+        )
+        return digest
+
+    def _prune(self, conn: sqlite3.Connection, hashes: Iterable[str]) -> None:
+        """Delete those of the given blobs that no document references any more."""
+        hashes = list(dict.fromkeys(hashes))
+        for start in range(0, len(hashes), _MAX_PARAMS):
+            batch = hashes[start:start + _MAX_PARAMS]
+            conn.execute(
+                f"DELETE FROM document_blobs WHERE hash IN ({', '.join('?' * len(batch))}) AND {_UNREFERENCED}",
+                batch
+            )
+
+    def _get_blobs(self, hashes: list[str]) -> dict[str, str]:
+        """Return the text of each hash; blobs never change, so decoded text is cached by hash."""
+        texts, missing = {}, []
+        with self._blob_lock:
+            for digest in dict.fromkeys(hashes):
+                if digest in self._blob_cache:
+                    self._blob_cache.move_to_end(digest)
+                    texts[digest] = self._blob_cache[digest]
+                else:
+                    missing.append(digest)
+        loaded = {}
+        for start in range(0, len(missing), _MAX_PARAMS):
+            batch = missing[start:start + _MAX_PARAMS]
+            rows = self.profiles.conn().execute(
+                f"SELECT hash, data FROM document_blobs WHERE hash IN ({', '.join('?' * len(batch))})",
+                batch
+            ).fetchall()
+            loaded.update((row["hash"], zlib.decompress(row["data"]).decode('utf-8')) for row in rows)
+        if loaded:
+            texts.update(loaded)
+            with self._blob_lock:
+                self._blob_cache.update(loaded)
+                while len(self._blob_cache) > _BLOB_CACHE_SIZE:
+                    self._blob_cache.popitem(last=False)
+        return texts
+
+    def save(
+        self,
+        profile: CompanyProfile,
+        profile_version: int,
+        tone: str,
+        sections: dict[str, dict[str, str]],
+        model: str = OPENAI_MODEL,
+        prompt_version: str = PROMPT_VERSION
+    ) -> dict[str, int]:
+        """
+        Store generated documents and return their version per doc type.
+
+        Saving a document again under the same key replaces it with a new
+        version, unless its sections are unchanged; blobs only the replaced
+        document used are deleted.
+
+        Args:
+            profile_version: Version of the profile the documents were generated from
+            sections: Per doc type, section name to markdown body, in document order
+        """
+        snapshot = json.dumps(profile.model_dump(mode='json'), ensure_ascii=False, sort_keys=True)
+        effective_date = profile.organization.effective_date.isoformat()
+        now = datetime.now().isoformat()
+        versions = {}
+
+        with transaction(self.profiles.conn()) as conn:
+            profile_hash = self._put_blob(conn, snapshot)
+            replaced = {profile_hash}
+            for doc_type, doc_sections in sections.items():
+                entries = [(name, self._put_blob(conn, body)) for name, body in doc_sections.items()]
+                key = (profile.profile_id, doc_type, profile_version, model, prompt_version, tone)
+                row = conn.execute(
+                    "SELECT document_id, version, profile_hash FROM documents WHERE profile_id = ? AND doc_type = ?"
+                    " AND profile_version = ? AND model = ? AND prompt_version = ? AND tone = ?",
+                    key
+                ).fetchone()
+                if row is not None:
+                    stored = conn.execute(
+                        "SELECT section, hash FROM document_sections WHERE document_id = ? ORDER BY position",
+                        (row["document_id"],)
+                    ).fetchall()
+                    if row["profile_hash"] == profile_hash and [tuple(entry) for entry in stored] == entries:
+                        versions[doc_type] = row["version"]
+                        continue
+                    conn.execute("DELETE FROM document_sections WHERE document_id = ?", (row["document_id"],))
+                    conn.execute("DELETE FROM documents WHERE document_id = ?", (row["document_id"],))
+                    replaced.add(row["profile_hash"])
+                    replaced.update(digest for _, digest in stored)
+
+                version = conn.execute(
+                    "SELECT COALESCE(MAX(version), 0) + 1 FROM documents WHERE profile_id = ? AND doc_type = ?",
+                    (profile.profile_id, doc_type)
+                ).fetchone()[0]
+                document_id = conn.execute(
+                    "INSERT INTO documents (profile_id, doc_type, version, profile_version, model, prompt_version,"
+                    " tone, effective_date, profile_hash, generated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key[:2], version, *key[2:], effective_date, profile_hash, now)
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO document_sections (document_id, position, section, hash) VALUES (?, ?, ?, ?)",
+                    [(document_id, position, name, digest) for position, (name, digest) in enumerate(entries)]
+                )
+                versions[doc_type] = version
+            self._prune(conn, replaced)
+
+        return versions
+
+    def _sections(self, document_id: int) -> list[tuple[str, str]]:
+        rows = self.profiles.conn().execute(
+            "SELECT section, hash FROM document_sections WHERE document_id = ? ORDER BY position",
+            (document_id,)
+        ).fetchall()
+        return [(row["section"], row["hash"]) for row in rows]
+
+    def _describe(self, row: sqlite3.Row, sections: list[tuple[str, str]]) -> dict[str, Any]:
+        return {
+            "profile_id": row["profile_id"],
+            "doc_type": row["doc_type"],
+            "version": row["version"],
+            "profile_version": row["profile_version"],
+            "model": row["model"],
+            "prompt_version": row["prompt_version"],
+            "tone": row["tone"],
+            "generated_at": row["generated_at"],
+            "sections": [name for name, _ in sections],
+            "etag": _digest(row["profile_hash"] + "".join(digest for _, digest in sections))[:32]
+        }
+
+    def _find_row(
+        self,
+        profile_id: str,
+        doc_type: str,
+        **key: Any
+    ) -> Optional[sqlite3.Row]:
+        where = ["profile_id = ?", "doc_type = ?"]
+        params: list[Any] = [profile_id, doc_type]
+        for column, value in key.items():
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        return self.profiles.conn().execute(
+            f"{_SELECT_DOCUMENT} WHERE {' AND '.join(where)} ORDER BY version DESC LIMIT 1", params
+        ).fetchone()
+
+    def find(
+        self,
+        profile_id: str,
+        doc_type: str,
+        version: Optional[int] = None,
+        profile_version: Optional[int] = None,
+        model: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        tone: Optional[str] = None,
+        with_markdown: bool = True
+    ) -> Optional[dict[str, Any]]:
+        """
+        Return the latest stored document matching the given key fields, or None.
+
+        The result carries the document's metadata, section names, a content
+        ETag and, with with_markdown, the assembled markdown.
+        """
+        row = self._find_row(
+            profile_id, doc_type,
+            version=version, profile_version=profile_version, model=model, prompt_version=prompt_version, tone=tone
+        )
+        if row is None:
+            return None
+        sections = self._sections(row["document_id"])
+        document = self._describe(row, sections)
+        if with_markdown:
+            texts = self._get_blobs([digest for _, digest in sections])
+            document["markdown"] = assemble_document(
+                DOC_SPECS[doc_type][0],
+                row["effective_date"],
+                [name for name, _ in sections],
+                [texts[digest] for _, digest in sections]
+            )
+        return document
+
+    def history(self, profile_id: str, doc_type: str) -> list[dict[str, Any]]:
+        """Return the metadata of every stored version of a document, newest first."""
+        rows = self.profiles.conn().execute(
+            f"{_SELECT_DOCUMENT} WHERE profile_id = ? AND doc_type = ? ORDER BY version DESC",
+            (profile_id, doc_type)
+        ).fetchall()
+        return [self._describe(row, self._sections(row["document_id"])) for row in rows]
+
+    def diff(
+        self,
+        profile_id: str,
+        doc_type: str,
+        from_version: int,
+        to_version: Optional[int] = None
+    ) -> Optional[dict[str, Any]]:
+        """
+        Compare two versions of a document section by section (to_version
+        defaults to the latest). Unchanged sections are recognised by hash and
+        returned without bodies. Returns None if either version is missing.
+        """
+        before = self._find_row(profile_id, doc_type, version=from_version)
+        after = self._find_row(profile_id, doc_type, version=to_version)
+        if before is None or after is None:
+            return None
+        old = dict(self._sections(before["document_id"]))
+        new = dict(self._sections(after["document_id"]))
+        changed = [name for name in {**new, **old} if old.get(name) != new.get(name)]
+        texts = self._get_blobs([digest for name in changed for digest in (old.get(name), new.get(name)) if digest])
+
+        sections = []
+        for name in list(new) + [name for name in old if name not in new]:
+            old_hash, new_hash = old.get(name), new.get(name)
+            entry: dict[str, Any] = {"section": name}
+            if old_hash == new_hash:
+                entry["status"] = "unchanged"
+            elif old_hash is None:
+                entry.update(status="added", after=texts[new_hash])
+            elif new_hash is None:
+                entry.update(status="removed", before=texts[old_hash])
+            else:
+                entry.update(
+                    status="changed",
+                    before=texts[old_hash],
+                    after=texts[new_hash],
+                    diff="\n".join(difflib.unified_diff(
+                        texts[old_hash].splitlines(),
+                        texts[new_hash].splitlines(),
+                        fromfile=f"v{before['version']}",
+                        tofile=f"v{after['version']}",
+                        lineterm=""
+                    ))
+                )
+            sections.append(entry)
+
+        return {
+            "profile_id": profile_id,
+            "doc_type": doc_type,
+            "from_version": before["version"],
+            "to_version": after["version"],
+            "sections": sections
+        }
+
+    def read(
+        self,
+        profile_id: str,
+        tone: Optional[str] = None,
+        model: str = OPENAI_MODEL,
+        prompt_version: str = PROMPT_VERSION
+    ) -> dict[str, dict]:
+        """
+        Return {doc_type: {"profile": CompanyProfile, "sections": {...}}} for the
+        latest documents of a profile generated with this model and prompt,
+        skipping those generated with another tone.
+        """
+        where = ["profile_id = ?", "model = ?", "prompt_version = ?"]
+        params: list[Any] = [profile_id, model, prompt_version]
+        if tone is not None:
+            where.append("tone = ?")
+            params.append(tone)
+        rows = self.profiles.conn().execute(
+            f"{_SELECT_DOCUMENT} WHERE {' AND '.join(where)} ORDER BY version DESC", params
+        ).fetchall()
+
+        latest = {}
+        for row in rows:
+            latest.setdefault(row["doc_type"], row)
+        sections = {doc_type: self._sections(row["document_id"]) for doc_type, row in latest.items()}
+        texts = self._get_blobs(
+            [row["profile_hash"] for row in latest.values()]
+            + [digest for entries in sections.values() for _, digest in entries]
+        )
+        return {
+            doc_type: {
+                "profile": CompanyProfile(**json.loads(texts[row["profile_hash"]])),
+                "sections": {name: texts[digest] for name, digest in sections[doc_type]}
+            }
+            for doc_type, row in latest.items()
+        }
+
+    def delete(self, profile_id: str) -> bool:
+        """Delete a profile's documents and any blobs no longer referenced."""
+        with transaction(self.profiles.conn()) as conn:
+            hashes = [row[0] for row in conn.execute(
+                "SELECT s.hash FROM document_sections s JOIN documents d ON d.document_id = s.document_id"
+                " WHERE d.profile_id = ? UNION SELECT profile_hash FROM documents WHERE profile_id = ?",
+                (profile_id, profile_id)
+            )]
+            conn.execute(
+                "DELETE FROM document_sections WHERE document_id IN"
+                " (SELECT document_id FROM documents WHERE profile_id = ?)",
+                (profile_id,)
+            )
+            deleted = conn.execute("DELETE FROM documents WHERE profile_id = ?", (profile_id,)).rowcount
+            self._prune(conn, hashes)
+        return bool(deleted)
+
+
+document_storage = DocumentStorage(profile_storage)
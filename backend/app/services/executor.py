@@ -0,0 +1,39 @@
+"""
+Bounded thread pools for blocking work called from async routes.
+
+Short blocking calls (SQLite reads and writes, file I/O) run on the shared
+pool instead of on the event loop. Generation does not run here: routes use
+the async generators, and background jobs have their own workers. Health
+checks run on a separate small pool, so they answer even when the shared
+pool is saturated.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from ..core.config import settings
+
+T = TypeVar("T")
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.blocking_workers,
+    thread_name_prefix="blocking"
+)
+_probe_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="probe")
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+async def run_probe(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a short health or status read on its own pool, never queued behind other blocking work."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_probe_executor, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executor() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
+    _probe_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,298 @@
+"""
+ToS and privacy questionnaire storage, kept in the profile database.
+
+Every save appends a new version to form_versions and moves the forms row,
+one per (profile, form type), to point at it, so earlier answers stay
+readable. Forms are deleted with their profile. Because profiles and forms
+share one database, a generation job loads a profile and its saved form in
+a single indexed query, and forms of many profiles are read in one query.
+Forms from the old {form_type}_forms/{profile_id}.json layout are imported
+with:
+
+    python -m app.services.form_storage import tos tos_forms/
+"""
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from pydantic import BaseModel
+
+from ..models.privacy_schemas import PrivacyForm
+from ..models.profile_schemas import CompanyProfile
+from ..models.tos_schemas import ToSForm
+from .database import transaction
+from .profile_storage import ProfileStorage, profile_storage
+from .versioning import VersionConflict
+
+logger = logging.getLogger(__name__)
+
+FORM_MODELS: dict[str, type[BaseModel]] = {"tos": ToSForm, "privacy": PrivacyForm}
+FORM_TYPES = tuple(FORM_MODELS)
+
+# SQLite builds before 3.32 accept at most 999 parameters per statement.
+_MAX_PARAMS = 900
+
+_SELECT_FORM = (
+    "SELECT f.profile_id, f.version, f.created_at, f.updated_at, v.data"
+    " FROM forms f JOIN form_versions v"
+    " ON v.profile_id = f.profile_id AND v.form_type = f.form_type AND v.version = f.version"
+)
+
+
+def _form_data(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "form": json.loads(row["data"]),
+        "profile_id": row["profile_id"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+        "version": row["version"]
+    }
+
+
+class FormStorage:
+    def __init__(self, profiles: ProfileStorage):
+        self.profiles = profiles
+        conn = profiles.conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS forms ("
+            " profile_id TEXT NOT NULL,"
+            " form_type TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " created_at TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL,"
+            " PRIMARY KEY (profile_id, form_type)) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS form_versions ("
+            " profile_id TEXT NOT NULL,"
+            " form_type TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " data TEXT NOT NULL,"
+            " saved_at TEXT NOT NULL,"
+            " PRIMARY KEY (profile_id, form_type, version)) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS delete_profile_forms AFTER DELETE ON profiles BEGIN"
+            " DELETE FROM forms WHERE profile_id = old.profile_id;"
+            " DELETE FROM form_versions WHERE profile_id = old.profile_id;"
+            " END"
+        )
+
+    def _check_type(self, form_type: str) -> None:
+        if form_type not in FORM_TYPES:
+            raise ValueError(f"Unknown form type {form_type!r}; expected one of {', '.join(FORM_TYPES)}")
+
+    def read(self, form_type: str, profile_id: str) -> Optional[dict[str, Any]]:
+        """Return {"form", "profile_id", "created_at", "updated_at", "version"}, or None."""
+        self._check_type(form_type)
+        row = self.profiles.conn().execute(
+            f"{_SELECT_FORM} WHERE f.profile_id = ? AND f.form_type = ?", (profile_id, form_type)
+        ).fetchone()
+        return _form_data(row) if row else None
+
+    def read_version(self, form_type: str, profile_id: str, version: int) -> Optional[dict[str, Any]]:
+        """Return one earlier version of a form, shaped like read(), or None."""
+        self._check_type(form_type)
+        row = self.profiles.conn().execute(
+            "SELECT v.profile_id, v.version, f.created_at, v.saved_at AS updated_at, v.data"
+            " FROM form_versions v JOIN forms f"
+            " ON f.profile_id = v.profile_id AND f.form_type = v.form_type"
+            " WHERE v.profile_id = ? AND v.form_type = ? AND v.version = ?",
+            (profile_id, form_type, version)
+        ).fetchone()
+        return _form_data(row) if row else None
+
+    def history(self, form_type: str, profile_id: str) -> list[dict[str, Any]]:
+        """Return [{"version", "saved_at"}] for every stored version of a form, newest first."""
+        self._check_type(form_type)
+        rows = self.profiles.conn().execute(
+            "SELECT version, saved_at FROM form_versions"
+            " WHERE profile_id = ? AND form_type = ? ORDER BY version DESC",
+            (profile_id, form_type)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def read_many(self, form_type: str, profile_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Return the current forms of several profiles, keyed by profile ID; profiles without one are left out."""
+        self._check_type(form_type)
+        ids = list(dict.fromkeys(profile_ids))
+        conn = self.profiles.conn()
+        forms = {}
+        for start in range(0, len(ids), _MAX_PARAMS):
+            batch = ids[start:start + _MAX_PARAMS]
+            rows = conn.execute(
+                f"{_SELECT_FORM} WHERE f.form_type = ? AND f.profile_id IN ({', '.join('?' * len(batch))})",
+                (form_type, *batch)
+            ).fetchall()
+            forms.update((row["profile_id"], _form_data(row)) for row in rows)
+        return forms
+
+    def read_with_profile(
+        self,
+        form_type: str,
+        profile_id: str
+    ) -> Optional[tuple[CompanyProfile, Optional[dict[str, Any]]]]:
+        """
+        Return a profile and its current form (None if it has no saved form)
+        from one query, or None if the profile does not exist.
+        """
+        self._check_type(form_type)
+        row = self.profiles.conn().execute(
+            "SELECT p.data AS profile, p.version AS profile_version, p.created_at AS profile_created_at,"
+            " f.profile_id, f.version, f.created_at, f.updated_at, v.data"
+            " FROM profiles p"
+            " LEFT JOIN forms f ON f.profile_id = p.profile_id AND f.form_type = ?"
+            " LEFT JOIN form_versions v"
+            " ON v.profile_id = f.profile_id AND v.form_type = f.form_type AND v.version = f.version"
+            " WHERE p.profile_id = ?",
+            (form_type, profile_id)
+        ).fetchone()
+        if row is None:
+            return None
+        profile = self.profiles.load(profile_id, row["profile"], row["profile_version"], row["profile_created_at"])
+        return profile, (_form_data(row) if row["data"] is not None else None)
+
+    def read_for_generation(
+        self,
+        form_type: str,
+        profile_id: str,
+        form: Optional[BaseModel] = None
+    ) -> tuple[CompanyProfile, BaseModel]:
+        """
+        Return a profile and the form answers to generate from: the given form,
+        or else the profile's saved form, loaded together with the profile.
+
+        Raises:
+            ValueError: If the profile does not exist, or no form is given and none is saved
+        """
+        if form is not None:
+            profile = self.profiles.read(profile_id)
+            if not profile:
+                raise ValueError(f"Profile {profile_id} not found")
+            return profile, form
+
+        entry = self.read_with_profile(form_type, profile_id)
+        if entry is None:
+            raise ValueError(f"Profile {profile_id} not found")
+        profile, form_data = entry
+        if form_data is None:
+            raise ValueError(f"No saved {form_type} form for profile {profile_id}")
+        return profile, FORM_MODELS[form_type](**form_data["form"])
+
+    def _append(
+        self,
+        conn: sqlite3.Connection,
+        form_type: str,
+        profile_id: str,
+        form: dict[str, Any],
+        version: int,
+        created_at: str,
+        saved_at: str
+    ) -> None:
+        conn.execute(
+            "INSERT INTO form_versions (profile_id, form_type, version, data, saved_at) VALUES (?, ?, ?, ?, ?)",
+            (profile_id, form_type, version, json.dumps(form, ensure_ascii=False), saved_at)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO forms (profile_id, form_type, version, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (profile_id, form_type, version, created_at, saved_at)
+        )
+
+    def save(
+        self,
+        form_type: str,
+        profile_id: str,
+        form: dict[str, Any],
+        expected_version: Optional[int] = None,
+        must_exist: bool = False
+    ) -> dict[str, Any]:
+        """
+        Save a new version of a profile's form and return it shaped like read().
+
+        Args:
+            expected_version: Version the caller last read; 0 requires that no
+                form exists yet, None skips the check
+            must_exist: Fail unless the profile already has a form of this
+                type, as any If-Match header (including "*") requires
+
+        Raises:
+            ValueError: If the profile does not exist
+            VersionConflict: If expected_version does not match the stored form
+        """
+        self._check_type(form_type)
+        now = datetime.now().isoformat()
+
+        with transaction(self.profiles.conn()) as conn:
+            if conn.execute("SELECT 1 FROM profiles WHERE profile_id = ?", (profile_id,)).fetchone() is None:
+                raise ValueError(f"Profile with ID {profile_id} not found")
+            row = conn.execute(
+                "SELECT version, created_at FROM forms WHERE profile_id = ? AND form_type = ?",
+                (profile_id, form_type)
+            ).fetchone()
+            current_version = row["version"] if row else 0
+            if must_exist and row is None:
+                raise VersionConflict(None)
+            if expected_version is not None and expected_version != current_version:
+                raise VersionConflict(current_version or None)
+            created_at = row["created_at"] if row else now
+            self._append(conn, form_type, profile_id, form, current_version + 1, created_at, now)
+
+        return {
+            "form": form,
+            "profile_id": profile_id,
+            "created_at": created_at,
+            "updated_at": now,
+            "version": current_version + 1
+        }
+
+    def import_dir(self, form_type: str, directory: str) -> tuple[int, int]:
+        """
+        Import forms from a directory of {profile_id}.json files as version 1,
+        skipping profiles that already have a form of this type or do not exist.
+
+        Returns:
+            (imported, skipped)
+        """
+        self._check_type(form_type)
+        imported = skipped = 0
+        for path in sorted(Path(directory).glob("*.json")):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                profile_id = data.get("profile_id") or path.stem
+                with transaction(self.profiles.conn()) as conn:
+                    if conn.execute("SELECT 1 FROM profiles WHERE profile_id = ?", (profile_id,)).fetchone() is None:
+                        raise ValueError(f"Profile {profile_id} not found")
+                    created_at = data["created_at"]
+                    self._append(
+                        conn, form_type, profile_id, data["form"], 1, created_at, data.get("updated_at", created_at)
+                    )
+                imported += 1
+            except sqlite3.IntegrityError:
+                skipped += 1
+            except Exception as e:
+                logger.warning("Skipping %s: %s", path, e)
+                skipped += 1
+        return imported, skipped
+
+
+form_storage = FormStorage(profile_storage)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Form store maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Import {profile_id}.json forms from a directory")
+    import_parser.add_argument("form_type", choices=FORM_TYPES)
+    import_parser.add_argument("directory", nargs="?")
+    args = parser.parse_args()
+
+    directory = args.directory or f"{args.form_type}_forms"
+    imported, skipped = form_storage.import_dir(args.form_type, directory)
+    print(f"✓ Imported {imported} {args.form_type} forms from {directory} into {profile_storage.db_path} ({skipped} skipped)")
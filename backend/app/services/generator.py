@@ -3,20 +3,25 @@ Service layer for document generation.
 
 Wraps the core RAG generator and adds validation checks.
 """
+import json
+import logging
 import sys
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from src.generator import generate_docs
+from src.generator import generate_docs, agenerate_docs, astream_docs
 from src.evals import checklist_tos, checklist_privacy
 
+logger = logging.getLogger(__name__)
+
 def generate_legal_documents(
     product_vars: dict[str, Any],
     docs: list[str],
     tone: str,
-    jurisdictions: list[str]
+    jurisdictions: list[str],
+    on_section: Optional[Callable[[str, str, int, int], None]] = None
 ) -> dict[str, Any]:
     """
     Generate legal documents using RAG.
@@ -26,17 +31,69 @@ def generate_legal_documents(
         docs: List of document types to generate ("tos", "privacy")
         tone: Writing style ("plain" or "formal")
         jurisdictions: List of jurisdictions (e.g., ["US", "EU"])
+        on_section: Progress callback called as (doc, section, completed, total)
         
     Returns:
         Dictionary containing generated markdown and validation warnings
     """
     result = generate_docs(
+        product_vars=product_vars,
+        docs=docs,
+        tone=tone,
+        jurisdictions=jurisdictions,
+        on_section=on_section
+    )
+    
+    return {
+        "tos_md": result.get("tos_md"),
+        "privacy_md": result.get("privacy_md"),
+        "warnings": collect_warnings(result)
+    }
+
+async def agenerate_legal_documents(
+    product_vars: dict[str, Any],
+    docs: list[str],
+    tone: str,
+    jurisdictions: list[str]
+) -> dict[str, Any]:
+    """
+    Async variant of generate_legal_documents for use inside request handlers.
+    """
+    result = await agenerate_docs(
         product_vars=product_vars,
         docs=docs,
         tone=tone,
         jurisdictions=jurisdictions
     )
     
+    return {
+        "tos_md": result.get("tos_md"),
+        "privacy_md": result.get("privacy_md"),
+        "warnings": collect_warnings(result)
+    }
+
+def stream_legal_documents(
+    product_vars: dict[str, Any],
+    docs: list[str],
+    tone: str,
+    jurisdictions: list[str],
+    stream_tokens: bool = False
+) -> AsyncIterator[str]:
+    """
+    Generate legal documents as a Server-Sent Events stream, section by section.
+    """
+    return stream_events(astream_docs(
+        product_vars=product_vars,
+        docs=docs,
+        tone=tone,
+        jurisdictions=jurisdictions,
+        stream_tokens=stream_tokens
+    ))
+
+def collect_warnings(result: dict[str, Any]) -> dict[str, list[str]]:
+    """
+    Run the ToS/Privacy checklists over generated markdown.
+    """
     warnings: dict[str, list[str]] = {}
     
     if tos_md := result.get("tos_md"):
@@ -47,9 +104,130 @@ def generate_legal_documents(
         if privacy_checks := checklist_privacy(privacy_md):
             warnings["privacy"] = privacy_checks
     
-    return {
+    return warnings
+
+def format_sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def stream_events(
+    events: AsyncIterator[dict[str, Any]],
+    on_complete: Optional[Callable[[dict[str, Any]], Awaitable[None]]] = None
+) -> AsyncIterator[str]:
+    """
+    Format generation events as Server-Sent Events.
+    
+    Passes section/token events through as they arrive and finishes with a
+    "done" event carrying the full markdown and checklist warnings, or an
+    "error" event if generation fails. The awaitable on_complete receives the
+    collected markdown and per-section bodies, in document order rather than
+    the order sections finished in, before the "done" event is sent.
+    """
+    result: dict[str, Any] = {}
+    sections: dict[str, dict[int, tuple[str, str]]] = {}
+    try:
+        async for event in events:
+            name = event.pop("event")
+            if name == "section":
+                sections.setdefault(event["doc"], {})[event["index"]] = (event["section"], event["markdown"])
+            elif name == "document":
+                result[f"{event['doc']}_md"] = event["markdown"]
+            yield format_sse(name, event)
+        result["sections"] = {
+            doc: dict(entries[index] for index in sorted(entries)) for doc, entries in sections.items()
+        }
+        if on_complete:
+            await on_complete(result)
+    except Exception as e:
+        logger.error(f"Error streaming documents: {str(e)}")
+        yield format_sse("error", {"detail": str(e)})
+        return
+    
+    yield format_sse("done", {
         "tos_md": result.get("tos_md"),
         "privacy_md": result.get("privacy_md"),
-        "warnings": warnings
+        "warnings": collect_warnings(result)
+    })
+
+
+def tos_product_vars(profile, form) -> dict[str, Any]:
+    """
+    Build product_vars for ToS generation from a profile and ToS questionnaire.
+    """
+    return {
+        "product_name": form.product_name,
+        "product_description": form.product_description,
+        "service_type": form.service_type,
+        "platforms": form.platforms,
+        "company_legal": profile.organization.company_legal_name,
+        "contact_email": profile.organization.legal_notices_email,
+        "processors": [],
+        "tos_form": form.model_dump()
     }
 
+def privacy_product_vars(form) -> dict[str, Any]:
+    return {
+        "product_name": form.product_name,
+        "min_age": form.min_age,
+        "platforms": form.platforms
+    }
+
+def tos_gaps(form) -> list[dict[str, str]]:
+    """
+    Identify missing information in a ToS questionnaire.
+    """
+    gaps = []
+    
+    if not form.product_description:
+        gaps.append({
+            "severity": "warn",
+            "message": "Product description could be more detailed"
+        })
+    
+    if form.has_beta_features and not form.beta_note:
+        gaps.append({
+            "severity": "error",
+            "message": "Beta features note is required when beta features are enabled"
+        })
+    
+    if form.ugc_enabled and not form.ugc_license_to_service:
+        gaps.append({
+            "severity": "error",
+            "message": "UGC license description is required when user-generated content is enabled"
+        })
+    
+    return gaps
+
+def privacy_gaps(profile, form) -> list[dict[str, str]]:
+    """
+    Identify missing information in a privacy questionnaire for the profile's jurisdictions.
+    """
+    gaps = []
+    jurisdictions = profile.organization.jurisdictions_served
+    
+    if "EU" in jurisdictions or "UK" in jurisdictions:
+        if not form.gdpr:
+            gaps.append({
+                "severity": "error",
+                "message": "GDPR compliance information missing for EU/UK jurisdictions"
+            })
+        elif not form.gdpr.legal_bases:
+            gaps.append({
+                "severity": "error", 
+                "message": "Legal bases not specified for GDPR compliance"
+            })
+    
+    if "US" in jurisdictions or "CA" in jurisdictions:
+        if not form.us_state_privacy:
+            gaps.append({
+                "severity": "error",
+                "message": "US state privacy information missing for US/CA jurisdictions"
+            })
+    
+    for item in form.data_inventory:
+        if not item.retention and ("EU" in jurisdictions or "UK" in jurisdictions or "US" in jurisdictions):
+            gaps.append({
+                "severity": "warn",
+                "message": f"Retention period not specified for data category: {item.category}"
+            })
+    
+    return gaps
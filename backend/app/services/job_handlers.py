@@ -0,0 +1,176 @@
+"""
+Job handlers for the background generation queue.
+
+Each handler takes the validated request payload of the matching HTTP
+endpoint and a JobContext for progress reporting and cancellation.
+"""
+import sys
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from ..models.schemas import GenerateRequest, GenerateFromProfileRequest, GenerateBatchRequest
+from ..models.tos_schemas import ToSGenerateRequest
+from ..models.privacy_schemas import PrivacyGenerateRequest
+from .document_storage import document_storage
+from .form_storage import form_storage
+from .generator import (
+    collect_warnings,
+    generate_legal_documents,
+    privacy_gaps,
+    privacy_product_vars,
+    tos_gaps,
+    tos_product_vars,
+)
+from .job_queue import JobContext, JobHandler, JobQueue
+from .profile_storage import profile_storage
+from src.batch_generator import generate_batch
+from src.generator import generate_docs
+from src.privacy_generator import generate_privacy_policy
+from src.profile_generator import generate_from_profile
+from src.rate_limiter import BATCH, llm_priority
+
+JOB_REQUEST_MODELS: dict[str, type[BaseModel]] = {
+    "generate": GenerateRequest,
+    "generate_from_profile": GenerateFromProfileRequest,
+    "generate_batch": GenerateBatchRequest,
+    "tos": ToSGenerateRequest,
+    "privacy": PrivacyGenerateRequest,
+}
+
+
+def _read_profile(profile_id: str):
+    entry = profile_storage.read_versioned(profile_id)
+    if not entry:
+        raise ValueError(f"Profile {profile_id} not found")
+    return entry
+
+
+def run_generate(payload: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    request = GenerateRequest(**payload)
+    return generate_legal_documents(
+        product_vars=request.product_vars.model_dump(),
+        docs=request.docs,
+        tone=request.tone,
+        jurisdictions=request.jurisdictions,
+        on_section=context.report
+    )
+
+
+def run_generate_from_profile(payload: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    request = GenerateFromProfileRequest(**payload)
+    profile, version = _read_profile(request.profile_id)
+    
+    results = generate_from_profile(
+        profile=profile,
+        docs=request.doc_types,
+        tone=request.tone,
+        on_section=context.report
+    )
+    document_storage.save(profile, version, request.tone, results["sections"])
+    
+    return {
+        "tos_md": results.get("tos_md"),
+        "privacy_md": results.get("privacy_md"),
+        "warnings": collect_warnings(results)
+    }
+
+
+def run_generate_batch(payload: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    """
+    Generate documents for many profiles. Each profile's documents are saved
+    and recorded in the job result as soon as it finishes.
+    """
+    request = GenerateBatchRequest(**payload)
+    results: dict[str, dict[str, Any]] = {}
+    profiles, versions = [], {}
+    for profile_id in dict.fromkeys(request.profile_ids):
+        entry = profile_storage.read_versioned(profile_id)
+        if entry:
+            profiles.append(entry[0])
+            versions[profile_id] = entry[1]
+        else:
+            results[profile_id] = {"status": "failed", "error": f"Profile {profile_id} not found"}
+    
+    by_id = {profile.profile_id: profile for profile in profiles}
+    total = len(results) + len(profiles)
+    
+    def on_profile(profile_id: str, result: dict[str, Any]) -> None:
+        if "error" in result:
+            results[profile_id] = {"status": "failed", "error": result["error"]}
+        else:
+            document_storage.save(by_id[profile_id], versions[profile_id], request.tone, result["sections"])
+            results[profile_id] = {
+                "status": "succeeded",
+                "tos_md": result.get("tos_md"),
+                "privacy_md": result.get("privacy_md"),
+                "warnings": collect_warnings(result)
+            }
+        context.report("batch", profile_id, len(results), total)
+    
+    summary = generate_batch(
+        profiles=profiles,
+        docs=request.doc_types,
+        tone=request.tone,
+        on_profile=on_profile
+    )
+    
+    return {
+        "profiles": results,
+        "total_sections": summary["total_sections"],
+        "unique_sections": summary["unique_sections"]
+    }
+
+
+def run_tos(payload: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    request = ToSGenerateRequest(**payload)
+    profile, form = form_storage.read_for_generation("tos", request.profile_id, request.form)
+    
+    result = generate_docs(
+        product_vars=tos_product_vars(profile, form),
+        docs=["tos"],
+        tone="plain",
+        jurisdictions=profile.organization.jurisdictions_served,
+        on_section=context.report
+    )
+    
+    return {
+        "markdown": result.get("tos_md", ""),
+        "gaps": tos_gaps(form)
+    }
+
+
+def run_privacy(payload: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    request = PrivacyGenerateRequest(**payload)
+    profile, form = form_storage.read_for_generation("privacy", request.profile_id, request.form)
+    
+    markdown = generate_privacy_policy(
+        profile=profile.model_dump(),
+        privacy_form=form.model_dump(),
+        product_vars=privacy_product_vars(form)
+    )
+    context.report("privacy", "privacy policy", 1, 1)
+    
+    return {
+        "markdown": markdown,
+        "gaps": privacy_gaps(profile, form)
+    }
+
+
+def _at_batch_priority(handler: JobHandler) -> JobHandler:
+    """Run a handler's LLM calls behind interactive requests in the rate limiter."""
+    def run(payload: dict[str, Any], context: JobContext) -> dict[str, Any]:
+        with llm_priority(BATCH):
+            return handler(payload, context)
+    return run
+
+
+def register_handlers(queue: JobQueue) -> None:
+    queue.register("generate", _at_batch_priority(run_generate))
+    queue.register("generate_from_profile", _at_batch_priority(run_generate_from_profile))
+    queue.register("generate_batch", _at_batch_priority(run_generate_batch))
+    queue.register("tos", _at_batch_priority(run_tos))
+    queue.register("privacy", _at_batch_priority(run_privacy))
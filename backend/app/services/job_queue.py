@@ -0,0 +1,291 @@
+"""
+In-process background job queue backed by SQLite.
+
+Jobs are persisted in a local SQLite database and executed by a pool of
+worker threads, so long generations survive proxy timeouts and client
+disconnects. Any number of processes can share the same database; workers
+claim jobs atomically. While a job runs, its process refreshes the job's
+updated_at every few seconds; workers in every process periodically requeue
+running jobs whose heartbeat stopped, so jobs of a dead process are picked
+up again without requeueing long jobs that are still alive.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from ..core.config import settings
+from .database import connect, transaction
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """
+    Handed to job handlers to report per-section progress.
+    
+    report() raises JobCancelled once cancellation has been requested, which
+    stops the handler at the next section boundary.
+    """
+
+    def __init__(self, queue: "JobQueue", job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self.progress: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def report(self, doc: str, section: str, completed: int, total: int) -> None:
+        with self._lock:
+            entry = self.progress.setdefault(doc, {"completed": 0, "total": total, "sections": []})
+            entry["completed"] = completed
+            entry["total"] = total
+            entry["sections"].append(section)
+            self.queue._save_progress(self.job_id, self.progress)
+        self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        if self.queue.is_cancel_requested(self.job_id):
+            raise JobCancelled(self.job_id)
+
+
+JobHandler = Callable[[dict[str, Any], JobContext], dict[str, Any]]
+
+
+class JobQueue:
+    def __init__(
+        self,
+        db_path: str = "jobs.db",
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        stale_after: float = 60.0
+    ):
+        self.db_path = db_path
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.heartbeat_interval = stale_after / 4
+        self._handlers: dict[str, JobHandler] = {}
+        self._threads: list[threading.Thread] = []
+        self._running: set[str] = set()
+        self._running_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._local = threading.local()
+        
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " progress TEXT NOT NULL DEFAULT '{}',"
+            " result TEXT,"
+            " error TEXT,"
+            " cancel_requested INTEGER NOT NULL DEFAULT 0,"
+            " created_at TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)")
+    
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.db_path)
+            self._local.conn = conn
+        return conn
+    
+    def _to_dict(self, row) -> dict[str, Any]:
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "payload": json.loads(row["payload"]),
+            "progress": json.loads(row["progress"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "cancel_requested": bool(row["cancel_requested"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+    
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+    
+    @property
+    def kinds(self) -> list[str]:
+        return list(self._handlers)
+    
+    def enqueue(self, kind: str, payload: dict[str, Any]) -> dict[str, Any]:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        
+        now = datetime.now().isoformat()
+        job_id = str(uuid.uuid4())
+        self._conn().execute(
+            "INSERT INTO jobs (job_id, kind, status, payload, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, QUEUED, json.dumps(payload, ensure_ascii=False), now, now)
+        )
+        self._wake.set()
+        return self.get(job_id)
+    
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+    
+    def cancel(self, job_id: str) -> Optional[dict[str, Any]]:
+        """
+        Cancel a job: queued jobs are cancelled immediately, running jobs stop
+        at their next section boundary.
+        """
+        now = datetime.now().isoformat()
+        with transaction(self._conn()) as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row["status"] == QUEUED:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, cancel_requested = 1, updated_at = ? WHERE job_id = ?",
+                    (CANCELLED, now, job_id)
+                )
+            elif row["status"] == RUNNING:
+                conn.execute(
+                    "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE job_id = ?",
+                    (now, job_id)
+                )
+        return self.get(job_id)
+    
+    def is_cancel_requested(self, job_id: str) -> bool:
+        row = self._conn().execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+    
+    def _save_progress(self, job_id: str, progress: dict[str, Any]) -> None:
+        self._conn().execute(
+            "UPDATE jobs SET progress = ?, updated_at = ? WHERE job_id = ?",
+            (json.dumps(progress), datetime.now().isoformat(), job_id)
+        )
+    
+    def _finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE job_id = ?",
+            (
+                status,
+                json.dumps(result, ensure_ascii=False) if result is not None else None,
+                error,
+                datetime.now().isoformat(),
+                job_id
+            )
+        )
+    
+    def _claim(self) -> Optional[dict[str, Any]]:
+        with transaction(self._conn()) as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                (RUNNING, datetime.now().isoformat(), row["job_id"])
+            )
+        return self._to_dict(row)
+    
+    def _heartbeat(self) -> None:
+        """Refresh updated_at of the jobs running in this process."""
+        with self._running_lock:
+            job_ids = list(self._running)
+        if job_ids:
+            self._conn().execute(
+                f"UPDATE jobs SET updated_at = ? WHERE status = ? AND job_id IN ({', '.join('?' * len(job_ids))})",
+                (datetime.now().isoformat(), RUNNING, *job_ids)
+            )
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                self._heartbeat()
+            except Exception as e:
+                logger.error("Error refreshing job heartbeats: %s", e)
+
+    def _requeue_stale(self) -> None:
+        """Return jobs whose process stopped its heartbeat (no update for stale_after seconds) to the queue."""
+        cutoff = (datetime.now() - timedelta(seconds=self.stale_after)).isoformat()
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = ?, progress = '{}' WHERE status = ? AND updated_at < ?",
+            (QUEUED, RUNNING, cutoff)
+        )
+        if cur.rowcount:
+            logger.info("Requeued %d stale jobs", cur.rowcount)
+    
+    def _run(self, job: dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        context = JobContext(self, job_id)
+        with self._running_lock:
+            self._running.add(job_id)
+        try:
+            context.check_cancelled()
+            result = self._handlers[job["kind"]](job["payload"], context)
+            self._finish(job_id, SUCCEEDED, result=result)
+            logger.info("Job %s (%s) succeeded", job_id, job["kind"])
+        except JobCancelled:
+            self._finish(job_id, CANCELLED)
+            logger.info("Job %s (%s) cancelled", job_id, job["kind"])
+        except Exception as e:
+            self._finish(job_id, FAILED, error=str(e))
+            logger.error("Job %s (%s) failed: %s", job_id, job["kind"], e)
+        finally:
+            with self._running_lock:
+                self._running.discard(job_id)
+    
+    def _work(self) -> None:
+        next_sweep = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= next_sweep:
+                    self._requeue_stale()
+                    next_sweep = time.monotonic() + self.heartbeat_interval
+                job = self._claim()
+            except Exception as e:
+                logger.error("Error claiming job: %s", e)
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._run(job)
+    
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+job_queue = JobQueue(settings.job_db_path, settings.job_workers, stale_after=settings.job_stale_after)
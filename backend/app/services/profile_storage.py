@@ -1,96 +1,354 @@
+"""
+Company profile storage backed by SQLite.
+
+Each profile is stored as one JSON document, and a summary row (name,
+company, jurisdictions, timestamps) is kept next to it so listings are
+served from small indexed tables without parsing any profile. Validated
+CompanyProfile objects are kept in a bounded LRU cache. Every write is one
+transaction that bumps the profile's version, which doubles as its ETag;
+reads check it, so a cache never serves a profile another process has
+changed. Profiles from the old one-JSON-file-per-profile layout are
+imported with:
+
+    python -m app.services.profile_storage import profiles/
+"""
 import json
+import logging
+import sqlite3
+import threading
 import uuid
+from collections import OrderedDict
+from datetime import date, datetime
 from pathlib import Path
-from typing import Optional
-from datetime import date
+from typing import Any, Optional
 
+from ..core.config import settings
 from ..models.profile_schemas import CompanyProfile
+from .database import connect, transaction
+from .versioning import VersionConflict
+
+logger = logging.getLogger(__name__)
+
+SORT_FIELDS = ("profile_name", "company_legal_name", "created_at", "updated_at")
 
 
 class ProfileStorage:
-    def __init__(self, storage_dir: str = "profiles"):
-        self.storage_dir = Path(storage_dir)
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
-    
-    def _get_profile_path(self, profile_id: str) -> Path:
-        return self.storage_dir / f"{profile_id}.json"
-    
+    def __init__(self, db_path: str = "profiles.db", cache_size: int = 1024):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self._local = threading.local()
+        self._cache: OrderedDict[str, tuple[tuple, CompanyProfile]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+        conn = self.conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " profile_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 1,"
+            " created_at TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(profiles)")}
+        if "version" not in columns:
+            conn.execute("ALTER TABLE profiles ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS profile_summaries ("
+            " profile_id TEXT PRIMARY KEY,"
+            " profile_name TEXT NOT NULL COLLATE NOCASE,"
+            " company_legal_name TEXT NOT NULL COLLATE NOCASE,"
+            " jurisdictions TEXT NOT NULL,"
+            " created_at TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS profile_jurisdictions ("
+            " jurisdiction TEXT NOT NULL,"
+            " profile_id TEXT NOT NULL,"
+            " PRIMARY KEY (jurisdiction, profile_id)) WITHOUT ROWID"
+        )
+        for field in SORT_FIELDS:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_profile_summaries_{field}"
+                f" ON profile_summaries({field}, profile_id)"
+            )
+
+    def conn(self) -> sqlite3.Connection:
+        """This thread's connection, also used by stores kept in the profile database."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.db_path)
+            self._local.conn = conn
+        return conn
+
     def _serialize_profile(self, profile: CompanyProfile) -> dict:
         data = profile.model_dump(mode='json')
         if 'organization' in data and 'effective_date' in data['organization']:
             if isinstance(data['organization']['effective_date'], date):
                 data['organization']['effective_date'] = data['organization']['effective_date'].isoformat()
         return data
-    
-    def create(self, profile: CompanyProfile) -> CompanyProfile:
+
+    def _write_summary(self, conn: sqlite3.Connection, data: dict, created_at: str, updated_at: str) -> None:
+        profile_id = data["profile_id"]
+        jurisdictions = sorted(set(data.get("organization", {}).get("jurisdictions_served", [])))
+        conn.execute(
+            "INSERT OR REPLACE INTO profile_summaries"
+            " (profile_id, profile_name, company_legal_name, jurisdictions, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                profile_id,
+                data.get("profile_name", "Unnamed Profile"),
+                data.get("organization", {}).get("company_legal_name", "N/A"),
+                json.dumps(jurisdictions),
+                created_at,
+                updated_at
+            )
+        )
+        conn.execute("DELETE FROM profile_jurisdictions WHERE profile_id = ?", (profile_id,))
+        conn.executemany(
+            "INSERT INTO profile_jurisdictions (jurisdiction, profile_id) VALUES (?, ?)",
+            [(jurisdiction, profile_id) for jurisdiction in jurisdictions]
+        )
+
+    def _insert(self, conn: sqlite3.Connection, data: dict, created_at: str, updated_at: str) -> None:
+        conn.execute(
+            "INSERT INTO profiles (profile_id, data, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (data["profile_id"], json.dumps(data, ensure_ascii=False), created_at, updated_at)
+        )
+        self._write_summary(conn, data, created_at, updated_at)
+
+    def create(self, profile: CompanyProfile) -> tuple[CompanyProfile, int]:
         if not profile.profile_id:
             profile.profile_id = str(uuid.uuid4())
-        
-        profile_path = self._get_profile_path(profile.profile_id)
-        
-        if profile_path.exists():
-            raise ValueError(f"Profile with ID {profile.profile_id} already exists")
-        
+
         data = self._serialize_profile(profile)
-        
-        with open(profile_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
+        now = datetime.now().isoformat()
+
+        try:
+            with transaction(self.conn()) as conn:
+                self._insert(conn, data, now, now)
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Profile with ID {profile.profile_id} already exists") from e
+
+        return profile, 1
+
+    def _cache_get(self, profile_id: str, version: tuple) -> Optional[CompanyProfile]:
+        with self._cache_lock:
+            entry = self._cache.get(profile_id)
+            if entry is None:
+                self._metrics["misses"] += 1
+                return None
+            if entry[0] != version:
+                self._metrics["stale"] += 1
+                del self._cache[profile_id]
+                return None
+            self._metrics["hits"] += 1
+            self._cache.move_to_end(profile_id)
+            return entry[1]
+
+    def _cache_put(self, profile_id: str, version: tuple, profile: CompanyProfile) -> None:
+        with self._cache_lock:
+            self._cache[profile_id] = (version, profile)
+            self._cache.move_to_end(profile_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self._metrics["evictions"] += 1
+
+    def _cache_drop(self, profile_id: str) -> None:
+        with self._cache_lock:
+            self._cache.pop(profile_id, None)
+
+    def read_versioned(self, profile_id: str) -> Optional[tuple[CompanyProfile, int]]:
+        """
+        Return a profile and its version, from the cache when the stored version is unchanged.
+
+        Cached instances are shared between callers and must not be modified.
+        """
+        conn = self.conn()
+        row = conn.execute(
+            "SELECT version, created_at FROM profiles WHERE profile_id = ?", (profile_id,)
+        ).fetchone()
+
+        if row is None:
+            self._cache_drop(profile_id)
+            return None
+
+        # created_at tells a re-created profile apart from a deleted one with the same version.
+        profile = self._cache_get(profile_id, tuple(row))
+        if profile is not None:
+            return profile, row["version"]
+
+        row = conn.execute(
+            "SELECT data, version, created_at FROM profiles WHERE profile_id = ?", (profile_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        profile = CompanyProfile(**json.loads(row["data"]))
+        self._cache_put(profile_id, (row["version"], row["created_at"]), profile)
+        return profile, row["version"]
+
+    def load(self, profile_id: str, data: str, version: int, created_at: str) -> CompanyProfile:
+        """
+        Return the profile for a profiles row read by another query, from the
+        cache when that version is already validated.
+        """
+        profile = self._cache_get(profile_id, (version, created_at))
+        if profile is None:
+            profile = CompanyProfile(**json.loads(data))
+            self._cache_put(profile_id, (version, created_at), profile)
         return profile
-    
+
     def read(self, profile_id: str) -> Optional[CompanyProfile]:
-        profile_path = self._get_profile_path(profile_id)
-        
-        if not profile_path.exists():
-            return None
-        
-        with open(profile_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        return CompanyProfile(**data)
-    
-    def update(self, profile_id: str, profile: CompanyProfile) -> CompanyProfile:
-        profile_path = self._get_profile_path(profile_id)
-        
-        if not profile_path.exists():
-            raise ValueError(f"Profile with ID {profile_id} not found")
-        
+        entry = self.read_versioned(profile_id)
+        return entry[0] if entry else None
+
+    def cache_stats(self) -> dict[str, Any]:
+        with self._cache_lock:
+            metrics = dict(self._metrics)
+            size = len(self._cache)
+        lookups = metrics["hits"] + metrics["misses"] + metrics["stale"]
+        return {
+            **metrics,
+            "size": size,
+            "max_size": self.cache_size,
+            "hit_rate": metrics["hits"] / lookups if lookups else 0.0
+        }
+
+    def update(
+        self,
+        profile_id: str,
+        profile: CompanyProfile,
+        expected_version: Optional[int] = None
+    ) -> tuple[CompanyProfile, int]:
+        """
+        Replace a profile and return it with its new version.
+
+        Raises:
+            ValueError: If the profile does not exist
+            VersionConflict: If expected_version is given and is not the stored version
+        """
         profile.profile_id = profile_id
-        
+
         data = self._serialize_profile(profile)
-        
-        with open(profile_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        return profile
-    
+        now = datetime.now().isoformat()
+
+        with transaction(self.conn()) as conn:
+            row = conn.execute(
+                "SELECT version, created_at FROM profiles WHERE profile_id = ?", (profile_id,)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Profile with ID {profile_id} not found")
+            if expected_version is not None and expected_version != row["version"]:
+                raise VersionConflict(row["version"])
+            conn.execute(
+                "UPDATE profiles SET data = ?, version = version + 1, updated_at = ? WHERE profile_id = ?",
+                (json.dumps(data, ensure_ascii=False), now, profile_id)
+            )
+            self._write_summary(conn, data, row["created_at"], now)
+        self._cache_drop(profile_id)
+
+        return profile, row["version"] + 1
+
     def delete(self, profile_id: str) -> bool:
-        profile_path = self._get_profile_path(profile_id)
-        
-        if not profile_path.exists():
-            return False
-        
-        profile_path.unlink()
-        return True
-    
-    def list_all(self) -> list[dict[str, str]]:
-        profiles = []
-        
-        for profile_path in self.storage_dir.glob("*.json"):
+        with transaction(self.conn()) as conn:
+            deleted = conn.execute("DELETE FROM profiles WHERE profile_id = ?", (profile_id,)).rowcount
+            conn.execute("DELETE FROM profile_summaries WHERE profile_id = ?", (profile_id,))
+            conn.execute("DELETE FROM profile_jurisdictions WHERE profile_id = ?", (profile_id,))
+        self._cache_drop(profile_id)
+        return bool(deleted)
+
+    def list_summaries(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        company: Optional[str] = None,
+        jurisdiction: Optional[str] = None,
+        sort: str = "profile_name",
+        descending: bool = False
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Return one page of profile summaries and the total number matching the filters.
+
+        Args:
+            limit: Page size (None for all)
+            offset: Number of matching profiles to skip
+            company: Case-insensitive prefix of the company legal name
+            jurisdiction: Only profiles serving this jurisdiction
+            sort: One of SORT_FIELDS
+            descending: Sort order
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort}; expected one of {', '.join(SORT_FIELDS)}")
+
+        where, params = [], []
+        if jurisdiction:
+            where.append(
+                "EXISTS (SELECT 1 FROM profile_jurisdictions j"
+                " WHERE j.jurisdiction = ? AND j.profile_id = s.profile_id)"
+            )
+            params.append(jurisdiction)
+        if company:
+            where.append("s.company_legal_name >= ? AND s.company_legal_name < ?")
+            params += [company, company + chr(0x10FFFF)]
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+        conn = self.conn()
+        if jurisdiction and not company:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM profile_jurisdictions WHERE jurisdiction = ?", (jurisdiction,)
+            ).fetchone()[0]
+        else:
+            total = conn.execute(f"SELECT COUNT(*) FROM profile_summaries s{clause}", params).fetchone()[0]
+        order = "DESC" if descending else "ASC"
+        rows = conn.execute(
+            f"SELECT s.* FROM profile_summaries s{clause}"
+            f" ORDER BY s.{sort} {order}, s.profile_id {order} LIMIT ? OFFSET ?",
+            (*params, -1 if limit is None else limit, offset)
+        ).fetchall()
+
+        return [{**dict(row), "jurisdictions": json.loads(row["jurisdictions"])} for row in rows], total
+
+    def list_all(self) -> list[dict[str, Any]]:
+        return self.list_summaries()[0]
+
+    def import_dir(self, directory: str) -> tuple[int, int]:
+        """
+        Import profiles from a directory of {profile_id}.json files, skipping
+        IDs that are already stored and files that fail validation.
+
+        Returns:
+            (imported, skipped)
+        """
+        imported = skipped = 0
+        for path in sorted(Path(directory).glob("*.json")):
             try:
-                with open(profile_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                profiles.append({
-                    "profile_id": data.get("profile_id", profile_path.stem),
-                    "profile_name": data.get("profile_name", "Unnamed Profile"),
-                    "company_legal_name": data.get("organization", {}).get("company_legal_name", "N/A")
-                })
-            except Exception:
-                continue
-        
-        return profiles
-
-
-profile_storage = ProfileStorage()
+                with open(path, 'r', encoding='utf-8') as f:
+                    profile = CompanyProfile(**json.load(f))
+                profile.profile_id = profile.profile_id or path.stem
+                data = self._serialize_profile(profile)
+                modified = datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+                with transaction(self.conn()) as conn:
+                    self._insert(conn, data, modified, modified)
+                imported += 1
+            except sqlite3.IntegrityError:
+                skipped += 1
+            except Exception as e:
+                logger.warning("Skipping %s: %s", path, e)
+                skipped += 1
+        return imported, skipped
+
+
+profile_storage = ProfileStorage(settings.profile_db_path, settings.profile_cache_size)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile store maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Import {profile_id}.json files from a directory")
+    import_parser.add_argument("directory", nargs="?", default="profiles")
+    args = parser.parse_args()
 
+    imported, skipped = profile_storage.import_dir(args.directory)
+    print(f"✓ Imported {imported} profiles from {args.directory} into {profile_storage.db_path} ({skipped} skipped)")
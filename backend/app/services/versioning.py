@@ -0,0 +1,38 @@
+"""
+Optimistic concurrency for stored profiles and forms.
+
+Every stored record carries an integer version that increases on each
+write. Clients get it as an ETag and send it back in If-Match; a write whose
+expected version no longer matches fails with VersionConflict instead of
+overwriting someone else's change.
+"""
+from typing import Optional
+
+
+class VersionConflict(Exception):
+    """Raised when a write's expected version does not match the stored one."""
+
+    def __init__(self, current: Optional[int]):
+        super().__init__(f"Stored version is {current}")
+        self.current = current
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_if_match(header: Optional[str], exists: bool = True) -> Optional[int]:
+    """
+    Expected version from an If-Match header: None when absent or "*" (and the
+    record exists), -1 when it matches nothing.
+    """
+    if header is None:
+        return None
+    tags = [tag.strip() for tag in header.split(",")]
+    if "*" in tags:
+        return None if exists else -1
+    for tag in tags:
+        tag = tag.removeprefix("W/").strip('"')
+        if tag.isdigit():
+            return int(tag)
+    return -1
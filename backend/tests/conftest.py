@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(BACKEND.parent))
+
+# The storage singletons open their databases on import.
+_db_dir = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ["PROFILE_DB_PATH"] = os.path.join(_db_dir, "profiles.db")
+os.environ["JOB_DB_PATH"] = os.path.join(_db_dir, "jobs.db")
+
+
+def _profile_payload(company: str = "Acme Inc", **overrides) -> dict:
+    payload = {
+        "profile_name": f"{company} profile",
+        "organization": {
+            "company_legal_name": company,
+            "registered_address": "1 Main St",
+            "privacy_email": "privacy@example.com",
+            "legal_notices_email": "legal@example.com",
+            "jurisdictions_served": ["US"],
+            "effective_date": "2024-01-01"
+        },
+        "product": {"product_name": "Widget"},
+        "audience": {},
+        "data_categories": [],
+        "acceptable_use": {"prohibited_acts": ["spam"]},
+        "intellectual_property": {},
+        "changes_policy": {},
+        "disclaimers": {},
+        "dispute_resolution": {"venue": "Delaware"}
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.fixture
+def client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api.routes import documents, privacy, profiles, tos
+
+    app = FastAPI()
+    for module in (profiles, privacy, tos, documents):
+        app.include_router(module.router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def company() -> str:
+    """A company name no other test uses, for filtering listings."""
+    return f"Co {uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def profile_payload():
+    """Build a valid CompanyProfile body; keyword arguments override top-level fields."""
+    return _profile_payload
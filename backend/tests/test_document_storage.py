@@ -0,0 +1,84 @@
+import pytest
+
+from app.models.profile_schemas import CompanyProfile
+from app.services.document_storage import DocumentStorage
+from app.services.profile_storage import ProfileStorage
+
+
+@pytest.fixture
+def stores(tmp_path):
+    profiles = ProfileStorage(str(tmp_path / "profiles.db"))
+    return profiles, DocumentStorage(profiles)
+
+
+def blob_count(profiles):
+    return profiles.conn().execute("SELECT COUNT(*) FROM document_blobs").fetchone()[0]
+
+
+def create(profiles, profile_payload, profile_id):
+    profile, version = profiles.create(CompanyProfile(**profile_payload(profile_id=profile_id)))
+    return profile, version
+
+
+def test_versions_history_and_diff(stores, profile_payload):
+    profiles, documents = stores
+    profile, version = create(profiles, profile_payload, "p1")
+    assert documents.save(profile, version, "formal", {"tos": {"Intro": "Hello", "Terms": "Old"}}) == {"tos": 1}
+    assert documents.save(profile, version, "formal", {"tos": {"Intro": "Hello", "Terms": "Old"}}) == {"tos": 1}
+    assert documents.save(profile, version, "plain", {"tos": {"Intro": "Hello", "Terms": "New"}}) == {"tos": 2}
+
+    assert [entry["version"] for entry in documents.history("p1", "tos")] == [2, 1]
+    assert "New" in documents.find("p1", "tos")["markdown"]
+    assert documents.find("p1", "tos", tone="formal")["version"] == 1
+    sections = {entry["section"]: entry for entry in documents.diff("p1", "tos", 1)["sections"]}
+    assert sections["Intro"]["status"] == "unchanged"
+    assert (sections["Terms"]["before"], sections["Terms"]["after"]) == ("Old", "New")
+
+
+def test_replacing_a_document_deletes_blobs_only_it_used(stores, profile_payload):
+    profiles, documents = stores
+    profile, version = create(profiles, profile_payload, "p1")
+    documents.save(profile, version, "formal", {"tos": {"Intro": "Shared", "Terms": "First draft"}})
+    before = blob_count(profiles)
+
+    documents.save(profile, version, "formal", {"tos": {"Intro": "Shared", "Terms": "Second draft"}})
+    assert blob_count(profiles) == before
+    assert len(documents.history("p1", "tos")) == 1
+    assert "Second draft" in documents.find("p1", "tos")["markdown"]
+
+
+def test_deleting_a_profile_deletes_its_blobs_but_not_shared_ones(stores, profile_payload):
+    profiles, documents = stores
+    first, first_version = create(profiles, profile_payload, "p1")
+    second, second_version = create(profiles, profile_payload, "p2")
+    documents.save(first, first_version, "formal", {"tos": {"Intro": "Shared", "Terms": "Only p1"}})
+    documents.save(second, second_version, "formal", {"tos": {"Intro": "Shared"}})
+
+    # The row trigger alone, as when a profile is deleted without DocumentStorage.delete.
+    profiles.delete("p1")
+    hashes = {row[0] for row in profiles.conn().execute("SELECT hash FROM document_blobs")}
+    referenced = {row[0] for row in profiles.conn().execute(
+        "SELECT hash FROM document_sections UNION SELECT profile_hash FROM documents"
+    )}
+    assert hashes == referenced
+    assert "Shared" in documents.find("p2", "tos")["markdown"]
+
+    profiles.delete("p2")
+    assert blob_count(profiles) == 0
+    assert documents.delete("p2") is False
+
+
+def test_document_endpoint_honours_if_none_match(client, profile_payload, company):
+    from app.services.document_storage import document_storage
+    from app.services.profile_storage import profile_storage
+
+    profile, version = profile_storage.create(CompanyProfile(**profile_payload(company)))
+    document_storage.save(profile, version, "formal", {"tos": {"Intro": "Hello"}})
+    url = f"/api/documents/{profile.profile_id}/tos"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert "Hello" in first.json()["markdown"]
+    cached = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert (cached.status_code, cached.headers["ETag"]) == (304, first.headers["ETag"])
+    assert client.get(f"/api/documents/{profile.profile_id}/privacy").status_code == 404
@@ -0,0 +1,20 @@
+import asyncio
+import threading
+
+from app.core.config import settings
+from app.services.executor import run_blocking, run_probe
+
+
+def test_probe_answers_while_blocking_pool_is_saturated():
+    release = threading.Event()
+
+    async def scenario():
+        # Hold every shared worker, as long-running blocking calls would.
+        held = [asyncio.ensure_future(run_blocking(release.wait, 5)) for _ in range(settings.blocking_workers)]
+        try:
+            return await asyncio.wait_for(run_probe(lambda: "ok"), timeout=1)
+        finally:
+            release.set()
+            await asyncio.gather(*held)
+
+    assert asyncio.run(scenario()) == "ok"
@@ -0,0 +1,73 @@
+import warnings
+
+import pytest
+from pydantic.warnings import PydanticDeprecatedSince20
+
+TOS_FORM = {
+    "product_name": "Widget",
+    "product_description": "A widget",
+    "service_type": "SaaS",
+    "platforms": ["web"],
+    "minimum_age": 13,
+    "data_categories": ["email"],
+    "prohibited_acts": ["spam"],
+    "change_notice_methods": ["email"],
+    "liability_cap_description": "fees paid",
+    "dispute_path": "courts",
+    "venue": "Delaware"
+}
+
+
+@pytest.fixture
+def profile_id(client, profile_payload, company):
+    return client.post("/api/profiles", json=profile_payload(company)).json()["profile"]["profile_id"]
+
+
+def save(client, profile_id, headers=None, **changes):
+    return client.put(f"/api/tos/{profile_id}", json={"form": {**TOS_FORM, **changes}}, headers=headers or {})
+
+
+def test_if_match_any_requires_an_existing_form(client, profile_id):
+    assert save(client, profile_id, {"If-Match": "*"}).status_code == 412
+    assert save(client, profile_id, {"If-Match": '"0"'}).status_code == 412
+    assert client.get(f"/api/tos/{profile_id}").status_code == 404
+
+    created = save(client, profile_id)
+    assert (created.status_code, created.headers["ETag"]) == (200, '"1"')
+    assert save(client, profile_id, {"If-Match": "*"}).headers["ETag"] == '"2"'
+
+
+def test_stale_save_fails_and_history_keeps_every_version(client, profile_id):
+    tag = save(client, profile_id, venue="Texas").headers["ETag"]
+    assert save(client, profile_id, {"If-Match": tag}, venue="Ohio").status_code == 200
+    assert save(client, profile_id, {"If-Match": tag}, venue="Lost").status_code == 412
+
+    current = client.get(f"/api/tos/{profile_id}")
+    assert (current.headers["ETag"], current.json()["form"]["venue"]) == ('"2"', "Ohio")
+    history = client.get(f"/api/tos/{profile_id}/history").json()["versions"]
+    assert [entry["version"] for entry in history] == [2, 1]
+    assert client.get(f"/api/tos/{profile_id}/versions/1").json()["form"]["venue"] == "Texas"
+
+
+def test_save_for_missing_profile_is_not_found(client):
+    assert save(client, "missing").status_code == 404
+
+
+def test_forms_are_deleted_with_their_profile(client, profile_id):
+    save(client, profile_id)
+    assert client.delete(f"/api/profiles/{profile_id}").status_code == 204
+    assert client.get(f"/api/tos/{profile_id}").status_code == 404
+    assert client.get(f"/api/tos/{profile_id}/history").status_code == 404
+
+
+def test_save_uses_no_deprecated_pydantic_api(client, profile_id):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", PydanticDeprecatedSince20)
+        assert save(client, profile_id).status_code == 200
+
+
+def test_privacy_forms_share_the_form_routes(client, profile_id):
+    assert client.get(f"/api/privacy/{profile_id}").status_code == 404
+    assert client.get(f"/api/privacy/{profile_id}/history").status_code == 404
+    assert client.get(f"/api/privacy/{profile_id}/versions/1").status_code == 404
+    assert client.get("/api/privacy", params={"profile_id": [profile_id]}).json() == {"forms": []}
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from app.services.job_queue import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+
+
+def wait_for(queue, job_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {queue.get(job_id)['status']}")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), workers=2, poll_interval=0.05)
+    yield queue
+    queue.stop()
+
+
+def test_jobs_run_to_success_or_failure(queue):
+    def handler(payload, context):
+        if payload.get("fail"):
+            raise RuntimeError("boom")
+        context.report("tos", "intro", 1, 1)
+        return {"echo": payload["value"]}
+
+    queue.register("echo", handler)
+    with pytest.raises(ValueError):
+        queue.enqueue("unknown", {})
+    ok = queue.enqueue("echo", {"value": 42})
+    bad = queue.enqueue("echo", {"fail": True})
+    assert ok["status"] == QUEUED
+    queue.start()
+
+    ok = wait_for(queue, ok["job_id"], {SUCCEEDED, FAILED})
+    assert (ok["status"], ok["result"]) == (SUCCEEDED, {"echo": 42})
+    assert ok["progress"] == {"tos": {"completed": 1, "total": 1, "sections": ["intro"]}}
+    bad = wait_for(queue, bad["job_id"], {SUCCEEDED, FAILED})
+    assert (bad["status"], bad["error"]) == (FAILED, "boom")
+
+
+def test_cancel_queued_and_running_jobs(queue):
+    started, release = threading.Event(), threading.Event()
+
+    def handler(payload, context):
+        started.set()
+        release.wait(5)
+        context.report("tos", "intro", 1, 2)
+        return {}
+
+    queue.register("slow", handler)
+    queued = queue.enqueue("slow", {})
+    assert queue.cancel(queued["job_id"])["status"] == CANCELLED
+    assert queue.cancel("missing") is None
+
+    running = queue.enqueue("slow", {})
+    queue.start()
+    assert started.wait(5)
+    assert queue.get(running["job_id"])["status"] == RUNNING
+    assert queue.cancel(running["job_id"])["cancel_requested"]
+    release.set()
+    assert wait_for(queue, running["job_id"], {CANCELLED, SUCCEEDED})["status"] == CANCELLED
+
+
+def test_stale_running_jobs_are_requeued_on_start(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    crashed = JobQueue(path, stale_after=0)
+    crashed.register("noop", lambda payload, context: {})
+    job = crashed.enqueue("noop", {})
+    assert crashed._claim()["job_id"] == job["job_id"]
+    time.sleep(0.01)
+
+    queue = JobQueue(path, poll_interval=0.05, stale_after=0)
+    queue.register("noop", lambda payload, context: {"done": True})
+    queue.start()
+    try:
+        assert wait_for(queue, job["job_id"], {SUCCEEDED})["result"] == {"done": True}
+    finally:
+        queue.stop()
+
+
+def test_jobs_of_a_dead_worker_are_recovered_by_a_running_queue(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    dead = JobQueue(path, stale_after=0.2)
+    dead.register("noop", lambda payload, context: {})
+    job = dead.enqueue("noop", {})
+    assert dead._claim()["job_id"] == job["job_id"]
+
+    # Started while the claim is still fresh: recovery must not depend on start().
+    queue = JobQueue(path, poll_interval=0.02, stale_after=0.2)
+    queue.register("noop", lambda payload, context: {"done": True})
+    queue.start()
+    try:
+        assert queue.get(job["job_id"])["status"] == RUNNING
+        assert wait_for(queue, job["job_id"], {SUCCEEDED})["result"] == {"done": True}
+    finally:
+        queue.stop()
+
+
+def test_long_silent_job_is_not_requeued_while_its_process_is_alive(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    runs = []
+
+    def silent(payload, context):
+        runs.append(payload)
+        time.sleep(1.0)
+        return {"runs": len(runs)}
+
+    first = JobQueue(path, workers=1, poll_interval=0.02, stale_after=0.2)
+    second = JobQueue(path, workers=1, poll_interval=0.02, stale_after=0.2)
+    for queue in (first, second):
+        queue.register("silent", silent)
+    job = first.enqueue("silent", {})
+    first.start()
+    try:
+        wait_for(first, job["job_id"], {RUNNING})
+        second.start()
+        assert wait_for(first, job["job_id"], {SUCCEEDED})["result"] == {"runs": 1}
+        assert len(runs) == 1
+    finally:
+        first.stop()
+        second.stop()
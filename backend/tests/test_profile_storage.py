@@ -0,0 +1,51 @@
+import pytest
+
+from app.models.profile_schemas import CompanyProfile
+from app.services.profile_storage import ProfileStorage
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "profiles.db")
+
+
+def test_cached_profile_is_reused_until_another_instance_updates_it(db_path, profile_payload):
+    storage, other = ProfileStorage(db_path), ProfileStorage(db_path)
+    profile, _ = storage.create(CompanyProfile(**profile_payload("Acme Inc")))
+
+    first = storage.read(profile.profile_id)
+    assert storage.read(profile.profile_id) is first
+    assert storage.cache_stats()["hits"] == 1
+
+    other.update(profile.profile_id, CompanyProfile(**profile_payload("Acme Renamed")))
+    fresh = storage.read(profile.profile_id)
+    assert fresh.organization.company_legal_name == "Acme Renamed"
+    assert storage.cache_stats()["stale"] == 1
+
+
+def test_recreated_profile_is_not_served_from_cache(db_path, profile_payload):
+    storage, other = ProfileStorage(db_path), ProfileStorage(db_path)
+    profile, version = storage.create(CompanyProfile(**profile_payload("Old Co", profile_id="p1")))
+    assert storage.read("p1").organization.company_legal_name == "Old Co"
+
+    # Same ID and the same version number, but a different row.
+    other.delete("p1")
+    _, recreated_version = other.create(CompanyProfile(**profile_payload("New Co", profile_id="p1")))
+    assert recreated_version == version
+    assert storage.read("p1").organization.company_legal_name == "New Co"
+
+    other.delete("p1")
+    assert storage.read("p1") is None
+
+
+def test_cache_evicts_least_recently_used(db_path, profile_payload):
+    storage = ProfileStorage(db_path, cache_size=2)
+    for profile_id in ("a", "b", "c"):
+        storage.create(CompanyProfile(**profile_payload(profile_id=profile_id)))
+        storage.read(profile_id)
+    storage.read("b")
+
+    stats = storage.cache_stats()
+    assert (stats["size"], stats["evictions"]) == (2, 1)
+    storage.read("a")
+    assert storage.cache_stats()["misses"] == stats["misses"] + 1
@@ -0,0 +1,47 @@
+def test_list_defaults_to_one_page_and_reports_total(client, profile_payload, company):
+    for i in range(105):
+        response = client.post("/api/profiles", json=profile_payload(company, profile_name=f"{company} {i:03}"))
+        assert response.status_code == 201
+
+    body = client.get("/api/profiles", params={"company": company}).json()
+    assert len(body["profiles"]) == 100
+    assert (body["total"], body["limit"], body["offset"]) == (105, 100, 0)
+
+    body = client.get("/api/profiles", params={"company": company, "offset": 100}).json()
+    assert [p["profile_name"] for p in body["profiles"]] == [f"{company} {i:03}" for i in range(100, 105)]
+    assert body["total"] == 105
+
+
+def test_list_rejects_out_of_range_limit(client):
+    assert client.get("/api/profiles", params={"limit": 0}).status_code == 422
+    assert client.get("/api/profiles", params={"limit": 1001}).status_code == 422
+
+
+def test_conditional_get_and_update(client, profile_payload, company):
+    created = client.post("/api/profiles", json=profile_payload(company))
+    profile_id, tag = created.json()["profile"]["profile_id"], created.headers["ETag"]
+    assert tag == '"1"'
+
+    cached = client.get(f"/api/profiles/{profile_id}", headers={"If-None-Match": tag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == tag
+    assert client.get(f"/api/profiles/{profile_id}", headers={"If-None-Match": '"0"'}).status_code == 200
+
+    url = f"/api/profiles/{profile_id}"
+    updated = client.put(url, json=profile_payload(company, profile_name="First edit"), headers={"If-Match": tag})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] == '"2"'
+
+    lost = client.put(url, json=profile_payload(company, profile_name="Lost edit"), headers={"If-Match": tag})
+    assert lost.status_code == 412
+    assert client.put(url, json=profile_payload(company), headers={"If-Match": "garbage"}).status_code == 412
+    assert client.get(url).json()["profile"]["profile_name"] == "First edit"
+
+    assert client.put(url, json=profile_payload(company), headers={"If-Match": 'W/"2"'}).headers["ETag"] == '"3"'
+    assert client.put(url, json=profile_payload(company), headers={"If-Match": "*"}).headers["ETag"] == '"4"'
+    assert client.get(url, headers={"If-None-Match": tag}).status_code == 200
+
+
+def test_update_of_missing_profile_is_not_found(client, profile_payload):
+    response = client.put("/api/profiles/missing", json=profile_payload(), headers={"If-Match": '"1"'})
+    assert response.status_code == 404
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import generate_from_profile
+from app.services.document_storage import document_storage
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def stream_client():
+    app = FastAPI()
+    app.include_router(generate_from_profile.router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def profile_id(client, profile_payload, company):
+    return client.post("/api/profiles", json=profile_payload(company)).json()["profile"]["profile_id"]
+
+
+def test_stream_sends_sections_then_done_and_stores_the_document(stream_client, profile_id, monkeypatch):
+    async def fake_stream(profile, docs, tone, stream_tokens):
+        yield {"event": "document_start", "doc": "tos", "title": "Terms", "sections": ["Intro"]}
+        yield {"event": "section", "doc": "tos", "section": "Intro", "index": 0, "markdown": "Hello"}
+        yield {"event": "document", "doc": "tos", "markdown": "# Terms\n\nHello"}
+
+    monkeypatch.setattr(generate_from_profile, "astream_from_profile", fake_stream)
+    response = stream_client.post(
+        "/api/generate-from-profile/stream", json={"profile_id": profile_id, "doc_types": ["tos"]}
+    )
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["document_start", "section", "document", "done"]
+    assert events[1][1] == {"doc": "tos", "section": "Intro", "index": 0, "markdown": "Hello"}
+    assert events[-1][1]["tos_md"] == "# Terms\n\nHello"
+    assert document_storage.find(profile_id, "tos", tone="plain")["sections"] == ["Intro"]
+
+
+def test_sections_finishing_out_of_order_are_stored_in_document_order(stream_client, profile_id, monkeypatch):
+    order = ["acceptance", "eligibility", "liability"]
+
+    async def fake_stream(profile, docs, tone, stream_tokens):
+        yield {"event": "document_start", "doc": "tos", "title": "Terms", "sections": order}
+        for index in (2, 0, 1):
+            yield {"event": "section", "doc": "tos", "section": order[index], "index": index, "markdown": order[index]}
+        yield {"event": "document", "doc": "tos", "markdown": "\n\n".join(order)}
+
+    monkeypatch.setattr(generate_from_profile, "astream_from_profile", fake_stream)
+    response = stream_client.post(
+        "/api/generate-from-profile/stream", json={"profile_id": profile_id, "doc_types": ["tos"]}
+    )
+    assert [data["section"] for name, data in parse_sse(response.text) if name == "section"] == [
+        "liability", "acceptance", "eligibility"
+    ]
+    document = document_storage.find(profile_id, "tos")
+    assert document["sections"] == order
+    markdown = document["markdown"]
+    assert markdown.index("acceptance") < markdown.index("eligibility") < markdown.index("liability")
+
+
+def test_stream_failure_ends_with_an_error_event(stream_client, profile_id, monkeypatch):
+    async def failing_stream(profile, docs, tone, stream_tokens):
+        yield {"event": "section", "doc": "tos", "section": "Intro", "index": 0, "markdown": "Hello"}
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(generate_from_profile, "astream_from_profile", failing_stream)
+    response = stream_client.post(
+        "/api/generate-from-profile/stream", json={"profile_id": profile_id, "doc_types": ["tos"]}
+    )
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["section", "error"]
+    assert events[-1][1] == {"detail": "model unavailable"}
+    assert document_storage.find(profile_id, "tos") is None
+
+
+def test_stream_for_missing_profile_is_not_found(stream_client):
+    response = stream_client.post("/api/generate-from-profile/stream", json={"profile_id": "missing", "doc_types": ["tos"]})
+    assert response.status_code == 404
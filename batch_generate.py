@@ -0,0 +1,80 @@
+"""
+Generate documents for many stored company profiles in one run.
+
+Identical section prompts are generated once across all profiles and every
+section call shares one concurrency limit. Each profile's documents are
+written to <out>/<profile_id>/ as soon as they are complete.
+
+Usage:
+    python batch_generate.py --all
+    python batch_generate.py --ids <profile_id> <profile_id> --docs tos --concurrency 16
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+os.environ.setdefault("PROFILE_DB_PATH", str(Path(__file__).parent / "backend" / "profiles.db"))
+
+from app.services.profile_storage import profile_storage
+from src.batch_generator import generate_batch
+from src.context_packing import stats as packing_stats
+from src.evals import checklist_tos, checklist_privacy
+
+def load_profiles(ids: list) -> list:
+    ids = ids or [summary["profile_id"] for summary in profile_storage.list_all()]
+    profiles = []
+    for profile_id in dict.fromkeys(ids):
+        profile = profile_storage.read(profile_id)
+        if profile is None:
+            raise SystemExit(f"✗ Profile {profile_id} not found in {profile_storage.db_path}")
+        profiles.append(profile)
+    return profiles
+
+def main(args):
+    profiles = load_profiles(args.ids)
+    os.makedirs(args.out, exist_ok=True)
+    failed = {}
+
+    done = []
+
+    def write_profile(profile_id: str, result: dict):
+        done.append(profile_id)
+        print(f"  [{len(done)}/{len(profiles)}] {profile_id} {'✗' if 'error' in result else '✓'}", flush=True)
+        if "error" in result:
+            failed[profile_id] = result["error"]
+            return
+        profile_dir = os.path.join(args.out, profile_id)
+        os.makedirs(profile_dir, exist_ok=True)
+        for key, filename, checklist in (("tos_md", "terms.md", checklist_tos), ("privacy_md", "privacy.md", checklist_privacy)):
+            if key in result:
+                with open(os.path.join(profile_dir, filename), "w", encoding="utf-8") as f:
+                    f.write(result[key])
+                if checks := checklist(result[key]):
+                    print(f"    {filename} warnings: {checks}")
+
+    start = time.perf_counter()
+    summary = generate_batch(profiles, args.docs, args.tone, args.concurrency, write_profile)
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ {len(profiles) - len(failed)}/{len(profiles)} profiles in {elapsed:.1f}s "
+          f"({summary['unique_sections']} unique of {summary['total_sections']} sections) -> {args.out}")
+    packing = packing_stats()
+    if packing["packed"]:
+        print(f"  context: {packing['tokens_out']} of {packing['tokens_in']} retrieved tokens sent "
+              f"({packing['saved_ratio']:.0%} saved, {packing['chunks_out']}/{packing['chunks_in']} chunks kept)")
+    for profile_id, error in failed.items():
+        print(f"✗ {profile_id}: {error}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--ids", nargs="+")
+    group.add_argument("--all", action="store_true")
+    parser.add_argument("--docs", nargs="+", default=["tos", "privacy"], choices=["tos", "privacy"])
+    parser.add_argument("--tone", default="plain", choices=["plain", "formal"])
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--out", default="out/batch")
+    main(parser.parse_args())
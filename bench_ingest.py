@@ -0,0 +1,71 @@
+"""
+Benchmark: single-process vs process-pool parse/split for ingestion.
+
+Fetches the CSV's pages once (or reads saved HTML files), optionally repeats
+them to simulate a larger corpus, then times the parse/split stage in-process
+and with process pools of increasing size.
+
+Usage:
+    python bench_ingest.py --csv data/saas_links.csv --repeat 20 --workers 2 4 8 16
+    python bench_ingest.py --html-dir pages/ --repeat 50
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src.fetcher import FetchResult, fetch_all
+from src.ingestion import CHUNK_OVERLAP, CHUNK_SIZE, _diff_text, _extract_text
+
+async def fetch_pages(csv_path: str) -> list:
+    df = pd.read_csv(csv_path, usecols=["Terms URL", "Privacy URL"])
+    urls = [u.strip() for u in df.values.ravel() if isinstance(u, str) and u.strip()]
+    return [result async for result in fetch_all(urls) if result.ok]
+
+def read_pages(html_dir: str) -> list:
+    return [
+        FetchResult(url=path.as_uri(), status=200, content=path.read_bytes(), content_type="text/html")
+        for path in sorted(Path(html_dir).glob("*.htm*"))
+    ]
+
+def parse_split(page: FetchResult):
+    """The ingestion parse/split stage, minus the raw store write."""
+    return _diff_text(page.url, _extract_text(page), None, CHUNK_SIZE, CHUNK_OVERLAP, {})
+
+def run(pages: list, workers: int) -> tuple:
+    start = time.perf_counter()
+    if workers <= 1:
+        updates = [parse_split(page) for page in pages]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            updates = list(pool.map(parse_split, pages, chunksize=4))
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(len(u.ids) for u in updates if u)
+
+def main(args):
+    base = read_pages(args.html_dir) if args.html_dir else asyncio.run(fetch_pages(args.csv))
+    pages = [
+        FetchResult(url=f"{page.url}#{i}", status=page.status, content=page.content, content_type=page.content_type)
+        for i in range(args.repeat) for page in base
+    ]
+    size_mb = sum(len(page.content) for page in pages) / 1e6
+    print(f"Pages: {len(pages)} ({len(base)} unique x {args.repeat}), {size_mb:.1f} MB of HTML")
+
+    baseline, chunks = run(pages, 1)
+    print(f"  single process: {baseline:.2f}s, {chunks} chunks")
+    for workers in args.workers:
+        elapsed, _ = run(pages, workers)
+        print(f"  {workers:>2} workers: {elapsed:.2f}s, speedup {baseline / elapsed:.2f}x "
+              f"(efficiency {baseline / elapsed / workers:.0%})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="data/saas_links.csv")
+    parser.add_argument("--html-dir")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    main(parser.parse_args())
@@ -28,9 +28,19 @@ export const getConfig = async (): Promise<ConfigResponse> => {
   return response.data;
 };
 
+const PROFILE_PAGE_SIZE = 1000;
+
 export const listProfiles = async (): Promise<ProfileListItem[]> => {
-  const response = await api.get<{ profiles: ProfileListItem[] }>('/api/profiles');
-  return response.data.profiles;
+  const profiles: ProfileListItem[] = [];
+  for (;;) {
+    const response = await api.get<{ profiles: ProfileListItem[]; total: number }>('/api/profiles', {
+      params: { limit: PROFILE_PAGE_SIZE, offset: profiles.length },
+    });
+    profiles.push(...response.data.profiles);
+    if (!response.data.profiles.length || profiles.length >= response.data.total) {
+      return profiles;
+    }
+  }
 };
 
 export const getProfile = async (profileId: string): Promise<CompanyProfile> => {
@@ -0,0 +1,85 @@
+"""
+Load test: health endpoint latency while generations are in flight.
+
+Starts N concurrent /api/generate requests, and with --profile-id M
+concurrent /api/regenerate-from-profile requests, against a running backend
+and polls /api/health meanwhile, reporting health latency percentiles. Use a
+profile without stored documents for its tone, so every regeneration runs in
+full.
+
+Usage:
+    python load_test.py --url http://localhost:8000 --generations 8
+    python load_test.py --generations 0 --profile-id <id> --regenerations 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Optional
+
+import httpx
+
+GENERATE_BODY = {
+    "product_vars": {
+        "product_name": "Legal Docs Gen",
+        "company_legal": "LDG Ltd.",
+        "contact_email": "legal@ldg.example",
+        "processors": ["Stripe"],
+    },
+    "docs": ["tos", "privacy"],
+    "tone": "plain",
+    "jurisdictions": ["US", "EU"],
+}
+
+async def generate(client: httpx.AsyncClient, url: str) -> float:
+    start = time.perf_counter()
+    r = await client.post(f"{url}/api/generate", json=GENERATE_BODY, timeout=None)
+    r.raise_for_status()
+    return time.perf_counter() - start
+
+async def regenerate(client: httpx.AsyncClient, url: str, profile_id: str) -> float:
+    start = time.perf_counter()
+    body = {"profile_id": profile_id, "doc_types": ["tos", "privacy"], "tone": "plain"}
+    r = await client.post(f"{url}/api/regenerate-from-profile", json=body, timeout=None)
+    r.raise_for_status()
+    return time.perf_counter() - start
+
+async def poll_health(client: httpx.AsyncClient, url: str, stop: asyncio.Event, interval: float) -> list:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        r = await client.get(f"{url}/api/health", timeout=30)
+        r.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+async def main(url: str, generations: int, interval: float, profile_id: Optional[str], regenerations: int):
+    if not profile_id:
+        regenerations = 0
+    async with httpx.AsyncClient() as client:
+        stop = asyncio.Event()
+        health = asyncio.create_task(poll_health(client, url, stop, interval))
+        durations = await asyncio.gather(
+            *(generate(client, url) for _ in range(generations)),
+            *(regenerate(client, url, profile_id) for _ in range(regenerations))
+        )
+        stop.set()
+        latencies = sorted(await health)
+
+    print(f"Generations: {generations}, regenerations: {regenerations}, "
+          f"slowest {max(durations, default=0.0):.1f}s")
+    if latencies:
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(f"Health checks: {len(latencies)}, median {statistics.median(latencies) * 1000:.1f}ms, "
+              f"p95 {p95 * 1000:.1f}ms, max {latencies[-1] * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--generations", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=0.2)
+    parser.add_argument("--profile-id", help="profile to run /api/regenerate-from-profile for")
+    parser.add_argument("--regenerations", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.generations, args.interval, args.profile_id, args.regenerations))
@@ -0,0 +1,164 @@
+"""
+Batch document generation for many company profiles.
+
+Renders every section prompt of every profile up front, deduplicates
+identical prompts across profiles and runs the unique generations through
+one bounded pool shared by the whole batch, at batch priority in the
+process-wide rate limiter. Retrieval and context packing run once per
+(doc_type, section), and each profile's documents are assembled and handed
+to a callback as soon as its last section finishes. Progress is logged, not
+printed, since batches also run inside background jobs.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from .chains import get_generation, get_section_prompt, section_context
+from .config import GENERATION_CONCURRENCY
+from .generator import _clean_section, assemble_document
+from .profile_generator import DOC_SPECS, get_conditional_sections, profile_section_inputs
+from .rate_limiter import BATCH, llm_priority
+
+logger = logging.getLogger(__name__)
+
+
+def unique_profiles(profiles: List) -> List:
+    """Drop repeated profile IDs, keeping the first occurrence of each."""
+    unique: Dict = {}
+    for profile in profiles:
+        unique.setdefault(profile.profile_id, profile)
+    return list(unique.values())
+
+
+def plan_batch(profiles: List, docs: List[str], tone: str = "plain") -> Dict:
+    """
+    Render the section prompts of every profile and group identical ones.
+    A profile ID passed more than once is planned once.
+
+    Returns:
+        {"prompts": {key: prompt_value}, "waiting": {key: [(profile_id, doc, section)]},
+        "sections": {profile_id: {doc: [section, ...]}}, "total": rendered prompt count}
+    """
+    generation = get_generation()
+    contexts: Dict = {}
+    plan = {"prompts": {}, "waiting": {}, "sections": {}, "total": 0}
+
+    for profile in unique_profiles(profiles):
+        plan["sections"][profile.profile_id] = {}
+        for doc, (_, doc_type, _) in DOC_SPECS.items():
+            if doc not in docs:
+                continue
+            sections = get_conditional_sections(profile, doc)
+            inputs = profile_section_inputs(profile, doc, tone)
+            for section in sections:
+                if (doc_type, section) not in contexts:
+                    contexts[(doc_type, section)] = section_context(section, doc_type)
+                prompt_value = get_section_prompt(section, doc_type).invoke(
+                    {**inputs(section), "context": contexts[(doc_type, section)]}
+                )
+                key = generation.cache_key(prompt_value)
+                plan["prompts"].setdefault(key, prompt_value)
+                plan["waiting"].setdefault(key, []).append((profile.profile_id, doc, section))
+                plan["total"] += 1
+            plan["sections"][profile.profile_id][doc] = sections
+
+    return plan
+
+
+def generate_batch(
+    profiles: List,
+    docs: List[str],
+    tone: str = "plain",
+    max_concurrency: Optional[int] = None,
+    on_profile: Optional[Callable[[str, Dict], None]] = None
+) -> Dict:
+    """
+    Generate documents for many profiles, sharing work across the batch.
+
+    Args:
+        profiles: CompanyProfile instances (profile_id must be set); repeated
+            IDs are generated and reported once
+        docs: List of documents to generate (["tos", "privacy"])
+        tone: Writing style ("plain" or "formal")
+        max_concurrency: Maximum in-flight LLM calls for the whole batch
+            (defaults to GENERATION_CONCURRENCY)
+        on_profile: Called as (profile_id, result) when a profile finishes, where
+            result has the shape of generate_from_profile's output, or {"error": ...}
+            if one of its sections failed; if it raises, the batch is aborted
+
+    Returns:
+        {"profiles": {profile_id: "succeeded" | "failed"}, "total_sections": n,
+        "unique_sections": m}
+    """
+    profiles = unique_profiles(profiles)
+    by_id = {profile.profile_id: profile for profile in profiles}
+    plan = plan_batch(profiles, docs, tone)
+    generation = get_generation()
+
+    remaining = {
+        profile_id: sum(len(sections) for sections in doc_sections.values())
+        for profile_id, doc_sections in plan["sections"].items()
+    }
+    bodies: Dict[str, Dict[str, Dict[str, str]]] = {profile_id: {} for profile_id in by_id}
+    errors: Dict[str, str] = {}
+    status: Dict[str, str] = {}
+
+    logger.info(
+        "Batch: %d profiles, %d sections, %d unique prompts", len(by_id), plan["total"], len(plan["prompts"])
+    )
+
+    def finish(profile_id: str):
+        profile = by_id[profile_id]
+        if profile_id in errors:
+            status[profile_id] = "failed"
+            result = {"error": errors[profile_id]}
+        else:
+            status[profile_id] = "succeeded"
+            eff = profile.organization.effective_date.isoformat()
+            result = {"sections": {}}
+            for doc, sections in plan["sections"][profile_id].items():
+                title, _, out_key = DOC_SPECS[doc]
+                doc_bodies = bodies[profile_id][doc]
+                result[out_key] = assemble_document(title, eff, sections, [doc_bodies[s] for s in sections])
+                result["sections"][doc] = {s: doc_bodies[s] for s in sections}
+        logger.info("[%d/%d] %s %s", len(status), len(by_id), profile.profile_name, status[profile_id])
+        if on_profile:
+            on_profile(profile_id, result)
+
+    for profile_id, count in remaining.items():
+        if count == 0:
+            finish(profile_id)
+
+    def run(prompt_value) -> str:
+        with llm_priority(BATCH):
+            return generation.invoke(prompt_value)
+
+    workers = max(1, min(max_concurrency or GENERATION_CONCURRENCY, len(plan["prompts"]) or 1))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            pool.submit(run, prompt_value): key
+            for key, prompt_value in plan["prompts"].items()
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                section_md = _clean_section(future.result())
+            except Exception as e:
+                section_md = None
+                error = str(e)
+            for profile_id, doc, section in plan["waiting"][key]:
+                if section_md is None:
+                    errors.setdefault(profile_id, f"{doc} section '{section}' failed: {error}")
+                else:
+                    bodies[profile_id].setdefault(doc, {})[section] = section_md
+                remaining[profile_id] -= 1
+                if remaining[profile_id] == 0:
+                    finish(profile_id)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    return {
+        "profiles": status,
+        "total_sections": plan["total"],
+        "unique_sections": len(plan["prompts"])
+    }
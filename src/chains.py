@@ -1,14 +1,27 @@
 """
 LangChain RAG chains for document generation.
 
-Builds retrieval-augmented generation chains for each document section.
+Builds retrieval-augmented generation chains for each document section and
+keeps a process-wide registry so each chain is built only once.
 """
+import asyncio
+import hashlib
 import json
+import time
+from threading import Lock
+from typing import AsyncIterator, Dict, List, Tuple
 from langchain_openai import ChatOpenAI
+from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
-from .vectordb import get_vectorstore
-from .prompts import SECTION_PROMPT
-from .config import OPENAI_MODEL
+from langchain_core.runnables import Runnable
+from .vectordb import get_vectorstore, reset_vectorstore
+from .context_packing import pack_context, section_budget
+from .retrieval import search_section, section_k
+from .retrieval_cache import get_cached_context, reset_retrieval_cache
+from .section_cache import SectionCache, get_section_cache
+from .prompts import SECTION_PROMPT, SECTION_TEMPLATE
+from .rate_limiter import RETRYABLE_ERRORS, estimate_tokens, get_rate_limiter
+from .config import OPENAI_MODEL, LLM_COMPLETION_TOKENS, LLM_MAX_RETRIES
 
 DEFAULT_MUSTS = {
     "tos:acceptance": [
@@ -162,42 +175,200 @@ DEFAULT_MUSTS = {
     ],
 }
 
+# Changes whenever the section prompt or its must-haves change; stored with
+# generated documents so sections written for an older prompt are not reused.
+PROMPT_VERSION = hashlib.sha256(
+    json.dumps([SECTION_TEMPLATE, DEFAULT_MUSTS], sort_keys=True).encode()
+).hexdigest()[:12]
+
+_registry_lock = Lock()
+_llms: Dict[Tuple[str, float], ChatOpenAI] = {}
+_chains: Dict[Tuple[str, str, str, float], Runnable] = {}
+_prompts: Dict[Tuple[str, str], Runnable] = {}
+_generations: Dict[Tuple[str, float], "CachedGeneration"] = {}
+_packed: Dict[Tuple[str, str], Tuple[List[Document], str]] = {}
+
+def get_llm(model: str = OPENAI_MODEL, temperature: float = 0.2) -> ChatOpenAI:
+    """Return the shared chat client for (model, temperature)."""
+    key = (model, temperature)
+    with _registry_lock:
+        llm = _llms.get(key)
+        if llm is None:
+            llm = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                max_retries=0,
+                model_kwargs={
+                    "top_p": 0.95,
+                    "frequency_penalty": 0.5
+                }
+            )
+            _llms[key] = llm
+        return llm
+
+class RateLimitedChat(Runnable):
+    """
+    Chat model step that waits for the shared RPM/TPM budget before each call.
+    
+    The cost is the prompt's token count plus LLM_COMPLETION_TOKENS. Rate-limit
+    and transient errors are retried with jittered backoff; a 429 also pauses
+    every other caller. Streams are only retried before the first chunk.
+    """
+
+    def __init__(self, llm: ChatOpenAI):
+        self.llm = llm
+
+    def _cost(self, prompt_value) -> int:
+        return estimate_tokens(prompt_value.to_string(), self.llm.model_name) + LLM_COMPLETION_TOKENS
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        return get_rate_limiter().backoff_for(attempt, error)
+
+    def invoke(self, input, config=None, **kwargs):
+        limiter, cost = get_rate_limiter(), self._cost(input)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            limiter.acquire(cost)
+            try:
+                return self.llm.invoke(input, config, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == LLM_MAX_RETRIES:
+                    raise
+                time.sleep(self._backoff(attempt, e))
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        limiter, cost = get_rate_limiter(), self._cost(input)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await limiter.aacquire(cost)
+            try:
+                return await self.llm.ainvoke(input, config, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == LLM_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+
+    async def astream(self, input, config=None, **kwargs):
+        limiter, cost = get_rate_limiter(), self._cost(input)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await limiter.aacquire(cost)
+            started = False
+            try:
+                async for chunk in self.llm.astream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except RETRYABLE_ERRORS as e:
+                if started or attempt == LLM_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+
+class CachedGeneration(Runnable):
+    """
+    Prompt -> section text step that serves repeated prompts from the section cache.
+    
+    Supports sync and async invocation as well as token streaming via astream;
+    a cache hit is emitted as a single chunk.
+    """
+
+    def __init__(self, llm: ChatOpenAI, llm_params: Dict):
+        self.generate = RateLimitedChat(llm) | StrOutputParser()
+        self.llm_params = llm_params
+
+    def cache_key(self, prompt_value) -> str:
+        return SectionCache.make_key(prompt_value.to_string(), self.llm_params)
+
+    def _lookup(self, prompt_value):
+        cache = get_section_cache()
+        if cache is None:
+            return None, None, None
+        key = self.cache_key(prompt_value)
+        return cache, key, cache.get(key)
+
+    def invoke(self, input, config=None, **kwargs) -> str:
+        cache, key, section_md = self._lookup(input)
+        if section_md is None:
+            section_md = self.generate.invoke(input, config)
+            if cache is not None:
+                cache.set(key, section_md)
+        return section_md
+
+    async def ainvoke(self, input, config=None, **kwargs) -> str:
+        cache, key, section_md = self._lookup(input)
+        if section_md is None:
+            section_md = await self.generate.ainvoke(input, config)
+            if cache is not None:
+                cache.set(key, section_md)
+        return section_md
+
+    async def astream(self, input, config=None, **kwargs) -> AsyncIterator[str]:
+        cache, key, section_md = self._lookup(input)
+        if section_md is not None:
+            yield section_md
+            return
+        parts = []
+        async for chunk in self.generate.astream(input, config):
+            parts.append(chunk)
+            yield chunk
+        if cache is not None:
+            cache.set(key, "".join(parts))
+
 def make_retriever(k: int = 12):
     """Create a retriever that returns top k most similar chunks."""
     vs = get_vectorstore()
     return vs.as_retriever(search_kwargs={"k": k})
 
-def build_section_chain(section_name: str, doc_type: str):
+def retrieve_section_context(section_name: str, doc_type: str):
     """
-    Build a LangChain RAG chain for generating a specific document section.
+    Return a section's context chunks, from the retrieval cache when possible.
     
-    Args:
-        section_name: Name of the section (e.g., "acceptance", "liability")
-        doc_type: Type of document ("ToS" or "Privacy")
-        
-    Returns:
-        Configured LangChain chain that generates section content
+    Misses search chunks tagged with the section's doc_type and section, with
+    the section's k (see retrieval.section_k).
     """
-    retriever = make_retriever()
-    llm = ChatOpenAI(
-        model=OPENAI_MODEL,
-        temperature=0.2,
-        model_kwargs={
-            "top_p": 0.95,
-            "frequency_penalty": 0.5
-        }
-    )
+    k = section_k(doc_type, section_name)
+    docs = get_cached_context(doc_type, section_name, k)
+    if docs is None:
+        docs = search_section(get_vectorstore(), doc_type, section_name, k)
+    return docs
+
+def section_context(section_name: str, doc_type: str) -> str:
+    """
+    Return a section's deduplicated, token-budgeted context text.
+    
+    The packed text is reused for as long as retrieval keeps returning the
+    same cached chunks.
+    """
+    docs = retrieve_section_context(section_name, doc_type)
+    key = (doc_type, section_name)
+    with _registry_lock:
+        entry = _packed.get(key)
+    if entry is not None and entry[0] is docs:
+        return entry[1]
+    text = pack_context(docs, section_budget(doc_type, section_name)).text
+    with _registry_lock:
+        _packed[key] = (docs, text)
+    return text
 
+def build_section_prompt(section_name: str, doc_type: str) -> Runnable:
+    """
+    Build the retrieval + prompt stage of a section chain.
+    
+    Maps chain inputs (product_vars, tone, jurisdictions) to the rendered
+    SECTION_PROMPT for the section. Inputs may carry precomputed "context"
+    text (see section_context), in which case retrieval is skipped.
+    """
     def musts_key():
         prefix = "tos" if doc_type.lower().startswith("tos") or doc_type.lower()=="tos" else "privacy"
         key = f"{prefix}:{section_name}"
         return DEFAULT_MUSTS.get(key, [])
 
-    retriever_query = f"{doc_type} {section_name} section"
+    def retrieve_context(x):
+        context = x.get("context")
+        if context is None:
+            context = section_context(section_name, doc_type)
+        return context
 
-    chain = (
+    return (
         {
-            "context": (lambda _: retriever_query) | retriever,
+            "context": retrieve_context,
             "section_name": lambda x: section_name,
             "doc_type": lambda x: doc_type,
             "must_haves": lambda x: "\n- ".join([""] + musts_key()),
@@ -206,8 +377,81 @@ def build_section_chain(section_name: str, doc_type: str):
             "jurisdictions": lambda x: ", ".join(x["jurisdictions"]),
         }
         | SECTION_PROMPT
-        | llm
-        | StrOutputParser()
     )
+
+def get_section_prompt(section_name: str, doc_type: str) -> Runnable:
+    """Return the shared retrieval + prompt stage for a section."""
+    key = (doc_type, section_name)
+    with _registry_lock:
+        prompt = _prompts.get(key)
+    if prompt is None:
+        prompt = build_section_prompt(section_name, doc_type)
+        with _registry_lock:
+            prompt = _prompts.setdefault(key, prompt)
+    return prompt
+
+def get_generation(model: str = OPENAI_MODEL, temperature: float = 0.2) -> CachedGeneration:
+    """Return the shared cached generation step for (model, temperature)."""
+    llm = get_llm(model, temperature)
+    key = (model, temperature)
+    with _registry_lock:
+        generation = _generations.get(key)
+        if generation is None:
+            llm_params = {"model": model, "temperature": temperature, **llm.model_kwargs}
+            generation = CachedGeneration(llm, llm_params)
+            _generations[key] = generation
+        return generation
+
+def build_section_chain(
+    section_name: str,
+    doc_type: str,
+    model: str = OPENAI_MODEL,
+    temperature: float = 0.2
+):
+    """
+    Build a LangChain RAG chain for generating a specific document section.
+    
+    Args:
+        section_name: Name of the section (e.g., "acceptance", "liability")
+        doc_type: Type of document ("ToS" or "Privacy")
+        model: Chat model name
+        temperature: Sampling temperature
+        
+    Returns:
+        Configured LangChain chain that generates section content
+    """
+    return get_section_prompt(section_name, doc_type) | get_generation(model, temperature)
+
+def get_section_chain(
+    section_name: str,
+    doc_type: str,
+    model: str = OPENAI_MODEL,
+    temperature: float = 0.2
+):
+    """
+    Return the shared chain for a section, building it on first use.
+    
+    Chains are keyed by (doc_type, section_name, model, temperature) and reuse
+    the process-wide vectorstore, embeddings client and chat client.
+    """
+    key = (doc_type, section_name, model, temperature)
+    with _registry_lock:
+        chain = _chains.get(key)
+    if chain is None:
+        chain = build_section_chain(section_name, doc_type, model, temperature)
+        with _registry_lock:
+            chain = _chains.setdefault(key, chain)
     return chain
 
+def invalidate_chains():
+    """
+    Drop all cached chains and the shared vectorstore.
+    
+    Call after the index is rebuilt so retrievers pick up the new collection.
+    """
+    with _registry_lock:
+        _chains.clear()
+        _prompts.clear()
+        _packed.clear()
+    reset_vectorstore()
+    reset_retrieval_cache()
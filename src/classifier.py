@@ -0,0 +1,144 @@
+"""
+Ingest-time classification of legal pages and chunks.
+
+Pages get a doc_type ("tos" or "privacy") from URL and text keyword scores,
+so cookie policies file under privacy and acceptable-use policies under
+terms. Each chunk is tagged with the most likely ToS/Privacy section, using
+the nearest preceding heading (weighted) and the chunk's own text, and with
+a flag per jurisdiction whose laws or regulators it mentions. Bump
+CLASSIFIER_VERSION when the rules change; ingestion then re-tags every page.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+CLASSIFIER_VERSION = 2
+
+URL_HINTS = {
+    "privacy": ["privacy", "cookie", "data-protection", "gdpr", "ccpa", "dpa"],
+    "tos": ["terms", "tos", "user-agreement", "acceptable-use", "aup", "eula", "legal/cloud", "customer-agreement"],
+}
+
+TEXT_HINTS = {
+    "privacy": [
+        "personal data", "personal information", "privacy policy", "data controller", "data subject",
+        "cookies", "we collect", "gdpr", "ccpa", "retention", "opt out",
+    ],
+    "tos": [
+        "terms of service", "terms of use", "these terms", "you agree", "agreement", "liability",
+        "governing law", "indemnif", "termination", "acceptable use", "warrant",
+    ],
+}
+
+SECTION_KEYWORDS: Dict[str, Dict[str, List[str]]] = {
+    "tos": {
+        "acceptance": ["acceptance", "accept these terms", "agree to these terms", "binding agreement", "by using"],
+        "eligibility": ["eligib", "years of age", "minimum age", "at least 13", "at least 16", "at least 18"],
+        "accounts": ["account", "password", "credentials", "registration", "sign up"],
+        "user content": ["user content", "your content", "content you submit", "upload", "customer data"],
+        "intellectual property": ["intellectual property", "copyright", "trademark", "proprietary", "license to use"],
+        "acceptable use": ["acceptable use", "prohibited", "you may not", "misuse", "abuse", "restrictions"],
+        "subscriptions & billing": ["billing", "payment", "subscription", "fees", "refund", "renewal", "price"],
+        "third-party services": ["third-party", "third party", "integrations", "links to other"],
+        "changes to terms": ["changes to these terms", "modify these terms", "update these terms", "amend"],
+        "liability": ["liability", "disclaimer", "as is", "warrant", "indemnif", "damages"],
+        "governing law": ["governing law", "jurisdiction", "arbitration", "dispute", "venue", "courts of"],
+        "termination": ["terminat", "suspend", "suspension", "close your account"],
+        "general provisions": ["severab", "waiver", "assignment", "force majeure", "entire agreement", "miscellaneous"],
+        "contact": ["contact us", "questions about these terms", "email us", "notices"],
+    },
+    "privacy": {
+        "scope": ["scope", "this policy applies", "who we are", "introduction", "controller"],
+        "data we collect": ["information we collect", "data we collect", "we collect", "categories of personal"],
+        "how we use data": ["how we use", "purposes", "legal basis", "legitimate interest", "use your information"],
+        "sharing and disclosure": ["share", "disclos", "sell", "service providers", "law enforcement"],
+        "third-party services": ["third-party", "third party", "processors", "subprocessor"],
+        "international transfers": ["international transfer", "transfer", "standard contractual clauses", "adequacy", "outside the"],
+        "data retention": ["retention", "retain", "how long", "delete"],
+        "security": ["security", "encrypt", "safeguard", "protect your"],
+        "your rights": ["your rights", "right to access", "rectif", "erasure", "portability", "opt out", "object"],
+        "children": ["children", "under 13", "under the age", "minors", "coppa", "parental"],
+        "cookies and tracking": ["cookie", "tracking", "pixel", "web beacon", "do not track", "analytics"],
+        "changes to policy": ["changes to this", "update this policy", "modify this policy", "notify you of changes"],
+        "contact": ["contact us", "data protection officer", "dpo", "questions about this policy"],
+    },
+}
+
+JURISDICTION_HINTS = {
+    "US": ["ccpa", "cpra", "california", "united states", "coppa", "u.s. "],
+    "EU": ["gdpr", "european union", "european economic area", "eea", "standard contractual clauses"],
+    "UK": ["united kingdom", "uk gdpr", "england and wales", "information commissioner"],
+    "CA": ["canada", "pipeda", "quebec"],
+    "AU": ["australia", "australian privacy principles"],
+    "IL": ["israel", "privacy protection authority"],
+}
+
+HEADING_WEIGHT = 3
+MIN_SECTION_SCORE = 2
+
+_heading = re.compile(r"^(?:\d+(?:\.\d+)*[.)]?\s+)?[A-Z][^\n]{1,80}$")
+
+
+def _count(text: str, keywords: List[str]) -> int:
+    return sum(text.count(keyword) for keyword in keywords)
+
+
+def classify_doc_type(url: str, text: str) -> str:
+    """Return "tos", "privacy" or "unknown" for a page."""
+    u = (url or "").lower()
+    head = text[:5000].lower()
+    scores = {
+        doc_type: HEADING_WEIGHT * sum(hint in u for hint in URL_HINTS[doc_type]) + _count(head, TEXT_HINTS[doc_type])
+        for doc_type in URL_HINTS
+    }
+    best = max(scores, key=scores.get)
+    if scores[best] == 0 or scores["tos"] == scores["privacy"]:
+        return "unknown"
+    return best
+
+
+def find_headings(text: str) -> List[Tuple[int, str]]:
+    """(offset, heading) for short, title-like lines without a trailing full stop."""
+    headings = []
+    offset = 0
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if stripped and _heading.match(stripped) and not stripped.endswith((".", ",", ";")) and len(stripped.split()) <= 10:
+            headings.append((offset, stripped))
+        offset += len(line) + 1
+    return headings
+
+
+def tag_section(doc_type: str, chunk_text: str, heading: Optional[str] = None) -> Optional[str]:
+    """Most likely section of doc_type for a chunk, or None when nothing scores high enough."""
+    sections = SECTION_KEYWORDS.get(doc_type)
+    if not sections:
+        return None
+    body = chunk_text.lower()
+    title = (heading or "").lower()
+    scores = {
+        section: HEADING_WEIGHT * _count(title, keywords) + _count(body, keywords)
+        for section, keywords in sections.items()
+    }
+    best = max(scores, key=scores.get)
+    return best if scores[best] >= MIN_SECTION_SCORE else None
+
+
+def heading_at(headings: List[Tuple[int, str]], offset: int) -> Optional[str]:
+    """The last heading starting at or before offset."""
+    current = None
+    for start, heading in headings:
+        if start > offset:
+            break
+        current = heading
+    return current
+
+
+def jurisdiction_key(code: str) -> str:
+    """Chunk metadata flag set when the chunk mentions jurisdiction `code`."""
+    return f"jurisdiction_{code.lower()}"
+
+
+def detect_jurisdictions(text: str) -> List[str]:
+    """Codes of the jurisdictions whose laws, regulators or names appear in text."""
+    lowered = text.lower()
+    return [code for code, hints in JURISDICTION_HINTS.items() if any(hint in lowered for hint in hints)]
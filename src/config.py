@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -7,8 +8,56 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 OPENAI_EMBED_MODEL = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-large")
 
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
 CHROMA_DIR = os.getenv("CHROMA_DIR", "storage/vectorstore")
 CSV_PATH = os.getenv("CSV_PATH", "data/saas_links.csv")
+STORAGE_DIR = os.path.dirname(os.path.normpath(CHROMA_DIR))
+RETRIEVAL_CACHE_PATH = os.getenv("RETRIEVAL_CACHE_PATH", os.path.join(STORAGE_DIR, "retrieval_cache.json"))
+NUMPY_INDEX_DIR = os.getenv("NUMPY_INDEX_DIR", os.path.join(STORAGE_DIR, "numpy_index"))
+INDEX_DIR = NUMPY_INDEX_DIR if VECTOR_BACKEND == "numpy" else CHROMA_DIR
+
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "32"))
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", "4"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "20"))
+FETCH_RETRIES = int(os.getenv("FETCH_RETRIES", "3"))
+FETCH_MAX_RETRY_AFTER = float(os.getenv("FETCH_MAX_RETRY_AFTER", "60"))
+INGEST_MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", os.path.join(INDEX_DIR, "ingest_manifest.json"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "16"))
+INGEST_UPSERT_BATCH = int(os.getenv("INGEST_UPSERT_BATCH", "256"))
+INGEST_PARSE_WORKERS = int(os.getenv("INGEST_PARSE_WORKERS", str(os.cpu_count() or 1)))
+RAW_STORE_DIR = os.getenv("RAW_STORE_DIR", os.path.join(STORAGE_DIR, "raw_store"))
+
+# Chunks retrieved per section; override per section with JSON such as {"privacy:your rights": 8}.
+SECTION_K = int(os.getenv("SECTION_K", "12"))
+SECTION_K_OVERRIDES = json.loads(os.getenv("SECTION_K_OVERRIDES", "{}"))
+PRIVACY_K = int(os.getenv("PRIVACY_K", "5"))
+RETRIEVAL_SEARCH_TYPE = os.getenv("RETRIEVAL_SEARCH_TYPE", "mmr")
+RETRIEVAL_FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", "40"))
+RETRIEVAL_MMR_LAMBDA = float(os.getenv("RETRIEVAL_MMR_LAMBDA", "0.7"))
+# Context tokens per section prompt after deduplication; overrides use the SECTION_K_OVERRIDES keys.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+CONTEXT_TOKEN_BUDGET_OVERRIDES = json.loads(os.getenv("CONTEXT_TOKEN_BUDGET_OVERRIDES", "{}"))
+CONTEXT_DUP_THRESHOLD = float(os.getenv("CONTEXT_DUP_THRESHOLD", "0.8"))
+
+GENERATION_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", "8"))
+
+# Per-process chat model budget; 0 disables a limit. Divide the account quota by the number of processes.
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))
+LLM_TPM = int(os.getenv("LLM_TPM", "450000"))
+LLM_COMPLETION_TOKENS = int(os.getenv("LLM_COMPLETION_TOKENS", "1024"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "512"))
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "200000"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_RPM = int(os.getenv("EMBED_RPM", "3000"))
+EMBED_TPM = int(os.getenv("EMBED_TPM", "1000000"))
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", os.path.join(STORAGE_DIR, "embedding_cache.sqlite3"))
+
+SECTION_CACHE_BACKEND = os.getenv("SECTION_CACHE_BACKEND", "memory")
+SECTION_CACHE_PATH = os.getenv("SECTION_CACHE_PATH", os.path.join(STORAGE_DIR, "section_cache.sqlite3"))
+SECTION_CACHE_TTL = int(os.getenv("SECTION_CACHE_TTL", str(7 * 24 * 3600)))
+SECTION_CACHE_MAX_ENTRIES = int(os.getenv("SECTION_CACHE_MAX_ENTRIES", "5000"))
 
 if not OPENAI_API_KEY:
     raise RuntimeError("OPENAI_API_KEY not set. Create .env from .env.example")
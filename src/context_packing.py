@@ -0,0 +1,137 @@
+"""
+Context assembly between retrieval and the section prompt.
+
+Retrieved chunks repeat each other: adjacent chunks of one page share
+CHUNK_OVERLAP characters, and many providers publish near-identical
+boilerplate. Packing merges overlapping chunks of the same page, drops
+chunks whose word shingles are mostly contained in a chunk already kept,
+and keeps the rest in retrieval (relevance) order until the section's token
+budget is spent. Totals of tokens retrieved vs. sent are kept per process.
+"""
+import re
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, List, Sequence, Set
+from langchain_core.documents import Document
+from .config import CONTEXT_DUP_THRESHOLD, CONTEXT_TOKEN_BUDGET, CONTEXT_TOKEN_BUDGET_OVERRIDES, OPENAI_MODEL
+from .rate_limiter import estimate_tokens
+
+SHINGLE_SIZE = 5
+SEPARATOR = "\n\n"
+
+_word = re.compile(r"\w+")
+
+
+@dataclass
+class PackedContext:
+    text: str
+    chunks_in: int
+    chunks_out: int
+    tokens_in: int
+    tokens_out: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+
+def section_budget(doc_type: str, section_name: str) -> int:
+    """Context tokens for a section: CONTEXT_TOKEN_BUDGET unless overridden as "doc_type:section"."""
+    return CONTEXT_TOKEN_BUDGET_OVERRIDES.get(f"{doc_type.lower()}:{section_name}", CONTEXT_TOKEN_BUDGET)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashes of the text's overlapping `size`-word sequences."""
+    words = _word.findall(text.lower())
+    if len(words) <= size:
+        return {hash(tuple(words))} if words else set()
+    return {hash(tuple(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+
+def containment(a: Set[int], b: Set[int]) -> float:
+    """Fraction of a's shingles that also occur in b."""
+    return len(a & b) / len(a) if a else 1.0
+
+
+def merge_overlapping(docs: Sequence[Document]) -> List[Document]:
+    """
+    Merge chunks of the same page whose character ranges overlap or touch.
+
+    Relies on the start_index recorded at ingest; chunks without one are kept
+    as they are. Each merged chunk takes the rank of its best-ranked part.
+    """
+    ranked, by_source = [], {}
+    for rank, doc in enumerate(docs):
+        start = doc.metadata.get("start_index")
+        if start is None:
+            ranked.append((rank, doc))
+        else:
+            by_source.setdefault(doc.metadata.get("source"), []).append((start, rank, doc))
+
+    for parts in by_source.values():
+        parts.sort(key=lambda part: part[0])
+        start, rank, doc = parts[0]
+        text = doc.page_content
+        for next_start, next_rank, next_doc in parts[1:]:
+            end = start + len(text)
+            if next_start <= end:
+                text += next_doc.page_content[end - next_start:]
+                rank = min(rank, next_rank)
+            else:
+                ranked.append((rank, Document(page_content=text, metadata=doc.metadata)))
+                start, rank, doc, text = next_start, next_rank, next_doc, next_doc.page_content
+        ranked.append((rank, Document(page_content=text, metadata=doc.metadata)))
+
+    return [doc for _, doc in sorted(ranked, key=lambda item: item[0])]
+
+
+_lock = Lock()
+_totals = {"packed": 0, "chunks_in": 0, "chunks_out": 0, "tokens_in": 0, "tokens_out": 0}
+
+
+def pack_context(
+    docs: Sequence[Document],
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    threshold: float = CONTEXT_DUP_THRESHOLD
+) -> PackedContext:
+    """
+    Deduplicate retrieved chunks and pack them into at most `budget` tokens.
+
+    Args:
+        docs: Chunks in retrieval order, most relevant first
+        budget: Token cap for the packed text
+        threshold: Shingle containment at which a chunk counts as a duplicate
+
+    Returns:
+        PackedContext with the prompt text and before/after sizes
+    """
+    tokens_in = sum(estimate_tokens(doc.page_content, OPENAI_MODEL) for doc in docs)
+    kept, kept_shingles, used = [], [], 0
+    for doc in merge_overlapping(docs):
+        doc_shingles = shingles(doc.page_content)
+        if any(containment(doc_shingles, other) >= threshold for other in kept_shingles):
+            continue
+        tokens = estimate_tokens(doc.page_content, OPENAI_MODEL)
+        if used + tokens > budget:
+            continue
+        kept.append(doc.page_content)
+        kept_shingles.append(doc_shingles)
+        used += tokens
+
+    packed = PackedContext(SEPARATOR.join(kept), len(docs), len(kept), tokens_in, used)
+    with _lock:
+        _totals["packed"] += 1
+        _totals["chunks_in"] += packed.chunks_in
+        _totals["chunks_out"] += packed.chunks_out
+        _totals["tokens_in"] += packed.tokens_in
+        _totals["tokens_out"] += packed.tokens_out
+    return packed
+
+
+def stats() -> Dict[str, Any]:
+    """Process-wide packing totals, including tokens saved."""
+    with _lock:
+        totals = dict(_totals)
+    totals["tokens_saved"] = totals["tokens_in"] - totals["tokens_out"]
+    totals["saved_ratio"] = totals["tokens_saved"] / totals["tokens_in"] if totals["tokens_in"] else 0.0
+    return totals
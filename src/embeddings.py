@@ -0,0 +1,193 @@
+"""
+Batched, cached embeddings.
+
+Wraps OpenAIEmbeddings so every vector is computed once: texts are looked up
+in an on-disk cache keyed by (model, text hash), and only the misses are sent
+to the API, in batches sized by input count and token total, several batches
+at a time under the embeddings rate limit.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+from .config import EMBED_BATCH_SIZE, EMBED_BATCH_TOKENS, EMBED_CONCURRENCY, LLM_MAX_RETRIES
+from .rate_limiter import BATCH, RETRYABLE_ERRORS, estimate_tokens, get_rate_limiter
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """On-disk float32 vectors keyed by (model, text hash), shared across processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (model, text_hash))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        with conn:
+            yield conn
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        hashes = list(hashes)
+        found = {}
+        with self._lock, self._transaction() as conn:
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    (model, *batch)
+                )
+                for digest, blob in rows:
+                    found[digest] = array("f", blob).tolist()
+        return found
+
+    def set_many(self, model: str, vectors: Dict[str, List[float]]):
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, created_at) VALUES (?, ?, ?, ?)",
+                [(model, digest, array("f", vector).tobytes(), now) for digest, vector in vectors.items()]
+            )
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings that serve repeated texts from an EmbeddingCache.
+
+    Document misses are embedded in batches of at most batch_size texts and
+    batch_tokens tokens, up to `concurrency` batches at once, at batch priority
+    in the embeddings rate limiter. Query misses go out immediately at the
+    caller's priority. Each batch is written to the cache as soon as it
+    returns, so a batch that fails does not discard the ones already paid for.
+    """
+
+    def __init__(
+        self,
+        embeddings: OpenAIEmbeddings,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = EMBED_BATCH_SIZE,
+        batch_tokens: int = EMBED_BATCH_TOKENS,
+        concurrency: int = EMBED_CONCURRENCY
+    ):
+        self.embeddings = embeddings
+        self.model = embeddings.model
+        self.cache = cache
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.concurrency = concurrency
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def _count(self, hits: int, misses: int):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _call(self, fn, texts: List[str], tokens: int, priority: Optional[int] = None):
+        limiter = get_rate_limiter("embeddings")
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            limiter.acquire(tokens, priority)
+            try:
+                return fn(texts)
+            except RETRYABLE_ERRORS as e:
+                if attempt == LLM_MAX_RETRIES:
+                    raise
+                time.sleep(limiter.backoff_for(attempt, e))
+
+    def _batches(self, texts: List[str]) -> List[tuple]:
+        batches, batch, batch_tokens = [], [], 0
+        for text in texts:
+            tokens = estimate_tokens(text, self.model)
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > self.batch_tokens):
+                batches.append((batch, batch_tokens))
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append((batch, batch_tokens))
+        return batches
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.model, set(hashes)) if self.cache is not None else {}
+        missing = {digest: text for digest, text in zip(hashes, texts) if digest not in vectors}
+        n_missing = sum(1 for digest in hashes if digest in missing)
+        self._count(len(texts) - n_missing, n_missing)
+
+        if missing:
+            batches = self._batches(list(missing.values()))
+
+            def embed(batch: tuple) -> Dict[str, List[float]]:
+                batch_texts, tokens = batch
+                batch_vectors = self._call(self.embeddings.embed_documents, batch_texts, tokens, priority=BATCH)
+                fresh = {text_hash(text): vector for text, vector in zip(batch_texts, batch_vectors)}
+                if self.cache is not None:
+                    self.cache.set_many(self.model, fresh)
+                return fresh
+
+            with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(batches)))) as pool:
+                for fresh in pool.map(embed, batches):
+                    vectors.update(fresh)
+
+        return [vectors[digest] for digest in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        digest = text_hash(text)
+        cached = self.cache.get_many(self.model, [digest]) if self.cache is not None else {}
+        if digest in cached:
+            self._count(1, 0)
+            return cached[digest]
+        self._count(0, 1)
+        vector = self._call(
+            lambda texts: [self.embeddings.embed_query(texts[0])], [text], estimate_tokens(text, self.model)
+        )[0]
+        if self.cache is not None:
+            self.cache.set_many(self.model, {digest: vector})
+        return vector
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "model": self.model,
+            "entries": len(self.cache) if self.cache is not None else 0,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
@@ -0,0 +1,181 @@
+"""
+Concurrent HTTP fetching for ingestion.
+
+Fetches many URLs over one pooled async client with a global and a per-host
+concurrency limit, per-request timeouts and retries with jittered backoff
+(honouring Retry-After up to FETCH_MAX_RETRY_AFTER). URLs are queued per host
+and workers only take a URL whose host has a free slot, so one busy host
+never holds workers that could be fetching from others.
+Validators (ETag / Last-Modified) from the ingestion manifest are sent as
+conditional GET headers, so unchanged pages come back as cheap 304s. Results
+are yielded in completion order so parsing can start while other pages are
+in flight.
+"""
+import asyncio
+import random
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, List, Optional
+from urllib.parse import urlsplit
+import httpx
+from .config import (
+    FETCH_CONCURRENCY,
+    FETCH_PER_HOST,
+    FETCH_TIMEOUT,
+    FETCH_RETRIES,
+    FETCH_MAX_RETRY_AFTER,
+)
+
+USER_AGENT = "Mozilla/5.0 (compatible; legal-docs-gen ingestion)"
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = 0
+    content: bytes = b""
+    content_type: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+    def validators(self) -> Dict[str, str]:
+        return {k: v for k, v in (("etag", self.etag), ("last_modified", self.last_modified)) if v}
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    delay = random.uniform(0, min(30.0, 0.5 * 2 ** attempt))
+    if response is not None:
+        try:
+            delay = max(delay, min(FETCH_MAX_RETRY_AFTER, float(response.headers.get("retry-after"))))
+        except (TypeError, ValueError):
+            pass
+    return delay
+
+
+async def fetch_url(
+    client: httpx.AsyncClient,
+    url: str,
+    validators: Optional[Dict[str, str]] = None,
+    retries: int = FETCH_RETRIES
+) -> FetchResult:
+    """GET one URL, retrying timeouts, transport errors and 408/429/5xx responses."""
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            response = await client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            if attempt == retries:
+                return FetchResult(url, error=f"{type(e).__name__}: {e}")
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                break
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+    if response.status_code == 304:
+        validators = validators or {}
+        return FetchResult(url, status=304, etag=validators.get("etag"), last_modified=validators.get("last_modified"))
+    if response.status_code >= 400:
+        return FetchResult(url, status=response.status_code, error=f"HTTP {response.status_code}")
+    return FetchResult(
+        url,
+        status=response.status_code,
+        content=response.content,
+        content_type=response.headers.get("content-type", "").split(";")[0].strip(),
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified")
+    )
+
+
+async def fetch_all(
+    urls: List[str],
+    validators: Optional[Dict[str, Dict[str, str]]] = None,
+    concurrency: int = FETCH_CONCURRENCY,
+    per_host: int = FETCH_PER_HOST,
+    timeout: float = FETCH_TIMEOUT,
+    retries: int = FETCH_RETRIES
+) -> AsyncIterator[FetchResult]:
+    """
+    Fetch URLs concurrently and yield results as they complete.
+
+    At most `concurrency` finished results are buffered; fetching pauses until
+    the consumer catches up, so memory stays bounded however many URLs there are.
+
+    Args:
+        urls: URLs to fetch (duplicates are fetched once)
+        validators: Per-URL ETag/Last-Modified from an earlier fetch, for conditional GETs
+        concurrency: Maximum requests in flight overall
+        per_host: Maximum requests in flight per host
+        timeout: Per-request timeout in seconds
+        retries: Retries per URL after the first attempt
+    """
+    validators = validators or {}
+    urls = list(dict.fromkeys(urls))
+    pending: Dict[str, Deque[str]] = {}
+    for url in urls:
+        pending.setdefault(urlsplit(url).netloc, deque()).append(url)
+    active: Counter = Counter()
+    freed = asyncio.Condition()
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        limits=limits,
+        timeout=httpx.Timeout(timeout),
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT}
+    ) as client:
+
+        def take() -> Optional[str]:
+            # Round-robin over hosts with queued URLs and a free slot.
+            for host, queue in pending.items():
+                if active[host] < per_host:
+                    url = queue.popleft()
+                    del pending[host]
+                    if queue:
+                        pending[host] = queue
+                    active[host] += 1
+                    return url
+            return None
+
+        async def worker():
+            while pending:
+                url = take()
+                if url is None:
+                    async with freed:
+                        await freed.wait()
+                    continue
+                host = urlsplit(url).netloc
+                try:
+                    result = await fetch_url(client, url, validators.get(url), retries)
+                except Exception as e:
+                    result = FetchResult(url, error=f"{type(e).__name__}: {e}")
+                finally:
+                    active[host] -= 1
+                    async with freed:
+                        freed.notify_all()
+                await results.put(result)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(urls)))]
+        try:
+            for _ in urls:
+                yield await results.get()
+        finally:
+            for task in workers:
+                task.cancel()
@@ -1,12 +1,19 @@
 """
 Core document generation orchestration.
 
-Generates legal documents section by section using RAG chains.
+Generates legal documents section by section using RAG chains,
+running section calls concurrently and reassembling them in order.
 """
-from typing import Dict, List
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+import asyncio
+import contextvars
+from concurrent.futures import FIRST_EXCEPTION, CancelledError, ThreadPoolExecutor, wait
+from functools import partial
+from threading import Event, Lock
 from datetime import date
 import re
-from .chains import build_section_chain
+from .chains import get_section_chain
+from .config import GENERATION_CONCURRENCY
 
 JURISDICTION_NAMES = {
     "US": "United States",
@@ -69,15 +76,209 @@ PRIVACY_SECTIONS = [
     "contact"
 ]
 
-def generate_docs(product_vars: Dict, docs: List[str], tone: str, jurisdictions: List[str]) -> Dict[str, str]:
+def _clean_section(section_md: str) -> str:
+    section_md = clean_scaffolding(section_md)
+    return re.sub(r'^##\s+.*\n', '', section_md, count=1)
+
+def generate_sections(
+    sections: List[str],
+    doc_type: str,
+    inputs: Union[Dict, Callable[[str], Dict]],
+    max_concurrency: Optional[int] = None,
+    on_section: Optional[Callable[[str, int, int], None]] = None
+) -> List[str]:
+    """
+    Generate section bodies concurrently on a bounded thread pool.
+    
+    Args:
+        sections: Section names to generate
+        doc_type: Type of document ("ToS" or "Privacy")
+        inputs: Chain inputs (product_vars, tone, jurisdictions), or a callable
+            returning the inputs for a given section name
+        max_concurrency: Maximum in-flight LLM calls (defaults to GENERATION_CONCURRENCY)
+        on_section: Called as (section, completed, total) after each section finishes;
+            if it raises, sections that have not started yet are cancelled
+        
+    Returns:
+        Cleaned section bodies in the same order as `sections`
+    """
+    if not sections:
+        return []
+
+    workers = max(1, min(max_concurrency or GENERATION_CONCURRENCY, len(sections)))
+    done = 0
+    lock = Lock()
+    aborted = Event()
+
+    def run(section: str) -> str:
+        nonlocal done
+        if aborted.is_set():
+            raise CancelledError(section)
+        try:
+            chain = get_section_chain(section, doc_type)
+            section_inputs = inputs(section) if callable(inputs) else inputs
+            section_md = _clean_section(chain.invoke(section_inputs))
+            with lock:
+                done += 1
+                print(f"  [{done}/{len(sections)}] {section.title()} ✓", flush=True)
+                if on_section:
+                    on_section(section, done, len(sections))
+        except BaseException:
+            aborted.set()
+            raise
+        return section_md
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, run, section) for section in sections]
+        pending = futures
+        while pending:
+            # Siblings that saw `aborted` finish with CancelledError, possibly
+            # before the section that failed: keep waiting for the real error.
+            _, pending = wait(pending, return_when=FIRST_EXCEPTION)
+            failed = [
+                future for future in futures
+                if future.done() and not future.cancelled() and future.exception() is not None
+                and not isinstance(future.exception(), CancelledError)
+            ]
+            if failed:
+                for future in futures:
+                    future.cancel()
+                raise failed[0].exception()
+        return [future.result() for future in futures]
+
+async def agenerate_sections(
+    sections: List[str],
+    doc_type: str,
+    inputs: Union[Dict, Callable[[str], Dict]],
+    max_concurrency: Optional[int] = None
+) -> List[str]:
+    """
+    Async variant of generate_sections using chain.ainvoke on the event loop.
+    
+    Returns:
+        Cleaned section bodies in the same order as `sections`
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or GENERATION_CONCURRENCY))
+
+    async def run(section: str) -> str:
+        async with semaphore:
+            chain = get_section_chain(section, doc_type)
+            section_inputs = inputs(section) if callable(inputs) else inputs
+            return _clean_section(await chain.ainvoke(section_inputs))
+
+    return list(await asyncio.gather(*(run(section) for section in sections)))
+
+async def astream_sections(
+    sections: List[str],
+    doc_type: str,
+    inputs: Union[Dict, Callable[[str], Dict]],
+    max_concurrency: Optional[int] = None,
+    stream_tokens: bool = False
+) -> AsyncIterator[Dict]:
+    """
+    Generate sections concurrently and yield events as results arrive.
+    
+    Yields {"event": "section", "section", "index", "markdown"} for each finished
+    section (in completion order; "index" is its canonical position) and, when
+    stream_tokens is set, {"event": "token", "section", "index", "delta"} for
+    each raw chunk the LLM produces.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or GENERATION_CONCURRENCY))
+
+    async def run(index: int, section: str):
+        try:
+            async with semaphore:
+                chain = get_section_chain(section, doc_type)
+                section_inputs = inputs(section) if callable(inputs) else inputs
+                if stream_tokens:
+                    parts = []
+                    async for delta in chain.astream(section_inputs):
+                        parts.append(delta)
+                        await queue.put({"event": "token", "section": section, "index": index, "delta": delta})
+                    section_md = "".join(parts)
+                else:
+                    section_md = await chain.ainvoke(section_inputs)
+                await queue.put({
+                    "event": "section",
+                    "section": section,
+                    "index": index,
+                    "markdown": _clean_section(section_md)
+                })
+        finally:
+            queue.put_nowait(None)
+
+    tasks = [asyncio.create_task(run(i, section)) for i, section in enumerate(sections)]
+    try:
+        pending = len(tasks)
+        while pending:
+            event = await queue.get()
+            if event is None:
+                pending -= 1
+                continue
+            yield event
+        for task in tasks:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def astream_document(
+    doc: str,
+    title: str,
+    eff: str,
+    sections: List[str],
+    doc_type: str,
+    inputs: Union[Dict, Callable[[str], Dict]],
+    max_concurrency: Optional[int] = None,
+    stream_tokens: bool = False
+) -> AsyncIterator[Dict]:
+    """
+    Stream one document: a "document_start" event listing its sections, the
+    per-section events from astream_sections tagged with "doc", and a final
+    "document" event with the assembled markdown.
+    """
+    yield {"event": "document_start", "doc": doc, "title": title, "sections": sections}
+    bodies: List[str] = [""] * len(sections)
+    async for event in astream_sections(sections, doc_type, inputs, max_concurrency, stream_tokens):
+        if event["event"] == "section":
+            bodies[event["index"]] = event["markdown"]
+        yield {"doc": doc, **event}
+    yield {"event": "document", "doc": doc, "markdown": assemble_document(title, eff, sections, bodies)}
+
+def assemble_document(title: str, eff: str, sections: List[str], bodies: List[str]) -> str:
+    """
+    Join generated section bodies into a full markdown document in canonical order.
+    """
+    parts = [f"# {title}\n\n**Effective Date:** {eff}\n"]
+    for section, section_md in zip(sections, bodies):
+        parts.append(f"## {section.title()}\n\n{section_md}\n")
+    full = "\n".join(parts)
+    full = clean_scaffolding(full)
+    full = clean_scaffolding(full)
+    return full
+
+def generate_docs(
+    product_vars: Dict,
+    docs: List[str],
+    tone: str,
+    jurisdictions: List[str],
+    max_concurrency: Optional[int] = None,
+    on_section: Optional[Callable[[str, str, int, int], None]] = None
+) -> Dict[str, str]:
     """
     Generate legal documents section by section using RAG.
     
+    Sections are generated concurrently (bounded by max_concurrency) and
+    reassembled in their canonical order.
+    
     Args:
         product_vars: Product information dictionary
         docs: List of documents to generate (["tos", "privacy"])
         tone: Writing style ("plain" or "formal")
         jurisdictions: Target jurisdictions (e.g., ["US", "EU", "IL"])
+        max_concurrency: Maximum concurrent section calls per request
+        on_section: Progress callback called as (doc, section, completed, total)
         
     Returns:
         Dictionary with generated markdown for each document type
@@ -86,52 +287,87 @@ def generate_docs(product_vars: Dict, docs: List[str], tone: str, jurisdictions:
     eff = date.today().isoformat()
     
     jurisdiction_names = [JURISDICTION_NAMES.get(j, j) for j in jurisdictions]
+    inputs = {
+        "product_vars": product_vars,
+        "tone": "plain english" if tone=="plain" else "formal",
+        "jurisdictions": jurisdiction_names
+    }
 
     if "tos" in docs:
         print("Generating Terms of Service...")
-        parts = [f"# Terms of Service\n\n**Effective Date:** {eff}\n"]
-        for i, section in enumerate(TOS_SECTIONS, 1):
-            print(f"  [{i}/{len(TOS_SECTIONS)}] {section.title()}...", end=" ", flush=True)
-            chain = build_section_chain(section, "ToS")
-            section_md = chain.invoke({
-                "product_vars": product_vars,
-                "tone": "plain english" if tone=="plain" else "formal",
-                "jurisdictions": jurisdiction_names
-            })
-            section_md = clean_scaffolding(section_md)
-            
-            section_md = re.sub(r'^##\s+.*\n', '', section_md, count=1)
-            
-            parts.append(f"## {section.title()}\n\n{section_md}\n")
-            print("✓")
-        tos_full = "\n".join(parts)
-        tos_full = clean_scaffolding(tos_full)
-        tos_full = clean_scaffolding(tos_full)
-        out["tos_md"] = tos_full
+        bodies = generate_sections(
+            TOS_SECTIONS, "ToS", inputs, max_concurrency,
+            partial(on_section, "tos") if on_section else None
+        )
+        out["tos_md"] = assemble_document("Terms of Service", eff, TOS_SECTIONS, bodies)
         print("✓ Terms of Service complete")
 
     if "privacy" in docs:
         print("Generating Privacy Policy...")
-        parts = [f"# Privacy Policy\n\n**Effective Date:** {eff}\n"]
-        for i, section in enumerate(PRIVACY_SECTIONS, 1):
-            print(f"  [{i}/{len(PRIVACY_SECTIONS)}] {section.title()}...", end=" ", flush=True)
-            chain = build_section_chain(section, "Privacy")
-            section_md = chain.invoke({
-                "product_vars": product_vars,
-                "tone": "plain english" if tone=="plain" else "formal",
-                "jurisdictions": jurisdiction_names
-            })
-            section_md = clean_scaffolding(section_md)
-            
-            section_md = re.sub(r'^##\s+.*\n', '', section_md, count=1)
-            
-            parts.append(f"## {section.title()}\n\n{section_md}\n")
-            print("✓")
-        privacy_full = "\n".join(parts)
-        privacy_full = clean_scaffolding(privacy_full)
-        privacy_full = clean_scaffolding(privacy_full)
-        out["privacy_md"] = privacy_full
+        bodies = generate_sections(
+            PRIVACY_SECTIONS, "Privacy", inputs, max_concurrency,
+            partial(on_section, "privacy") if on_section else None
+        )
+        out["privacy_md"] = assemble_document("Privacy Policy", eff, PRIVACY_SECTIONS, bodies)
         print("✓ Privacy Policy complete")
 
     return out
 
+async def agenerate_docs(
+    product_vars: Dict,
+    docs: List[str],
+    tone: str,
+    jurisdictions: List[str],
+    max_concurrency: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    Async variant of generate_docs; does not block the event loop.
+    """
+    out = {}
+    eff = date.today().isoformat()
+    inputs = {
+        "product_vars": product_vars,
+        "tone": "plain english" if tone=="plain" else "formal",
+        "jurisdictions": [JURISDICTION_NAMES.get(j, j) for j in jurisdictions]
+    }
+
+    if "tos" in docs:
+        bodies = await agenerate_sections(TOS_SECTIONS, "ToS", inputs, max_concurrency)
+        out["tos_md"] = assemble_document("Terms of Service", eff, TOS_SECTIONS, bodies)
+
+    if "privacy" in docs:
+        bodies = await agenerate_sections(PRIVACY_SECTIONS, "Privacy", inputs, max_concurrency)
+        out["privacy_md"] = assemble_document("Privacy Policy", eff, PRIVACY_SECTIONS, bodies)
+
+    return out
+
+async def astream_docs(
+    product_vars: Dict,
+    docs: List[str],
+    tone: str,
+    jurisdictions: List[str],
+    max_concurrency: Optional[int] = None,
+    stream_tokens: bool = False
+) -> AsyncIterator[Dict]:
+    """
+    Streaming variant of generate_docs; yields the events of astream_document
+    for each requested document.
+    """
+    eff = date.today().isoformat()
+    inputs = {
+        "product_vars": product_vars,
+        "tone": "plain english" if tone=="plain" else "formal",
+        "jurisdictions": [JURISDICTION_NAMES.get(j, j) for j in jurisdictions]
+    }
+
+    if "tos" in docs:
+        async for event in astream_document(
+            "tos", "Terms of Service", eff, TOS_SECTIONS, "ToS", inputs, max_concurrency, stream_tokens
+        ):
+            yield event
+
+    if "privacy" in docs:
+        async for event in astream_document(
+            "privacy", "Privacy Policy", eff, PRIVACY_SECTIONS, "Privacy", inputs, max_concurrency, stream_tokens
+        ):
+            yield event
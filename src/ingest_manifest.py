@@ -0,0 +1,61 @@
+"""
+Ingestion manifest for incremental re-indexing.
+
+Records, for each source URL, the hash of its extracted text, its HTTP
+validators and the deterministic IDs of the chunks stored for it. A re-run
+compares fresh pages against the manifest so only new or changed chunks are
+embedded, and chunks of changed or removed pages are deleted. The manifest
+lives inside the vector store directory, so deleting the index resets it.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List
+from langchain_core.documents import Document
+from .config import INGEST_MANIFEST_PATH
+
+MANIFEST_VERSION = 1
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def chunk_ids(url: str, chunks: List[Document]) -> List[str]:
+    """
+    Deterministic IDs from (url, chunk text); repeated text within a page gets
+    an occurrence suffix. Unchanged chunks keep their ID when a page is edited.
+    """
+    seen: Dict[str, int] = {}
+    ids = []
+    for chunk in chunks:
+        digest = hashlib.sha256(f"{url}\n{chunk.page_content}".encode("utf-8")).hexdigest()[:32]
+        n = seen.get(digest, 0)
+        seen[digest] = n + 1
+        ids.append(digest if n == 0 else f"{digest}-{n}")
+    return ids
+
+def load_manifest(path: str = INGEST_MANIFEST_PATH) -> Dict[str, Dict]:
+    """Return {url: {"content_hash", "chunk_ids", "etag", "last_modified"}}."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("sources", {})
+
+def save_manifest(sources: Dict[str, Dict], path: str = INGEST_MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "sources": sources}, f, indent=2)
+    os.replace(tmp_path, path)
+
+def validators(sources: Dict[str, Dict]) -> Dict[str, Dict[str, str]]:
+    """Conditional GET validators per URL, for fetch_all."""
+    return {
+        url: {k: entry[k] for k in ("etag", "last_modified") if entry.get(k)}
+        for url, entry in sources.items()
+    }
@@ -1,82 +1,376 @@
 """
 Document ingestion from URLs into vector database.
 
-Loads legal documents, splits them into chunks, and stores in ChromaDB.
+Runs a streaming fetch -> parse/split -> embed/upsert pipeline with bounded
+queues between the stages, so memory stays flat regardless of corpus size.
+Parsing and splitting are CPU-bound and run in a process pool. Each page is
+diffed against the ingestion manifest, and the manifest is checkpointed
+after every upsert batch, so an interrupted run resumes where it stopped
+instead of starting over. Fetched pages are kept in the raw store, so the
+index can be rebuilt offline with different chunking. Pages are classified
+and chunks tagged with their section (see classifier) so retrieval can
+filter on metadata.
 """
+import asyncio
+import contextlib
+import io
 import pandas as pd
-from typing import List
-from langchain_community.document_loaders import UnstructuredURLLoader
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from unstructured.partition.auto import partition
+from .fetcher import FetchResult, fetch_all
+from .ingest_manifest import chunk_ids, content_hash, load_manifest, save_manifest, validators as manifest_validators
 from .vectordb import get_vectorstore
+from .chains import invalidate_chains
+from .classifier import (
+    CLASSIFIER_VERSION, classify_doc_type, detect_jurisdictions, find_headings, heading_at, jurisdiction_key, tag_section
+)
+from .raw_store import get_raw_store
+from .retrieval_cache import build_retrieval_cache
+from .config import INGEST_QUEUE_SIZE, INGEST_UPSERT_BATCH, INGEST_PARSE_WORKERS
 
-def _infer_doc_type(url: str) -> str:
-    u = (url or "").lower()
-    if "privacy" in u or "policy" in u:
-        return "privacy"
-    if "terms" in u or "tos" in u or "user-agreement" in u:
-        return "tos"
-    return "unknown"
+CHUNK_SIZE = 1200
+CHUNK_OVERLAP = 200
 
-def ingest_from_csv(csv_path: str):
+def _extract_text(result: FetchResult) -> str:
+    """Extract the text of a fetched page the same way UnstructuredURLLoader does."""
+    elements = partition(file=io.BytesIO(result.content), content_type=result.content_type or None)
+    return "\n\n".join(str(el) for el in elements)
+
+@dataclass
+class PageUpdate:
+    """Changes for one source page: chunks to add and chunk IDs to delete."""
+    url: str
+    entry: Dict
+    chunks: List[Document] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+    stale_ids: List[str] = field(default_factory=list)
+
+@lru_cache(maxsize=None)
+def _splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n","\n",". "],
+        add_start_index=True
+    )
+
+def _split_params(chunk_size: int, chunk_overlap: int) -> List[int]:
+    """Parameters that determine a page's chunks and their tags, recorded in the manifest."""
+    return [chunk_size, chunk_overlap, CLASSIFIER_VERSION]
+
+def _tag_chunks(doc_type: str, text: str, chunks: List[Document]):
+    """Tag each chunk with its section and the jurisdictions it mentions."""
+    headings = find_headings(text)
+    for chunk in chunks:
+        middle = chunk.metadata.get("start_index", 0) + len(chunk.page_content) // 2
+        section = tag_section(doc_type, chunk.page_content, heading_at(headings, middle))
+        if section:
+            chunk.metadata["section"] = section
+        for code in detect_jurisdictions(chunk.page_content):
+            chunk.metadata[jurisdiction_key(code)] = True
+
+def _diff_text(
+    url: str,
+    text: str,
+    previous: Optional[Dict],
+    chunk_size: int,
+    chunk_overlap: int,
+    validators: Dict[str, str]
+) -> Optional[PageUpdate]:
+    """
+    Split and classify a page's text and diff it against its manifest entry.
+    
+    Returns None when the page has no text; an update without chunks or stale
+    IDs when neither the text nor the split parameters changed. When the split
+    parameters changed, every chunk is upserted again so its metadata is
+    refreshed (embeddings come from the cache).
+    """
+    if not text.strip():
+        return None
+    digest = content_hash(text)
+    params = _split_params(chunk_size, chunk_overlap)
+    same_params = previous is not None and previous.get("chunking") == params
+    if same_params and previous["content_hash"] == digest:
+        return PageUpdate(url, {**previous, **validators})
+
+    doc_type = classify_doc_type(url, text)
+    doc = Document(
+        page_content=text,
+        metadata={"source": url, "source_url": url, "doc_type": doc_type}
+    )
+    chunks = _splitter(chunk_size, chunk_overlap).split_documents([doc])
+    _tag_chunks(doc_type, text, chunks)
+    ids = chunk_ids(url, chunks)
+    old_ids = set(previous["chunk_ids"]) if previous else set()
+    kept = old_ids if same_params else set()
+    added = [(chunk, chunk_id) for chunk, chunk_id in zip(chunks, ids) if chunk_id not in kept]
+    return PageUpdate(
+        url,
+        {"content_hash": digest, "chunking": params, "chunk_ids": ids, **validators},
+        chunks=[chunk for chunk, _ in added],
+        ids=[chunk_id for _, chunk_id in added],
+        stale_ids=sorted(old_ids - set(ids))
+    )
+
+def _diff_page(
+    result: FetchResult,
+    previous: Optional[Dict],
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP
+) -> Optional[PageUpdate]:
+    """
+    Parse a fetched page, save it to the raw store and diff it.
+    
+    CPU-bound and picklable end to end, so it runs in the parse process pool.
+    """
+    text = _extract_text(result)
+    if text.strip():
+        get_raw_store().save_page(
+            result.url, result.content, text, result.content_type, result.etag, result.last_modified
+        )
+    return _diff_text(result.url, text, previous, chunk_size, chunk_overlap, result.validators())
+
+def _diff_stored(
+    url: str,
+    previous: Optional[Dict],
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP
+) -> Optional[PageUpdate]:
+    """Diff a page from the raw store's extracted text, without any network access."""
+    store = get_raw_store()
+    page = store.get(url)
+    if page is None:
+        raise LookupError("not in raw store")
+    validators = {k: page[k] for k in ("etag", "last_modified") if page[k]}
+    return _diff_text(url, store.get_text(page["text_hash"]), previous, chunk_size, chunk_overlap, validators)
+
+def parse_executor(workers: int = INGEST_PARSE_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """Process pool for the parse/split stage; None (threads in this process) when workers <= 1."""
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+async def _parse_stage(
+    urls: List[str],
+    sources: Dict[str, Dict],
+    out: asyncio.Queue,
+    executor: Optional[ProcessPoolExecutor],
+    workers: int,
+    chunking: Tuple[int, int],
+    offline: bool = False
+):
     """
-    Load legal documents from URLs in CSV and store in vector database.
+    Fetch pages (or read them from the raw store when offline) and hand a
+    PageUpdate per page to the upsert stage.
+    
+    Up to two pages per worker are parsed at once, so the pool stays busy
+    while pages wait in bounded memory. Pages answering 304 are re-split from
+    the raw store only if the split parameters changed.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(max(1, workers) * 2)
+    tasks = set()
+    total = len(set(urls))
+
+    async def diff(prefix: str, url: str, fn, arg):
+        try:
+            update = await loop.run_in_executor(executor, fn, arg, sources.get(url), *chunking)
+        except Exception as e:
+            print(f"{prefix} {url} ✗ Failed ({str(e)[:40]})")
+            return
+        finally:
+            slots.release()
+        if update is None:
+            print(f"{prefix} {url} ✗ No text")
+            return
+        if not update.ids and not update.stale_ids:
+            print(f"{prefix} {url} unchanged")
+        else:
+            print(f"{prefix} {url} ✓ {len(update.ids)} new / {len(update.stale_ids)} removed chunks")
+        await out.put(update)
+
+    async def schedule(prefix: str, url: str, fn, arg):
+        await slots.acquire()
+        task = asyncio.create_task(diff(prefix, url, fn, arg))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    cancelled = False
+    try:
+        if offline:
+            for done, url in enumerate(dict.fromkeys(urls), 1):
+                await schedule(f"  [{done}/{total}]", url, _diff_stored, url)
+        else:
+            done = 0
+            async for result in fetch_all(urls, manifest_validators(sources)):
+                done += 1
+                prefix = f"  [{done}/{total}]"
+                if result.not_modified:
+                    if sources.get(result.url, {}).get("chunking") == _split_params(*chunking):
+                        print(f"{prefix} {result.url} unchanged")
+                    else:
+                        await schedule(prefix, result.url, _diff_stored, result.url)
+                    continue
+                if not result.ok:
+                    print(f"{prefix} {result.url} ✗ Failed ({(result.error or '')[:40]})")
+                    continue
+                await schedule(prefix, result.url, _diff_page, result)
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        cancelled = True
+        raise
+    finally:
+        for task in tasks:
+            task.cancel()
+        if cancelled:
+            # Cancelled once the upsert stage has stopped reading, so waiting
+            # for room in a full queue would never return.
+            with contextlib.suppress(asyncio.QueueFull):
+                out.put_nowait(None)
+        else:
+            await out.put(None)
+
+def _apply(vs, updates: List[PageUpdate], sources: Dict[str, Dict]):
+    """Upsert one batch of page updates, then checkpoint the manifest."""
+    stale_ids = [chunk_id for update in updates for chunk_id in update.stale_ids]
+    chunks = [chunk for update in updates for chunk in update.chunks]
+    ids = [chunk_id for update in updates for chunk_id in update.ids]
+    if stale_ids:
+        vs.delete(ids=stale_ids)
+    if chunks:
+        vs.add_documents(chunks, ids=ids)
+    for update in updates:
+        sources[update.url] = update.entry
+    save_manifest(sources)
+
+async def _upsert_stage(vs, sources: Dict[str, Dict], queue: asyncio.Queue, batch_size: int) -> Dict[str, int]:
+    """
+    Embed and upsert page updates in batches of about batch_size chunks.
+    
+    A page's changes always land in a single batch, so the manifest never
+    records a page whose chunks are only partly stored.
+    """
+    counts = {"added": 0, "deleted": 0}
+    batch: List[PageUpdate] = []
+    pending = 0
+    while True:
+        update = await queue.get()
+        if update is not None:
+            batch.append(update)
+            pending += len(update.ids) + len(update.stale_ids)
+        if batch and (update is None or pending >= batch_size):
+            await asyncio.to_thread(_apply, vs, batch, sources)
+            counts["added"] += sum(len(u.ids) for u in batch)
+            counts["deleted"] += sum(len(u.stale_ids) for u in batch)
+            batch, pending = [], 0
+        if update is None:
+            return counts
+
+async def _run_pipeline(
+    urls: List[str],
+    sources: Dict[str, Dict],
+    workers: int,
+    chunking: Tuple[int, int],
+    offline: bool
+) -> Dict[str, int]:
+    vs = get_vectorstore()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+    executor = parse_executor(workers)
+    parse = asyncio.create_task(_parse_stage(urls, sources, queue, executor, workers, chunking, offline))
+    try:
+        counts = await _upsert_stage(vs, sources, queue, INGEST_UPSERT_BATCH)
+    finally:
+        parse.cancel()
+        await asyncio.gather(parse, return_exceptions=True)
+        if executor:
+            executor.shutdown(cancel_futures=True)
+    return counts
+
+def ingest_from_csv(
+    csv_path: str,
+    workers: Optional[int] = None,
+    offline: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP
+):
+    """
+    Load legal documents from URLs in CSV and sync them into the vector database.
+    
+    Only chunks of new or changed pages are embedded; chunks of changed or
+    removed pages (and chunks not tracked by the manifest) are deleted. Safe to
+    re-run after an interruption: pages already stored are skipped. Every
+    fetched page is kept in the raw store, so offline runs can re-chunk and
+    re-embed the corpus (e.g. into a new CHROMA_DIR) without network access.
     
     Args:
         csv_path: Path to CSV file with "Terms URL" and "Privacy URL" columns
+        workers: Parse/split processes (defaults to INGEST_PARSE_WORKERS; 1 parses in-process)
+        offline: Read pages from the raw store instead of fetching them
+        chunk_size: Splitter chunk size in characters
+        chunk_overlap: Splitter chunk overlap in characters
         
     Returns:
-        Number of chunks created and stored
+        Number of chunks embedded and stored
     """
-    df = pd.read_csv(csv_path)
     urls: List[str] = []
-    for _, row in df.iterrows():
-        t = row.get("Terms URL")
-        p = row.get("Privacy URL")
-        if isinstance(t, str) and t.strip():
-            urls.append(t.strip())
-        if isinstance(p, str) and p.strip():
-            urls.append(p.strip())
-
-    print(f"Loading {len(urls)} URLs (this may take a few minutes)...")
-    loader = UnstructuredURLLoader(urls=urls, ssl_verify=True)
-    
-    try:
-        docs = loader.load()
-        print(f"✓ Loaded all documents")
-    except Exception as e:
-        print(f"Warning: Batch load failed, trying individually...")
-        docs = []
-        for i, url in enumerate(urls, 1):
-            try:
-                print(f"  [{i}/{len(urls)}] Loading...", end=" ", flush=True)
-                single_loader = UnstructuredURLLoader(urls=[url], ssl_verify=True)
-                docs.extend(single_loader.load())
-                print(f"✓")
-            except Exception as url_error:
-                print(f"✗ Failed ({str(url_error)[:40]})")
-
-    if not docs:
-        raise RuntimeError("No documents were successfully loaded")
+    for df in pd.read_csv(csv_path, usecols=["Terms URL", "Privacy URL"], chunksize=1000):
+        for t, p in zip(df["Terms URL"], df["Privacy URL"]):
+            if isinstance(t, str) and t.strip():
+                urls.append(t.strip())
+            if isinstance(p, str) and p.strip():
+                urls.append(p.strip())
 
-    print(f"✓ Successfully loaded {len(docs)} documents")
-    print("Preparing documents...")
-    for d in docs:
-        src = d.metadata.get("source", d.metadata.get("source_url", ""))
-        d.metadata["source_url"] = src
-        d.metadata["doc_type"] = _infer_doc_type(src)
-
-    print("Splitting into chunks...")
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1200,
-        chunk_overlap=200,
-        separators=["\n\n","\n",". "]
-    )
-    chunks = splitter.split_documents(docs)
-    print(f"✓ Created {len(chunks)} chunks")
-    print("Storing in vector database (this may take a minute)...")
     vs = get_vectorstore()
-    vs.add_documents(chunks)
-    print("✓ Vector database updated")
+    sources = load_manifest()
+    url_set = set(urls)
+    removed = [url for url in sources if url not in url_set]
+    removed_ids = [chunk_id for url in removed for chunk_id in sources[url]["chunk_ids"]]
+    if removed:
+        print(f"Removing {len(removed)} sources no longer in the CSV...")
+        if removed_ids:
+            vs.delete(ids=removed_ids)
+        for url in removed:
+            del sources[url]
+        save_manifest(sources)
+
+    print(f"{'Reading' if offline else 'Fetching'} {len(urls)} URLs...")
+    counts = asyncio.run(_run_pipeline(
+        urls, sources, workers or INGEST_PARSE_WORKERS, (chunk_size, chunk_overlap), offline
+    ))
+
+    if not sources:
+        raise RuntimeError("No documents were successfully loaded")
+
+    tracked = {chunk_id for entry in sources.values() for chunk_id in entry["chunk_ids"]}
+    untracked = [chunk_id for chunk_id in vs.ids() if chunk_id not in tracked]
+    if untracked:
+        vs.delete(ids=untracked)
+
+    if not removed and not untracked and not counts["added"] and not counts["deleted"]:
+        print("✓ Vector database already up to date")
+        return 0
+
+    invalidate_chains()
+    print(f"✓ Vector database updated: {counts['added']} chunks added, "
+          f"{counts['deleted'] + len(removed_ids) + len(untracked)} removed")
+    print("Precomputing section retrieval cache...")
+    n_cached = build_retrieval_cache()
+    print(f"✓ Cached context for {n_cached} section queries")
     
-    return len(chunks)
+    return counts["added"]
+
+if __name__ == "__main__":
+    import argparse
+    from .config import CSV_PATH
 
+    parser = argparse.ArgumentParser(description="Sync the vector store with the CSV's provider pages")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--offline", action="store_true", help="re-index from the raw store without fetching")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP)
+    args = parser.parse_args()
+    ingest_from_csv(args.csv, args.workers, args.offline, args.chunk_size, args.chunk_overlap)
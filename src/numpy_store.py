@@ -0,0 +1,396 @@
+"""
+In-process vector store over a memory-mapped float32 matrix.
+
+For a corpus of a few hundred thousand chunks a flat index is fast enough:
+queries are one matrix-vector product over the (filtered) rows plus an
+argpartition, and opening the store only maps the vector file instead of
+loading it. Metadata filters use the same `where` syntax as Chroma
+({"key": value}, $eq, $in, $and, $or) and are answered from an inverted
+index of (key, value) -> rows.
+
+On disk, a generation directory holds `vectors.f32` (unit-normalised rows,
+appended) and `rows.jsonl` (a header line, then one line per added row or
+deleted id, appended). Upserts and deletes only append; the store is
+compacted into a new generation, switched atomically through CURRENT,
+once more than half of its rows are dead. Other processes pick up appended
+rows and new generations on their next query.
+"""
+import json
+import os
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+COMPACT_MIN_DEAD = 1000
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def _value_key(value: Any) -> Any:
+    return value if isinstance(value, (str, int, float, bool)) else json.dumps(value, sort_keys=True)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """
+    One generation's vectors and row data, taken together under the lock.
+
+    A refresh only appends to these lists, and a new generation replaces them,
+    so row numbers from a query stay valid against the snapshot it ran on.
+    """
+    matrix: np.ndarray
+    ids: List[str]
+    texts: List[str]
+    metadatas: List[Dict]
+
+    def document(self, row: int) -> Document:
+        return Document(page_content=self.texts[row], metadata=self.metadatas[row], id=self.ids[row])
+
+
+class NumpyVectorStore(VectorStore):
+    def __init__(self, embedding: Embeddings, path: str):
+        self.embedding = embedding
+        self.path = path
+        self._lock = Lock()
+        self._generation: Optional[str] = None
+        self._offset = 0
+        self._dim: Optional[int] = None
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._live: List[bool] = []
+        self._rows: Dict[str, int] = {}
+        self._postings: Dict[Tuple[str, Any], List[int]] = defaultdict(list)
+        self._arrays: Dict[Tuple[str, Any], np.ndarray] = {}
+        self._live_mask: Optional[np.ndarray] = None
+        os.makedirs(path, exist_ok=True)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, "CURRENT"))
+
+    # -- files ---------------------------------------------------------------
+
+    def _current(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, "CURRENT"), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _files(self, generation: str) -> Tuple[str, str]:
+        directory = os.path.join(self.path, generation)
+        return os.path.join(directory, "vectors.f32"), os.path.join(directory, "rows.jsonl")
+
+    def _create_generation(self, dim: int) -> str:
+        generation = uuid.uuid4().hex[:12]
+        os.makedirs(os.path.join(self.path, generation))
+        _, rows_path = self._files(generation)
+        with open(rows_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"dim": dim}) + "\n")
+        open(self._files(generation)[0], "wb").close()
+        return generation
+
+    def _switch_generation(self, generation: str):
+        tmp_path = os.path.join(self.path, f"CURRENT.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(generation)
+        os.replace(tmp_path, os.path.join(self.path, "CURRENT"))
+
+    # -- in-memory state -----------------------------------------------------
+
+    def _reset_state(self):
+        self._generation, self._offset, self._dim = None, 0, None
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._ids, self._texts, self._metadatas, self._live = [], [], [], []
+        self._rows = {}
+        self._postings = defaultdict(list)
+        self._arrays = {}
+        self._live_mask = None
+
+    def _apply_line(self, entry: Dict):
+        if "dim" in entry:
+            self._dim = entry["dim"]
+            return
+        chunk_id = entry["id"]
+        previous = self._rows.pop(chunk_id, None)
+        if previous is not None:
+            self._live[previous] = False
+        if entry.get("deleted"):
+            return
+        row = len(self._ids)
+        self._ids.append(chunk_id)
+        self._texts.append(entry["text"])
+        self._metadatas.append(entry["metadata"])
+        self._live.append(True)
+        self._rows[chunk_id] = row
+        for key, value in entry["metadata"].items():
+            self._postings[(key, _value_key(value))].append(row)
+
+    def _map_vectors(self):
+        vectors_path, _ = self._files(self._generation)
+        n = len(self._ids)
+        if not n or not self._dim:
+            self._matrix = np.zeros((0, self._dim or 0), dtype=np.float32)
+            return
+        # Rows are appended to the vector file before their metadata line, so it can only be longer.
+        self._matrix = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(n, self._dim))
+
+    def _refresh(self):
+        """Load a new generation or rows appended by another process since the last read."""
+        generation = self._current()
+        if generation != self._generation:
+            self._reset_state()
+            self._generation = generation
+        if generation is None:
+            return
+        _, rows_path = self._files(generation)
+        if os.path.getsize(rows_path) == self._offset:
+            return
+        with open(rows_path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._apply_line(json.loads(line))
+                self._offset += len(line)
+        self._arrays = {}
+        self._live_mask = np.fromiter(self._live, dtype=bool, count=len(self._live))
+        self._map_vectors()
+
+    # -- writes --------------------------------------------------------------
+
+    def _append(self, lines: List[Dict], vectors: Optional[np.ndarray] = None):
+        if self._generation is None:
+            self._generation = self._create_generation(vectors.shape[1])
+            self._switch_generation(self._generation)
+        vectors_path, rows_path = self._files(self._generation)
+        if vectors is not None and len(vectors):
+            expected = len(self._ids) * vectors.shape[1] * 4
+            if os.path.getsize(vectors_path) != expected:
+                # Drop vectors of a write that failed before its rows line.
+                os.truncate(vectors_path, expected)
+            with open(vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        with open(rows_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines))
+        self._refresh()
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[Dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """Embed and upsert texts; an existing id is replaced."""
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in texts]
+        vectors = _normalise(np.asarray(self.embedding.embed_documents(texts), dtype=np.float32))
+        with self._lock:
+            self._refresh()
+            if self._dim is not None and vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._dim}")
+            self._append(
+                [{"id": i, "text": t, "metadata": m or {}} for i, t, m in zip(ids, texts, metadatas)],
+                vectors
+            )
+            self._maybe_compact()
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return True
+        with self._lock:
+            self._refresh()
+            present = [chunk_id for chunk_id in ids if chunk_id in self._rows]
+            if present:
+                self._append([{"id": chunk_id, "deleted": True} for chunk_id in present])
+            self._maybe_compact()
+        return True
+
+    def _maybe_compact(self):
+        """Compact once dead rows, from upserts or deletes, outnumber live ones (lock held)."""
+        dead = len(self._ids) - len(self._rows)
+        if dead >= COMPACT_MIN_DEAD and dead > len(self._rows):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the live rows into a new generation and switch to it."""
+        rows = sorted(self._rows.values())
+        generation = self._create_generation(self._dim)
+        vectors_path, rows_path = self._files(generation)
+        with open(vectors_path, "wb") as f:
+            for start in range(0, len(rows), 4096):
+                f.write(np.asarray(self._matrix[rows[start:start + 4096]]).tobytes())
+        with open(rows_path, "a", encoding="utf-8") as f:
+            for row in rows:
+                entry = {"id": self._ids[row], "text": self._texts[row], "metadata": self._metadatas[row]}
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        old = self._generation
+        self._switch_generation(generation)
+        self._refresh()
+        try:
+            for old_path in self._files(old):
+                os.remove(old_path)
+            os.rmdir(os.path.join(self.path, old))
+        except OSError:
+            pass
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[Dict]] = None,
+        ids: Optional[List[str]] = None,
+        path: str = "storage/numpy_index",
+        **kwargs: Any
+    ) -> "NumpyVectorStore":
+        store = cls(embedding, path)
+        store.add_texts(texts, metadatas, ids)
+        return store
+
+    # -- reads ---------------------------------------------------------------
+
+    def _posting(self, key: str, value: Any) -> np.ndarray:
+        posting_key = (key, _value_key(value))
+        rows = self._arrays.get(posting_key)
+        if rows is None:
+            rows = self._arrays[posting_key] = np.asarray(self._postings.get(posting_key, []), dtype=np.int64)
+        return rows
+
+    def _match(self, where: Dict) -> np.ndarray:
+        """Rows (live or not) matching a Chroma-style where clause."""
+        results = []
+        for key, condition in where.items():
+            if key == "$and":
+                rows = self._match(condition[0])
+                for clause in condition[1:]:
+                    rows = np.intersect1d(rows, self._match(clause), assume_unique=True)
+            elif key == "$or":
+                rows = np.unique(np.concatenate([self._match(clause) for clause in condition]))
+            elif isinstance(condition, dict):
+                (op, value), = condition.items()
+                if op == "$eq":
+                    rows = self._posting(key, value)
+                elif op == "$in":
+                    rows = np.unique(np.concatenate([self._posting(key, v) for v in value] or [np.zeros(0, np.int64)]))
+                else:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+            else:
+                rows = self._posting(key, condition)
+            results.append(rows)
+        rows = results[0]
+        for other in results[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def _candidates(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """Live rows matching where, or None for every live row."""
+        live = self._live_mask
+        if live is None:
+            return np.zeros(0, dtype=np.int64)
+        if not where:
+            return None if live.all() else np.flatnonzero(live)
+        rows = self._match(where)
+        return rows[live[rows]]
+
+    def _snapshot(self) -> _Snapshot:
+        return _Snapshot(self._matrix, self._ids, self._texts, self._metadatas)
+
+    def _top_k(self, query: np.ndarray, k: int, where: Optional[Dict]) -> Tuple[_Snapshot, List[Tuple[int, float]]]:
+        """Return the snapshot searched and its k best (row, score) pairs."""
+        with self._lock:
+            self._refresh()
+            snapshot, rows = self._snapshot(), self._candidates(where)
+        matrix = snapshot.matrix
+        if not len(matrix) or (rows is not None and not len(rows)):
+            return snapshot, []
+        scores = (matrix if rows is None else matrix[rows]) @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return snapshot, [(int(top_i if rows is None else rows[top_i]), float(scores[top_i])) for top_i in top]
+
+    def _query_vector(self, query: str) -> np.ndarray:
+        return _normalise(np.asarray([self.embedding.embed_query(query)], dtype=np.float32))[0]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[Dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        snapshot, hits = self._top_k(self._query_vector(query), k, filter)
+        return [(snapshot.document(row), score) for row, score in hits]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        query = _normalise(np.asarray([embedding], dtype=np.float32))[0]
+        snapshot, hits = self._top_k(query, k, filter)
+        return [snapshot.document(row) for row, _ in hits]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict] = None, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[Dict] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        query_vector = self._query_vector(query)
+        snapshot, candidates = self._top_k(query_vector, fetch_k, filter)
+        if not candidates:
+            return []
+        rows = [row for row, _ in candidates]
+        picked = maximal_marginal_relevance(query_vector, np.asarray(snapshot.matrix[rows]), lambda_mult=lambda_mult, k=k)
+        return [snapshot.document(rows[i]) for i in picked]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: (score + 1.0) / 2.0
+
+    def get_by_ids(self, ids: Sequence[str]) -> List[Document]:
+        with self._lock:
+            self._refresh()
+            snapshot = self._snapshot()
+            return [snapshot.document(self._rows[chunk_id]) for chunk_id in ids if chunk_id in self._rows]
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return list(self._rows)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return {
+                "backend": "numpy",
+                "path": self.path,
+                "count": len(self._rows),
+                "dead_rows": len(self._ids) - len(self._rows),
+                "dim": self._dim,
+            }
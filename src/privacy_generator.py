@@ -1,16 +1,52 @@
 """
 Privacy Policy Generator using RAG and specialized prompts.
 """
+import asyncio
 import json
 from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
 
+from .chains import RateLimitedChat, get_llm
+from .config import PRIVACY_K
 from .prompts import PRIVACY_POLICY_PROMPT
+from .retrieval import metadata_filter, search_filtered
 from .vectordb import get_vectorstore
 
 
+PRIVACY_QUERY = "privacy policy data collection legal bases GDPR CCPA"
+
+
+def _jurisdictions(profile: Dict[str, Any]) -> List[str]:
+    return profile.get("organization", {}).get("jurisdictions_served", [])
+
+
+def _retrieve_privacy_context(profile: Dict[str, Any]) -> List:
+    """
+    Top PRIVACY_K privacy-policy chunks, preferring those that mention the
+    profile's jurisdictions; falls back to the whole corpus for untagged indexes.
+    """
+    filters = [
+        metadata_filter("privacy", jurisdictions=_jurisdictions(profile)),
+        metadata_filter("privacy"),
+        None,
+    ]
+    return search_filtered(get_vectorstore(), PRIVACY_QUERY, PRIVACY_K, filters)
+
+
+def _privacy_chain():
+    llm = get_llm("gpt-4o", 0.2)
+    return PRIVACY_POLICY_PROMPT | RateLimitedChat(llm)
+
+
+def _prompt_inputs(profile: Dict[str, Any], privacy_form: Dict[str, Any], docs: List) -> Dict[str, str]:
+    context = "\n\n".join([doc.page_content for doc in docs])
+    return {
+        "profile_json": json.dumps(profile, indent=2, default=str),
+        "privacy_form_json": json.dumps(privacy_form, indent=2, default=str),
+        "jurisdictions": ", ".join(_jurisdictions(profile)),
+        "context": context
+    }
+
+
 def generate_privacy_policy(
     profile: Dict[str, Any],
     privacy_form: Dict[str, Any],
@@ -28,44 +64,27 @@ def generate_privacy_policy(
         Generated privacy policy markdown
     """
     
-    # Get vector store for RAG
-    vs = get_vectorstore()
-    retriever = vs.as_retriever(search_kwargs={"k": 5})
-    
     # Retrieve relevant legal snippets
-    query = "privacy policy data collection legal bases GDPR CCPA"
-    docs = retriever.get_relevant_documents(query)
-    context = "\n\n".join([doc.page_content for doc in docs])
-    
-    # Prepare variables for the prompt
-    profile_json = json.dumps(profile, indent=2)
-    privacy_form_json = json.dumps(privacy_form, indent=2)
-    jurisdictions = ", ".join(profile.get("organization", {}).get("jurisdictions_served", []))
-    
-    # Create the LLM chain
-    llm = ChatOpenAI(
-        model="gpt-4o",
-        temperature=0.2,
-        model_kwargs={
-            "top_p": 0.95,
-            "frequency_penalty": 0.5
-        }
-    )
-    
-    chain = PRIVACY_POLICY_PROMPT | llm
+    docs = _retrieve_privacy_context(profile)
     
     # Generate the privacy policy
-    result = chain.invoke({
-        "profile_json": profile_json,
-        "privacy_form_json": privacy_form_json,
-        "jurisdictions": jurisdictions,
-        "context": context
-    })
+    result = _privacy_chain().invoke(_prompt_inputs(profile, privacy_form, docs))
     
     # Clean up the generated text
-    privacy_policy = clean_privacy_policy(result.content)
-    
-    return privacy_policy
+    return clean_privacy_policy(result.content)
+
+
+async def agenerate_privacy_policy(
+    profile: Dict[str, Any],
+    privacy_form: Dict[str, Any],
+    product_vars: Dict[str, Any] = None
+) -> str:
+    """
+    Async variant of generate_privacy_policy; does not block the event loop.
+    """
+    docs = await asyncio.to_thread(_retrieve_privacy_context, profile)
+    result = await _privacy_chain().ainvoke(_prompt_inputs(profile, privacy_form, docs))
+    return clean_privacy_policy(result.content)
 
 
 def clean_privacy_policy(text: str) -> str:
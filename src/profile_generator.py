@@ -3,10 +3,15 @@ Profile-based document generation with conditional logic.
 
 Generates legal documents based on CompanyProfile with smart section inclusion.
 """
-from typing import Dict, List
-import re
-from .chains import build_section_chain
-from .generator import clean_scaffolding, JURISDICTION_NAMES
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from .generator import (
+    JURISDICTION_NAMES,
+    generate_sections,
+    agenerate_sections,
+    assemble_document,
+    astream_document,
+)
 
 
 def profile_to_product_vars(profile) -> Dict:
@@ -32,6 +37,119 @@ def profile_to_product_vars(profile) -> Dict:
     }
 
 
+# Profile fields read by every section through product_vars and jurisdictions.
+BASE_PROFILE_FIELDS = [
+    "organization.company_legal_name",
+    "organization.privacy_email",
+    "organization.legal_notices_email",
+    "organization.registered_address",
+    "organization.jurisdictions_served",
+    "product.product_name",
+    "product.platforms",
+    "product.service_type",
+    "vendors",
+]
+
+# Additional top-level CompanyProfile fields passed to each section's prompt.
+SECTION_PROFILE_FIELDS = {
+    "tos": {
+        "acceptance": [],
+        "eligibility": ["audience"],
+        "accounts": ["audience"],
+        "user content": ["acceptable_use"],
+        "intellectual property": ["intellectual_property"],
+        "acceptable use": ["acceptable_use"],
+        "subscriptions & billing": ["billing"],
+        "third-party services": [],
+        "changes to terms": ["changes_policy"],
+        "liability": ["disclaimers"],
+        "governing law": ["dispute_resolution"],
+        "termination": [],
+        "general provisions": ["export_controls"],
+        "contact": [],
+    },
+    "privacy": {
+        "scope": [],
+        "data we collect": ["data_categories"],
+        "how we use data": ["data_categories", "legal_bases"],
+        "sharing and disclosure": ["data_categories", "us_state_privacy"],
+        "third-party services": [],
+        "international transfers": ["international_transfers"],
+        "data retention": ["data_categories", "us_state_privacy"],
+        "security": ["security"],
+        "your rights": ["user_rights", "us_state_privacy", "legal_bases"],
+        "children": ["audience"],
+        "cookies and tracking": ["tracking"],
+        "changes to policy": ["changes_policy"],
+        "contact": ["legal_bases"],
+    },
+}
+
+
+def section_dependencies(doc: str, section: str) -> List[str]:
+    """
+    Return the CompanyProfile field paths a section's prompt is built from.
+    """
+    return BASE_PROFILE_FIELDS + SECTION_PROFILE_FIELDS[doc].get(section, [])
+
+
+def section_product_vars(profile, doc: str, section: str, profile_data: Optional[Dict] = None) -> Dict:
+    """
+    Build product_vars for one section: the shared variables plus the
+    section-specific profile fields from SECTION_PROFILE_FIELDS.
+    """
+    product_vars = profile_to_product_vars(profile)
+    profile_data = profile_data or profile.model_dump(mode="json")
+    for field in SECTION_PROFILE_FIELDS[doc].get(section, []):
+        if profile_data.get(field) is not None:
+            product_vars[field] = profile_data[field]
+    return product_vars
+
+
+def changed_profile_fields(old_profile, new_profile) -> Set[str]:
+    """
+    Diff two profiles into the set of changed field paths.
+    
+    Top-level fields are reported by name; for nested models the changed
+    sub-fields are reported as well (e.g. "organization.privacy_email").
+    """
+    old = old_profile.model_dump(mode="json", exclude={"profile_id", "profile_name"})
+    new = new_profile.model_dump(mode="json", exclude={"profile_id", "profile_name"})
+    changed = set()
+    for field in old.keys() | new.keys():
+        old_value, new_value = old.get(field), new.get(field)
+        if old_value == new_value:
+            continue
+        changed.add(field)
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            for sub in old_value.keys() | new_value.keys():
+                if old_value.get(sub) != new_value.get(sub):
+                    changed.add(f"{field}.{sub}")
+    return changed
+
+
+def _depends_on(paths: List[str], changed: Set[str]) -> bool:
+    for path in paths:
+        if path in changed:
+            return True
+        if "." not in path and any(c.startswith(path + ".") for c in changed):
+            return True
+    return False
+
+
+def sections_to_regenerate(old_profile, new_profile, doc: str) -> List[str]:
+    """
+    List the sections of the new profile's document that must be re-run:
+    sections whose inputs changed plus sections that were not included before.
+    """
+    previous = set(get_conditional_sections(old_profile, doc))
+    changed = changed_profile_fields(old_profile, new_profile)
+    return [
+        section for section in get_conditional_sections(new_profile, doc)
+        if section not in previous or _depends_on(section_dependencies(doc, section), changed)
+    ]
+
+
 def get_conditional_tos_sections(profile) -> List[str]:
     """
     Determine which ToS sections to include based on profile settings.
@@ -111,7 +229,81 @@ def get_conditional_privacy_sections(profile) -> List[str]:
     return sections
 
 
-def generate_from_profile(profile, docs: List[str], tone: str = "plain") -> Dict[str, str]:
+def get_conditional_sections(profile, doc: str) -> List[str]:
+    """
+    Determine the sections of a document ("tos" or "privacy") for a profile.
+    """
+    if doc == "tos":
+        return get_conditional_tos_sections(profile)
+    return get_conditional_privacy_sections(profile)
+
+
+DOC_SPECS = {
+    "tos": ("Terms of Service", "ToS", "tos_md"),
+    "privacy": ("Privacy Policy", "Privacy", "privacy_md"),
+}
+
+
+def profile_section_inputs(profile, doc: str, tone: str = "plain") -> Callable[[str], Dict]:
+    """
+    Return a callable building the chain inputs for each section of a profile's document.
+    """
+    profile_data = profile.model_dump(mode="json")
+    jurisdiction_names = [
+        JURISDICTION_NAMES.get(j, j) 
+        for j in profile.organization.jurisdictions_served
+    ]
+    tone_label = "plain english" if tone == "plain" else "formal"
+
+    def inputs(section: str) -> Dict:
+        return {
+            "product_vars": section_product_vars(profile, doc, section, profile_data),
+            "tone": tone_label,
+            "jurisdictions": jurisdiction_names
+        }
+
+    return inputs
+
+
+def generate_profile_sections(
+    profile,
+    doc: str,
+    tone: str = "plain",
+    sections: Optional[List[str]] = None,
+    max_concurrency: Optional[int] = None,
+    on_section: Optional[Callable[[str, int, int], None]] = None
+) -> Dict[str, str]:
+    """
+    Generate section bodies for one document of a profile.
+    
+    Args:
+        profile: CompanyProfile instance
+        doc: Document to generate ("tos" or "privacy")
+        tone: Writing style ("plain" or "formal")
+        sections: Sections to generate (defaults to the profile's conditional sections)
+        max_concurrency: Maximum concurrent section calls
+        on_section: Progress callback called as (section, completed, total)
+        
+    Returns:
+        Mapping of section name to cleaned markdown body
+    """
+    if sections is None:
+        sections = get_conditional_sections(profile, doc)
+    
+    bodies = generate_sections(
+        sections, DOC_SPECS[doc][1], profile_section_inputs(profile, doc, tone),
+        max_concurrency, on_section
+    )
+    return dict(zip(sections, bodies))
+
+
+def generate_from_profile(
+    profile,
+    docs: List[str],
+    tone: str = "plain",
+    max_concurrency: Optional[int] = None,
+    on_section: Optional[Callable[[str, str, int, int], None]] = None
+) -> Dict:
     """
     Generate legal documents from a CompanyProfile with conditional sections.
     
@@ -119,67 +311,160 @@ def generate_from_profile(profile, docs: List[str], tone: str = "plain") -> Dict
         profile: CompanyProfile instance with all settings
         docs: List of documents to generate (["tos", "privacy"])
         tone: Writing style ("plain" or "formal")
+        max_concurrency: Maximum concurrent section calls per request
+        on_section: Progress callback called as (doc, section, completed, total)
         
     Returns:
-        Dictionary with generated markdown for each document type
+        Dictionary with generated markdown for each document type, plus the
+        per-section bodies under "sections" for incremental regeneration
     """
-    out = {}
-    product_vars = profile_to_product_vars(profile)
-    
-    jurisdiction_names = [
-        JURISDICTION_NAMES.get(j, j) 
-        for j in profile.organization.jurisdictions_served
-    ]
-    
+    out = {"sections": {}}
     eff = profile.organization.effective_date.isoformat()
 
-    if "tos" in docs:
-        print("Generating Terms of Service from profile...")
-        sections = get_conditional_tos_sections(profile)
-        parts = [f"# Terms of Service\n\n**Effective Date:** {eff}\n"]
-        
-        for i, section in enumerate(sections, 1):
-            print(f"  [{i}/{len(sections)}] {section.title()}...", end=" ", flush=True)
-            chain = build_section_chain(section, "ToS")
-            section_md = chain.invoke({
-                "product_vars": product_vars,
-                "tone": "plain english" if tone == "plain" else "formal",
-                "jurisdictions": jurisdiction_names
-            })
-            section_md = clean_scaffolding(section_md)
-            section_md = re.sub(r'^##\s+.*\n', '', section_md, count=1)
-            parts.append(f"## {section.title()}\n\n{section_md}\n")
-            print("✓")
-        
-        tos_full = "\n".join(parts)
-        tos_full = clean_scaffolding(tos_full)
-        tos_full = clean_scaffolding(tos_full)
-        out["tos_md"] = tos_full
-        print("✓ Terms of Service complete")
-
-    if "privacy" in docs:
-        print("Generating Privacy Policy from profile...")
-        sections = get_conditional_privacy_sections(profile)
-        parts = [f"# Privacy Policy\n\n**Effective Date:** {eff}\n"]
-        
-        for i, section in enumerate(sections, 1):
-            print(f"  [{i}/{len(sections)}] {section.title()}...", end=" ", flush=True)
-            chain = build_section_chain(section, "Privacy")
-            section_md = chain.invoke({
-                "product_vars": product_vars,
-                "tone": "plain english" if tone == "plain" else "formal",
-                "jurisdictions": jurisdiction_names
-            })
-            section_md = clean_scaffolding(section_md)
-            section_md = re.sub(r'^##\s+.*\n', '', section_md, count=1)
-            parts.append(f"## {section.title()}\n\n{section_md}\n")
-            print("✓")
+    for doc, (title, _, out_key) in DOC_SPECS.items():
+        if doc not in docs:
+            continue
+        print(f"Generating {title} from profile...")
+        sections = generate_profile_sections(
+            profile, doc, tone,
+            max_concurrency=max_concurrency,
+            on_section=partial(on_section, doc) if on_section else None
+        )
+        out[out_key] = assemble_document(title, eff, list(sections), list(sections.values()))
+        out["sections"][doc] = sections
+        print(f"✓ {title} complete")
+
+    return out
+
+
+def _regeneration_plan(profile, stored: Optional[Dict], doc: str) -> Tuple[List[str], List[str]]:
+    """The document's sections and those of them that must be generated again."""
+    sections = get_conditional_sections(profile, doc)
+    if not stored:
+        return sections, sections
+    stale = sections_to_regenerate(stored["profile"], profile, doc)
+    stale += [s for s in sections if s not in stored["sections"] and s not in stale]
+    return sections, stale
+
+
+def _merge_regenerated(
+    out: Dict,
+    stored: Optional[Dict],
+    doc: str,
+    eff: str,
+    sections: List[str],
+    stale: List[str],
+    fresh: Dict[str, str]
+) -> None:
+    title, _, out_key = DOC_SPECS[doc]
+    merged = {s: fresh[s] if s in fresh else stored["sections"][s] for s in sections}
+    out[out_key] = assemble_document(title, eff, sections, list(merged.values()))
+    out["sections"][doc] = merged
+    out["regenerated"][doc] = stale
+
+
+def regenerate_from_profile(
+    profile,
+    previous: Dict[str, Dict],
+    docs: List[str],
+    tone: str = "plain",
+    max_concurrency: Optional[int] = None
+) -> Dict:
+    """
+    Regenerate documents after a profile edit, re-running only affected sections.
+    
+    Args:
+        profile: Updated CompanyProfile
+        previous: Per document type, {"profile": CompanyProfile, "sections": {name: body}}
+            describing the stored document; documents without an entry are generated in full
+        docs: List of documents to generate (["tos", "privacy"])
+        tone: Writing style ("plain" or "formal")
+        max_concurrency: Maximum concurrent section calls per request
         
-        privacy_full = "\n".join(parts)
-        privacy_full = clean_scaffolding(privacy_full)
-        privacy_full = clean_scaffolding(privacy_full)
-        out["privacy_md"] = privacy_full
-        print("✓ Privacy Policy complete")
+    Returns:
+        Same shape as generate_from_profile, plus "regenerated" listing the
+        sections that were re-run for each document
+    """
+    out = {"sections": {}, "regenerated": {}}
+    eff = profile.organization.effective_date.isoformat()
+
+    for doc, (title, _, out_key) in DOC_SPECS.items():
+        if doc not in docs:
+            continue
+        sections, stale = _regeneration_plan(profile, previous.get(doc), doc)
+        print(f"Regenerating {len(stale)}/{len(sections)} {title} sections from profile...")
+        fresh = generate_profile_sections(profile, doc, tone, stale, max_concurrency)
+        _merge_regenerated(out, previous.get(doc), doc, eff, sections, stale, fresh)
+        print(f"✓ {title} complete")
+
+    return out
+
+
+async def aregenerate_from_profile(
+    profile,
+    previous: Dict[str, Dict],
+    docs: List[str],
+    tone: str = "plain",
+    max_concurrency: Optional[int] = None
+) -> Dict:
+    """
+    Async variant of regenerate_from_profile; does not block the event loop.
+    """
+    out = {"sections": {}, "regenerated": {}}
+    eff = profile.organization.effective_date.isoformat()
+
+    for doc, (_, doc_type, _) in DOC_SPECS.items():
+        if doc not in docs:
+            continue
+        sections, stale = _regeneration_plan(profile, previous.get(doc), doc)
+        bodies = await agenerate_sections(stale, doc_type, profile_section_inputs(profile, doc, tone), max_concurrency)
+        _merge_regenerated(out, previous.get(doc), doc, eff, sections, stale, dict(zip(stale, bodies)))
+
+    return out
+
+
+async def agenerate_from_profile(
+    profile,
+    docs: List[str],
+    tone: str = "plain",
+    max_concurrency: Optional[int] = None
+) -> Dict:
+    """
+    Async variant of generate_from_profile; does not block the event loop.
+    """
+    out = {"sections": {}}
+    eff = profile.organization.effective_date.isoformat()
+
+    for doc, (title, doc_type, out_key) in DOC_SPECS.items():
+        if doc not in docs:
+            continue
+        sections = get_conditional_sections(profile, doc)
+        bodies = await agenerate_sections(sections, doc_type, profile_section_inputs(profile, doc, tone), max_concurrency)
+        out[out_key] = assemble_document(title, eff, sections, bodies)
+        out["sections"][doc] = dict(zip(sections, bodies))
 
     return out
 
+
+async def astream_from_profile(
+    profile,
+    docs: List[str],
+    tone: str = "plain",
+    max_concurrency: Optional[int] = None,
+    stream_tokens: bool = False
+) -> AsyncIterator[Dict]:
+    """
+    Streaming variant of generate_from_profile; yields the events of
+    astream_document for each requested document.
+    """
+    eff = profile.organization.effective_date.isoformat()
+
+    for doc, (title, doc_type, _) in DOC_SPECS.items():
+        if doc not in docs:
+            continue
+        sections = get_conditional_sections(profile, doc)
+        async for event in astream_document(
+            doc, title, eff, sections, doc_type,
+            profile_section_inputs(profile, doc, tone), max_concurrency, stream_tokens
+        ):
+            yield event
@@ -1,6 +1,6 @@
 from langchain.prompts import ChatPromptTemplate
 
-SECTION_PROMPT = ChatPromptTemplate.from_template("""
+SECTION_TEMPLATE = """
 Draft the "{section_name}" section for a {doc_type}.
 
 Product info: {product_vars_json}
@@ -28,7 +28,9 @@ BAD (repetitive): "Welcome to Legal Docs Gen, provided by LDG Ltd..."
 GOOD (focused): Start directly with section content
 
 Write the section body now (use real values, no placeholders, no repetition):
-""")
+"""
+
+SECTION_PROMPT = ChatPromptTemplate.from_template(SECTION_TEMPLATE)
 
 PRIVACY_POLICY_PROMPT = ChatPromptTemplate.from_template("""
 You draft clear, compliant Privacy Policies for B2C apps. Write plain English, region-aware text. Use the provided profile + questionnaire variables and retrieved snippets as guidance. Do not include placeholders or TODOs. If inputs are missing, write neutral language and the backend will surface gaps separately.
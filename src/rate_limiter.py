@@ -0,0 +1,208 @@
+"""
+Process-wide request and token budgets for OpenAI calls.
+
+Every chat or embedding call estimates its token cost from its input and
+waits on two token buckets (requests per minute, tokens per minute) for its
+API before it is sent. Interactive callers are served before batch callers,
+and a 429 pauses all callers for a jittered backoff so a burst of throttling
+does not turn into a storm of retries.
+"""
+import asyncio
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, Iterator, Optional
+import tiktoken
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from .config import LLM_RPM, LLM_TPM, EMBED_RPM, EMBED_TPM
+
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+INTERACTIVE = 0
+BATCH = 1
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+@contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """Run LLM calls made inside the block (and tasks/threads started with its context) at this priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> int:
+    return _priority.get()
+
+_encodings: Dict[str, Any] = {}
+
+def estimate_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Count prompt tokens with the model's tokenizer."""
+    encoding = _encodings.get(model)
+    if encoding is None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        _encodings[model] = encoding
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class TokenBucket:
+    """Bucket holding up to `per_minute` units, refilled continuously."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float):
+        self.available -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    RPM/TPM budget shared by every call to one API in the process.
+
+    A limit of 0 disables that bucket. Batch callers only proceed while no
+    interactive caller is waiting.
+    """
+
+    max_sleep = 0.25
+    base_backoff = 1.0
+    max_backoff = 60.0
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self._lock = Lock()
+        self._waiting = {INTERACTIVE: 0, BATCH: 0}
+        self._paused_until = 0.0
+        self.granted = 0
+        self.granted_tokens = 0
+        self.throttled_seconds = 0.0
+        self.rate_limit_errors = 0
+
+    def _try_acquire(self, tokens: int, priority: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if priority == BATCH and self._waiting[INTERACTIVE]:
+                return self.max_sleep
+            wait = 0.0
+            if self.requests:
+                wait = max(wait, self.requests.wait_time(1, now))
+            if self.tokens:
+                wait = max(wait, self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            self.granted += 1
+            self.granted_tokens += tokens
+            return 0.0
+
+    def _set_waiting(self, priority: int, delta: int):
+        with self._lock:
+            self._waiting[priority] += delta
+
+    def _throttle(self, wait: float) -> float:
+        """Record a wait of at most max_sleep and return its length."""
+        wait = min(wait, self.max_sleep)
+        with self._lock:
+            self.throttled_seconds += wait
+        return wait
+
+    def acquire(self, tokens: int, priority: Optional[int] = None):
+        """Block until one request of `tokens` estimated tokens fits the budget."""
+        priority = current_priority() if priority is None else priority
+        self._set_waiting(priority, 1)
+        try:
+            while (wait := self._try_acquire(tokens, priority)) > 0:
+                time.sleep(self._throttle(wait))
+        finally:
+            self._set_waiting(priority, -1)
+
+    async def aacquire(self, tokens: int, priority: Optional[int] = None):
+        """Async variant of acquire; waits without blocking the event loop."""
+        priority = current_priority() if priority is None else priority
+        self._set_waiting(priority, 1)
+        try:
+            while (wait := self._try_acquire(tokens, priority)) > 0:
+                await asyncio.sleep(self._throttle(wait))
+        finally:
+            self._set_waiting(priority, -1)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None, rate_limited: bool = True) -> float:
+        """
+        Return the delay before retry `attempt` (0-based), with full jitter.
+
+        A rate-limit error also pauses every caller for that delay.
+        """
+        delay = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)
+        if retry_after:
+            delay = max(delay, retry_after)
+        if rate_limited:
+            with self._lock:
+                self.rate_limit_errors += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def backoff_for(self, attempt: int, error: Exception) -> float:
+        """backoff() for an OpenAI error, honouring its Retry-After header."""
+        retry_after = None
+        try:
+            retry_after = float(error.response.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            pass
+        return self.backoff(attempt, retry_after, rate_limited=isinstance(error, RateLimitError))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rpm": int(self.requests.capacity) if self.requests else None,
+                "tpm": int(self.tokens.capacity) if self.tokens else None,
+                "granted": self.granted,
+                "granted_tokens": self.granted_tokens,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "rate_limit_errors": self.rate_limit_errors,
+                "waiting": dict(self._waiting),
+            }
+
+
+LIMITS = {
+    "chat": (LLM_RPM, LLM_TPM),
+    "embeddings": (EMBED_RPM, EMBED_TPM),
+}
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiter_lock = Lock()
+
+def get_rate_limiter(api: str = "chat") -> RateLimiter:
+    """Return the process-wide rate limiter for an API ("chat" or "embeddings")."""
+    with _limiter_lock:
+        limiter = _limiters.get(api)
+        if limiter is None:
+            limiter = RateLimiter(*LIMITS[api])
+            _limiters[api] = limiter
+        return limiter
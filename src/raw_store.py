@@ -0,0 +1,130 @@
+"""
+Local store of fetched pages for offline, reproducible re-indexing.
+
+Raw response bodies and extracted text are kept as zlib-compressed,
+content-addressed objects (sha256 of the uncompressed bytes), so identical
+pages are stored once. A SQLite index maps each URL to its latest raw and
+text objects plus the fetch time and HTTP validators. Large objects are read
+through mmap instead of being copied into memory before decompression.
+"""
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from .config import RAW_STORE_DIR
+
+MMAP_THRESHOLD = 1 << 20
+
+
+class RawStore:
+    def __init__(self, root: str = RAW_STORE_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, "index.sqlite3")
+        self._local = threading.local()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY,"
+                " raw_hash TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " content_type TEXT,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " fetched_at TEXT NOT NULL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection; parse workers forked from a process that had one open their own."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.index_path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        with conn:
+            yield conn
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.z")
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store data (if not already present) and return its sha256."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get_bytes(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as f:
+            if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return zlib.decompress(mapped)
+            return zlib.decompress(f.read())
+
+    def put_text(self, text: str) -> str:
+        return self.put_bytes(text.encode("utf-8"))
+
+    def get_text(self, digest: str) -> str:
+        return self.get_bytes(digest).decode("utf-8")
+
+    def save_page(
+        self,
+        url: str,
+        content: bytes,
+        text: str,
+        content_type: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> str:
+        """Store a fetched page and its extracted text; returns the text hash."""
+        raw_hash = self.put_bytes(content)
+        text_hash = self.put_text(text)
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages"
+                " (url, raw_hash, text_hash, content_type, etag, last_modified, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, raw_hash, text_hash, content_type, etag, last_modified, datetime.now().isoformat())
+            )
+        return text_hash
+
+    def get(self, url: str) -> Optional[Dict]:
+        row = self._conn().execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def pages(self, urls: Optional[List[str]] = None) -> Iterator[Dict]:
+        """Index rows for the given URLs (all pages when None), without loading any objects."""
+        conn = self._conn()
+        if urls is None:
+            yield from (dict(row) for row in conn.execute("SELECT * FROM pages ORDER BY url"))
+            return
+        for url in urls:
+            row = conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+            if row:
+                yield dict(row)
+
+
+_stores: Dict[str, RawStore] = {}
+
+def get_raw_store(root: str = RAW_STORE_DIR) -> RawStore:
+    """Return this process's RawStore for root (parse workers each open their own)."""
+    store = _stores.get(root)
+    if store is None:
+        store = _stores[root] = RawStore(root)
+    return store
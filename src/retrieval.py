@@ -0,0 +1,80 @@
+"""
+Metadata-filtered search over the legal corpus.
+
+Chunks carry doc_type, section and jurisdiction tags from ingestion (see
+classifier), so a query only searches the chunks it can use instead of the
+whole collection. Filters are tried from most to least specific, topping up
+until k chunks are found. With RETRIEVAL_SEARCH_TYPE=mmr, results are picked
+by maximal marginal relevance, so near-duplicate chunks from similar
+policies don't crowd out the rest of the context.
+"""
+from typing import Dict, List, Optional, Sequence
+from langchain_core.documents import Document
+from .classifier import JURISDICTION_HINTS, jurisdiction_key
+from .config import (
+    RETRIEVAL_FETCH_K, RETRIEVAL_MMR_LAMBDA, RETRIEVAL_SEARCH_TYPE, SECTION_K, SECTION_K_OVERRIDES
+)
+
+def section_query(doc_type: str, section_name: str) -> str:
+    return f"{doc_type} {section_name} section"
+
+def section_k(doc_type: str, section_name: str) -> int:
+    """Chunks to retrieve for a section: SECTION_K unless overridden as "doc_type:section"."""
+    return SECTION_K_OVERRIDES.get(f"{doc_type.lower()}:{section_name}", SECTION_K)
+
+def search_params() -> Dict:
+    """Settings that change search results, recorded alongside cached results."""
+    return {"search_type": RETRIEVAL_SEARCH_TYPE, "fetch_k": RETRIEVAL_FETCH_K, "lambda_mult": RETRIEVAL_MMR_LAMBDA}
+
+def metadata_filter(
+    doc_type: str,
+    section_name: Optional[str] = None,
+    jurisdictions: Optional[Sequence[str]] = None
+) -> Dict:
+    """
+    Chroma `where` clause for chunks of doc_type, optionally of one section
+    and mentioning any of the given jurisdiction codes.
+    """
+    clauses = [{"doc_type": doc_type.lower()}]
+    if section_name:
+        clauses.append({"section": section_name})
+    flags = [{jurisdiction_key(code): True} for code in jurisdictions or [] if code in JURISDICTION_HINTS]
+    if flags:
+        clauses.append(flags[0] if len(flags) == 1 else {"$or": flags})
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def search(vs, query: str, k: int, where: Optional[Dict] = None) -> List[Document]:
+    """Top-k chunks for query among those matching where, by similarity or MMR."""
+    if RETRIEVAL_SEARCH_TYPE == "mmr":
+        return vs.max_marginal_relevance_search(
+            query, k=k, fetch_k=max(RETRIEVAL_FETCH_K, k), lambda_mult=RETRIEVAL_MMR_LAMBDA, filter=where
+        )
+    return vs.similarity_search(query, k=k, filter=where)
+
+def search_filtered(vs, query: str, k: int, filters: Sequence[Optional[Dict]]) -> List[Document]:
+    """Search with each filter in turn, most specific first, until k distinct chunks are found."""
+    docs, seen = [], set()
+    for where in filters:
+        for doc in search(vs, query, k, where):
+            if doc.page_content not in seen:
+                seen.add(doc.page_content)
+                docs.append(doc)
+        if len(docs) >= k:
+            break
+    return docs[:k]
+
+def search_section(
+    vs,
+    doc_type: str,
+    section_name: str,
+    k: Optional[int] = None,
+    jurisdictions: Optional[Sequence[str]] = None
+) -> List[Document]:
+    """
+    Chunks for a section, preferring those tagged with it (and, when given,
+    with one of the jurisdictions), topped up from the rest of the doc_type.
+    """
+    k = k or section_k(doc_type, section_name)
+    filters = [metadata_filter(doc_type, section_name, jurisdictions)] if jurisdictions else []
+    filters += [metadata_filter(doc_type, section_name), metadata_filter(doc_type)]
+    return search_filtered(vs, section_query(doc_type, section_name), k, filters)
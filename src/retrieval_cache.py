@@ -0,0 +1,106 @@
+"""
+Precomputed retrieval context for section queries.
+
+Section retriever queries are fixed strings, so their top-k results only
+change when the index does. The cache is built once after ingestion, stored
+on disk next to the vector store and served from memory at request time.
+It is tagged with a fingerprint of the index contents, so a re-ingest
+invalidates it automatically, as does a change to the search settings or a
+section's k.
+"""
+import hashlib
+import json
+import os
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from langchain_core.documents import Document
+from .config import RETRIEVAL_CACHE_PATH
+from .retrieval import search_params, search_section, section_k
+from .vectordb import get_vectorstore
+
+_lock = Lock()
+_entries: Optional[Dict[str, Tuple[int, List[Document]]]] = None
+_fingerprint: Optional[str] = None
+
+def _entry_key(doc_type: str, section_name: str) -> str:
+    return f"{doc_type}:{section_name}"
+
+def index_fingerprint() -> str:
+    """Hash of the chunk IDs currently stored in the index."""
+    global _fingerprint
+    if _fingerprint is None:
+        ids = get_vectorstore().ids()
+        digest = hashlib.sha256()
+        for chunk_id in sorted(ids):
+            digest.update(chunk_id.encode("utf-8"))
+        _fingerprint = f"{len(ids)}:{digest.hexdigest()}"
+    return _fingerprint
+
+def _load():
+    global _entries
+    _entries = {}
+    if not os.path.exists(RETRIEVAL_CACHE_PATH):
+        return
+    try:
+        with open(RETRIEVAL_CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if data.get("version") != index_fingerprint() or data.get("search") != search_params():
+        return
+    _entries = {
+        key: (entry["k"], [Document(page_content=d["page_content"], metadata=d.get("metadata", {})) for d in entry["docs"]])
+        for key, entry in data.get("entries", {}).items()
+    }
+
+def get_cached_context(doc_type: str, section_name: str, k: int) -> Optional[List[Document]]:
+    """Return the precomputed top-k chunks for a section, or None on a miss."""
+    with _lock:
+        if _entries is None:
+            _load()
+        entry = _entries.get(_entry_key(doc_type, section_name))
+    if entry is None or entry[0] != k:
+        return None
+    return entry[1]
+
+def build_retrieval_cache() -> int:
+    """
+    Precompute context for every (doc_type, section) pair, at each section's k, and persist it.
+    
+    Returns:
+        Number of section queries cached
+    """
+    global _entries
+    from .generator import TOS_SECTIONS, PRIVACY_SECTIONS
+
+    vs = get_vectorstore()
+    reset_retrieval_cache()
+    entries = {}
+    for doc_type, sections in (("ToS", TOS_SECTIONS), ("Privacy", PRIVACY_SECTIONS)):
+        for section_name in sections:
+            k = section_k(doc_type, section_name)
+            entries[_entry_key(doc_type, section_name)] = (k, search_section(vs, doc_type, section_name, k))
+
+    data = {
+        "version": index_fingerprint(),
+        "search": search_params(),
+        "entries": {
+            key: {"k": k, "docs": [{"page_content": d.page_content, "metadata": d.metadata} for d in docs]}
+            for key, (k, docs) in entries.items()
+        }
+    }
+    os.makedirs(os.path.dirname(RETRIEVAL_CACHE_PATH) or ".", exist_ok=True)
+    tmp_path = f"{RETRIEVAL_CACHE_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, RETRIEVAL_CACHE_PATH)
+
+    with _lock:
+        _entries = entries
+    return len(entries)
+
+def reset_retrieval_cache():
+    """Forget the in-memory cache and index fingerprint."""
+    global _entries, _fingerprint
+    with _lock:
+        _entries, _fingerprint = None, None
@@ -0,0 +1,209 @@
+"""
+Content-addressed cache for generated section text.
+
+Sections are keyed by a hash of the fully rendered prompt plus the model
+parameters, so a profile edit only misses for sections whose prompt changed.
+Backends are pluggable (in-memory LRU or on-disk SQLite) and both apply TTL
+and size-based eviction.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterator, Optional
+from .config import (
+    SECTION_CACHE_BACKEND,
+    SECTION_CACHE_PATH,
+    SECTION_CACHE_TTL,
+    SECTION_CACHE_MAX_ENTRIES,
+)
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 5000, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            created_at, value = item
+            if self.ttl and time.time() - created_at > self.ttl:
+                del self._items[key]
+                self.evictions += 1
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._items[key] = (time.time(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class SQLiteBackend:
+    """
+    On-disk cache shared by every process pointing at the same file.
+
+    Each thread keeps one open connection, reused across calls.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000, ttl: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = Lock()
+        self._local = threading.local()
+        self.evictions = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS section_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_section_cache_accessed"
+                " ON section_cache(accessed_at)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        with conn:
+            yield conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM section_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                conn.execute("DELETE FROM section_cache WHERE key = ?", (key,))
+                self.evictions += 1
+                return None
+            conn.execute("UPDATE section_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO section_cache (key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if self.ttl:
+                cur = conn.execute("DELETE FROM section_cache WHERE created_at < ?", (now - self.ttl,))
+                self.evictions += cur.rowcount
+            cur = conn.execute(
+                "DELETE FROM section_cache WHERE key IN ("
+                " SELECT key FROM section_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.evictions += cur.rowcount
+
+    def clear(self):
+        with self._lock, self._transaction() as conn:
+            conn.execute("DELETE FROM section_cache")
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM section_cache").fetchone()[0]
+
+
+class SectionCache:
+    """Hit/miss accounting on top of a storage backend."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def make_key(prompt_text: str, model_params: Dict[str, Any]) -> str:
+        payload = json.dumps(model_params, sort_keys=True) + "\n" + prompt_text
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        self.backend.set(key, value)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.backend.evictions,
+        }
+
+
+_cache: Optional[SectionCache] = None
+_cache_lock = Lock()
+
+def get_section_cache() -> Optional[SectionCache]:
+    """Return the process-wide section cache, or None when disabled."""
+    global _cache
+    if SECTION_CACHE_BACKEND == "none":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            ttl = SECTION_CACHE_TTL or None
+            if SECTION_CACHE_BACKEND == "sqlite":
+                backend = SQLiteBackend(SECTION_CACHE_PATH, SECTION_CACHE_MAX_ENTRIES, ttl)
+            elif SECTION_CACHE_BACKEND == "memory":
+                backend = MemoryBackend(SECTION_CACHE_MAX_ENTRIES, ttl)
+            else:
+                raise ValueError(f"Unknown SECTION_CACHE_BACKEND: {SECTION_CACHE_BACKEND}")
+            _cache = SectionCache(backend)
+        return _cache
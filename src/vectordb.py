@@ -1,19 +1,81 @@
 """
 Vector database configuration and access.
 
-Provides ChromaDB instance with OpenAI embeddings.
+Provides a process-wide vector store with batched, cached OpenAI embeddings,
+shared by every retriever so the index and HTTP clients are opened only
+once. VECTOR_BACKEND selects the implementation:
+
+- "chroma": ChromaDB persisted under CHROMA_DIR
+- "numpy": in-process, memory-mapped flat index under NUMPY_INDEX_DIR
+
+Both are LangChain vector stores supporting `where` filters, MMR and
+upserts by id, and additionally expose ids() and stats().
 """
+import os
+from threading import Lock
+from typing import Any, Dict, List
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
-from .config import OPENAI_EMBED_MODEL, CHROMA_DIR
+from .config import OPENAI_EMBED_MODEL, CHROMA_DIR, EMBED_BATCH_SIZE, EMBED_CACHE_PATH, NUMPY_INDEX_DIR, VECTOR_BACKEND
+from .embeddings import CachedEmbeddings, EmbeddingCache
+from .numpy_store import NumpyVectorStore
+
+_lock = Lock()
+_embeddings = None
+_vectorstore = None
+
+
+class ChromaStore(Chroma):
+    def ids(self) -> List[str]:
+        return self.get(include=[])["ids"]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "chroma", "path": CHROMA_DIR, "count": self._collection.count()}
+
+
+def _open_chroma(embeddings):
+    return ChromaStore(collection_name="legal_corpus", embedding_function=embeddings, persist_directory=CHROMA_DIR)
+
+def _open_numpy(embeddings):
+    return NumpyVectorStore(embeddings, NUMPY_INDEX_DIR)
+
+BACKENDS = {
+    "chroma": (_open_chroma, lambda: os.path.exists(os.path.join(CHROMA_DIR, "chroma.sqlite3"))),
+    "numpy": (_open_numpy, lambda: NumpyVectorStore.exists(NUMPY_INDEX_DIR)),
+}
 
 def get_embeddings():
-    return OpenAIEmbeddings(model=OPENAI_EMBED_MODEL)
+    global _embeddings
+    with _lock:
+        if _embeddings is None:
+            _embeddings = CachedEmbeddings(
+                OpenAIEmbeddings(model=OPENAI_EMBED_MODEL, chunk_size=EMBED_BATCH_SIZE, max_retries=0),
+                EmbeddingCache(EMBED_CACHE_PATH)
+            )
+        return _embeddings
 
 def get_vectorstore():
-    return Chroma(
-        collection_name="legal_corpus",
-        embedding_function=get_embeddings(),
-        persist_directory=CHROMA_DIR
-    )
+    global _vectorstore
+    embeddings = get_embeddings()
+    with _lock:
+        if _vectorstore is None:
+            if VECTOR_BACKEND not in BACKENDS:
+                raise ValueError(f"Unknown VECTOR_BACKEND {VECTOR_BACKEND!r}; expected one of {sorted(BACKENDS)}")
+            _vectorstore = BACKENDS[VECTOR_BACKEND][0](embeddings)
+        return _vectorstore
+
+def vectorstore_exists() -> bool:
+    """Whether the configured backend has an index on disk, without opening it."""
+    return BACKENDS[VECTOR_BACKEND][1]()
+
+def vectorstore_stats() -> Dict[str, Any]:
+    """Backend, existence and chunk count of the configured index."""
+    if not vectorstore_exists():
+        return {"backend": VECTOR_BACKEND, "exists": False, "count": None}
+    return {**get_vectorstore().stats(), "exists": True}
 
+def reset_vectorstore():
+    """Drop the shared vectorstore so the next access reopens the index."""
+    global _vectorstore
+    with _lock:
+        _vectorstore = None
@@ -1,6 +1,8 @@
 import os
-from src.config import CSV_PATH
+from src.config import CSV_PATH, RETRIEVAL_CACHE_PATH
+from src.retrieval_cache import build_retrieval_cache
 from src.ingestion import ingest_from_csv
+from src.vectordb import vectorstore_exists
 from src.generator import generate_docs
 from src.evals import checklist_tos, checklist_privacy
 
@@ -10,18 +12,20 @@ def ensure_dirs():
 
 def ensure_index():
     from pathlib import Path
-    chroma_db = Path("storage/vectorstore/chroma.sqlite3")
     
-    if chroma_db.exists():
+    if vectorstore_exists() and not os.getenv("REINDEX"):
         print("✓ Vector store already exists. Skipping ingestion.")
-        print("  (Delete storage/vectorstore to force re-indexing)")
+        print("  (Set REINDEX=1 to re-ingest changed pages, or delete the index directory to rebuild)")
+        if not Path(RETRIEVAL_CACHE_PATH).exists():
+            print("Precomputing section retrieval cache...")
+            build_retrieval_cache()
         return
     
     print("="*60)
     print("STEP 1: Indexing documents from CSV...")
     print("="*60)
     n = ingest_from_csv(CSV_PATH)
-    print(f"✓ Ingestion complete: {n} chunks stored")
+    print(f"✓ Ingestion complete: {n} new chunks stored")
 
 def main():
     print("\n" + "="*60)
@@ -0,0 +1,97 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from src import batch_generator
+
+
+class FakeGeneration:
+    def __init__(self):
+        self.calls = []
+
+    def cache_key(self, prompt_value):
+        return prompt_value
+
+    def invoke(self, prompt_value):
+        self.calls.append(prompt_value)
+        return f"body of {prompt_value}"
+
+
+class FakePrompt:
+    def __init__(self, section):
+        self.section = section
+
+    def invoke(self, inputs):
+        return f"{self.section} for {inputs['company']}"
+
+
+@pytest.fixture
+def generation(monkeypatch):
+    generation = FakeGeneration()
+    monkeypatch.setattr(batch_generator, "get_generation", lambda: generation)
+    monkeypatch.setattr(batch_generator, "get_section_prompt", lambda section, doc_type: FakePrompt(section))
+    monkeypatch.setattr(batch_generator, "section_context", lambda section, doc_type: "context")
+    monkeypatch.setattr(batch_generator, "get_conditional_sections", lambda profile, doc: ["acceptance", "termination"])
+    monkeypatch.setattr(
+        batch_generator, "profile_section_inputs",
+        lambda profile, doc, tone: lambda section: {"company": profile.company}
+    )
+    return generation
+
+
+def make_profile(profile_id: str, company: str):
+    return SimpleNamespace(
+        profile_id=profile_id,
+        profile_name=profile_id,
+        company=company,
+        organization=SimpleNamespace(effective_date=date(2024, 1, 1))
+    )
+
+
+def test_generate_batch_dedupes_prompts_across_profiles(generation):
+    finished = {}
+    profiles = [make_profile("a", "Acme"), make_profile("b", "Acme"), make_profile("c", "Other")]
+
+    summary = batch_generator.generate_batch(profiles, ["tos"], on_profile=finished.__setitem__)
+
+    assert summary == {
+        "profiles": {"a": "succeeded", "b": "succeeded", "c": "succeeded"},
+        "total_sections": 6,
+        "unique_sections": 4
+    }
+    assert len(generation.calls) == 4
+    assert finished["a"]["sections"]["tos"] == finished["b"]["sections"]["tos"]
+    assert "Terms of Service" in finished["c"]["tos_md"]
+
+
+def test_generate_batch_runs_repeated_profile_ids_once(generation, capsys):
+    finished = []
+    profile = make_profile("a", "Acme")
+
+    summary = batch_generator.generate_batch(
+        [profile, profile, make_profile("b", "Other")], ["tos"],
+        on_profile=lambda profile_id, result: finished.append(profile_id)
+    )
+
+    assert sorted(finished) == ["a", "b"]
+    assert summary["profiles"] == {"a": "succeeded", "b": "succeeded"}
+    assert summary["total_sections"] == 4
+    assert capsys.readouterr().out == ""
+
+
+def test_generate_batch_reports_failed_sections(generation, monkeypatch):
+    def invoke(prompt_value):
+        if prompt_value.startswith("termination for Broken"):
+            raise RuntimeError("boom")
+        return "body"
+
+    monkeypatch.setattr(generation, "invoke", invoke)
+    results = {}
+
+    summary = batch_generator.generate_batch(
+        [make_profile("a", "Acme"), make_profile("b", "Broken")], ["tos"], on_profile=results.__setitem__
+    )
+
+    assert summary["profiles"] == {"a": "succeeded", "b": "failed"}
+    assert "boom" in results["b"]["error"]
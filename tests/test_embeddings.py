@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from src import embeddings
+from src.embeddings import CachedEmbeddings, EmbeddingCache, text_hash
+
+
+class FakeEmbeddings:
+    model = "fake-embed"
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        if self.fail_on in texts:
+            raise ValueError("batch rejected")
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return [float(len(text)), 0.0]
+
+
+@pytest.fixture(autouse=True)
+def offline_tokens(monkeypatch):
+    monkeypatch.setattr(embeddings, "estimate_tokens", lambda text, model: len(text))
+
+
+def test_completed_batches_are_cached_when_a_later_batch_fails(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.db"))
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+    fake = FakeEmbeddings(fail_on="eeeee")
+    cached = CachedEmbeddings(fake, cache, batch_size=2, concurrency=1)
+
+    with pytest.raises(ValueError):
+        cached.embed_documents(texts)
+    stored = cache.get_many(fake.model, [text_hash(text) for text in texts])
+    assert set(stored) == {text_hash(text) for text in texts[:4]}
+
+    fake.fail_on = None
+    fake.calls.clear()
+    assert cached.embed_documents(texts)[4] == [5.0, 1.0]
+    assert fake.calls == [["eeeee"]]
+
+
+def test_counters_are_consistent_under_concurrent_calls(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.db"))
+    cached = CachedEmbeddings(FakeEmbeddings(), cache)
+    cached.embed_documents(["warm"])
+
+    def worker():
+        for _ in range(200):
+            cached.embed_query("warm")
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cached.stats()
+    assert stats["hits"] == 800
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
@@ -0,0 +1,185 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import fetcher
+from src.fetcher import fetch_all, _retry_delay
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Local HTTP stand-in; behaviour is chosen by the first path segment."""
+
+    hits: Counter
+    in_flight: Counter
+    peak: Counter
+    lock: threading.Lock
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        kind = self.path.strip("/").split("/")[0]
+        host = self.headers["Host"]
+        with self.lock:
+            self.hits[self.path] += 1
+            attempt = self.hits[self.path]
+            self.in_flight[host] += 1
+            self.in_flight["all"] += 1
+            for key in (host, "all"):
+                self.peak[key] = max(self.peak[key], self.in_flight[key])
+        try:
+            if kind == "page":
+                if self.headers.get("If-None-Match") == '"v1"' or self.headers.get("If-Modified-Since") == "Mon, 01 Jan 2024 00:00:00 GMT":
+                    self._send(304)
+                else:
+                    self._send(200, b"<html>terms</html>", {
+                        "Content-Type": "text/html; charset=utf-8",
+                        "ETag": '"v1"',
+                        "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"
+                    })
+            elif kind == "flaky":
+                status = {1: 503, 2: 429}.get(attempt, 200)
+                self._send(status, b"ok" if status == 200 else b"", {"Retry-After": "0"})
+            elif kind == "down":
+                self._send(500)
+            elif kind == "missing":
+                self._send(404)
+            elif kind == "slow":
+                time.sleep(1.0)
+                self._send(200, b"late")
+            elif kind == "busy":
+                time.sleep(0.05)
+                self._send(200, b"busy")
+        finally:
+            with self.lock:
+                self.in_flight[host] -= 1
+                self.in_flight["all"] -= 1
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(fetcher, "_retry_delay", lambda attempt, response=None: 0)
+    handler = type("Handler", (StandIn,), {
+        "hits": Counter(), "in_flight": Counter(), "peak": Counter(), "lock": threading.Lock()
+    })
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    port = httpd.server_address[1]
+    handler.urls = (f"http://127.0.0.1:{port}", f"http://localhost:{port}")
+    yield handler
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetch(urls, **kwargs):
+    async def run():
+        return [result async for result in fetch_all(urls, **kwargs)]
+    return {result.url: result for result in asyncio.run(run())}
+
+
+def test_fetch_returns_content_and_validators(server):
+    url = f"{server.urls[0]}/page"
+
+    result = fetch([url, url])[url]
+
+    assert result.ok
+    assert result.content == b"<html>terms</html>"
+    assert result.content_type == "text/html"
+    assert result.validators() == {"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert server.hits["/page"] == 1
+
+
+@pytest.mark.parametrize("validators", [
+    {"etag": '"v1"'},
+    {"last_modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+])
+def test_conditional_get_reports_unchanged_pages(server, validators):
+    url = f"{server.urls[0]}/page"
+
+    result = fetch([url], validators={url: validators})[url]
+
+    assert result.not_modified
+    assert not result.ok
+    assert result.content == b""
+    assert result.validators() == validators
+
+
+def test_retries_429_and_5xx_until_success(server):
+    url = f"{server.urls[0]}/flaky"
+
+    result = fetch([url], retries=3)[url]
+
+    assert result.ok
+    assert result.content == b"ok"
+    assert server.hits["/flaky"] == 3
+
+
+def test_gives_up_after_the_retry_budget(server):
+    down, missing = f"{server.urls[0]}/down", f"{server.urls[0]}/missing"
+
+    results = fetch([down, missing], retries=2)
+
+    assert results[down].error == "HTTP 500"
+    assert server.hits["/down"] == 3
+    assert results[missing].error == "HTTP 404"
+    assert server.hits["/missing"] == 1
+
+
+def test_timeouts_become_failed_results(server):
+    url = f"{server.urls[0]}/slow"
+
+    result = fetch([url], timeout=0.2, retries=1)[url]
+
+    assert not result.ok
+    assert result.status == 0
+    assert result.error.startswith("ReadTimeout")
+    assert server.hits["/slow"] == 2
+
+
+def test_respects_global_and_per_host_concurrency(server):
+    urls = [f"{base}/busy/{i}" for base in server.urls for i in range(12)]
+
+    results = fetch(urls, concurrency=3, per_host=2)
+
+    assert all(result.ok for result in results.values())
+    assert len(results) == 24
+    assert 1 < server.peak["all"] <= 3
+    assert all(server.peak[url.split("//")[1]] <= 2 for url in server.urls)
+
+
+def test_busy_host_does_not_hold_workers_from_other_hosts(server):
+    busy = [f"{server.urls[0]}/busy/{i}" for i in range(8)]
+    other = [f"{server.urls[1]}/page/{i}" for i in range(3)]
+
+    async def run():
+        return [result.url async for result in fetch_all(busy + other, concurrency=4, per_host=1)]
+
+    order = asyncio.run(run())
+
+    assert set(other) <= set(order[:4])
+    assert server.peak[server.urls[0].split("//")[1]] == 1
+
+
+def test_retry_delay_honours_retry_after(monkeypatch):
+    class Response:
+        headers = {"retry-after": "7"}
+
+    assert _retry_delay(0, Response()) == 7.0
+    assert 0 <= _retry_delay(3) <= 4.0
+
+    monkeypatch.setattr(fetcher, "FETCH_MAX_RETRY_AFTER", 5.0)
+    Response.headers = {"retry-after": "86400"}
+    assert _retry_delay(0, Response()) == 5.0
@@ -0,0 +1,35 @@
+import threading
+import time
+
+import pytest
+
+from src import generator
+
+
+class SlowAbort(threading.Event):
+    """Lets siblings see the abort well before the failing section's future completes."""
+
+    def set(self):
+        super().set()
+        time.sleep(0.2)
+
+
+def test_section_failure_wins_over_cancelled_siblings(monkeypatch):
+    invoked = []
+
+    class Chain:
+        def __init__(self, section):
+            self.section = section
+
+        def invoke(self, inputs):
+            invoked.append(self.section)
+            if self.section == "bad":
+                raise ValueError("section failed")
+            time.sleep(0.05)
+            return self.section
+
+    monkeypatch.setattr(generator, "Event", SlowAbort)
+    monkeypatch.setattr(generator, "get_section_chain", lambda section, doc_type: Chain(section))
+    with pytest.raises(ValueError, match="section failed"):
+        generator.generate_sections(["a", "bad", "c", "d"], "ToS", {}, max_concurrency=2)
+    assert sorted(invoked) == ["a", "bad"]
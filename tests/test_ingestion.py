@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from src import ingestion
+from src.ingestion import PageUpdate
+
+
+URLS = [f"https://example.com/{i}" for i in range(8)]
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Run the pipeline offline, in-process, with a one-slot queue and one-page batches."""
+    def diff_stored(url, previous, chunk_size, chunk_overlap):
+        return PageUpdate(url, {"chunk_ids": [f"{url}#0"]}, ids=[f"{url}#0"])
+
+    monkeypatch.setattr(ingestion, "get_vectorstore", lambda: object())
+    monkeypatch.setattr(ingestion, "_diff_stored", diff_stored)
+    monkeypatch.setattr(ingestion, "INGEST_QUEUE_SIZE", 1)
+    monkeypatch.setattr(ingestion, "INGEST_UPSERT_BATCH", 1)
+
+    def run(sources):
+        return asyncio.run(asyncio.wait_for(
+            ingestion._run_pipeline(URLS, sources, 1, (100, 10), offline=True), timeout=5
+        ))
+    return run
+
+
+def test_pipeline_delivers_every_page_through_a_full_queue(pipeline, monkeypatch):
+    def apply(vs, updates, sources):
+        time.sleep(0.01)
+        for update in updates:
+            sources[update.url] = update.entry
+
+    monkeypatch.setattr(ingestion, "_apply", apply)
+    sources = {}
+    assert pipeline(sources) == {"added": len(URLS), "deleted": 0}
+    assert set(sources) == set(URLS)
+
+
+def test_upsert_failure_with_full_queue_surfaces_instead_of_hanging(pipeline, monkeypatch):
+    applied = []
+
+    def apply(vs, updates, sources):
+        time.sleep(0.1)
+        if applied:
+            raise RuntimeError("vector store unavailable")
+        applied.extend(updates)
+        for update in updates:
+            sources[update.url] = update.entry
+
+    monkeypatch.setattr(ingestion, "_apply", apply)
+    sources = {}
+    with pytest.raises(RuntimeError, match="vector store unavailable"):
+        pipeline(sources)
+    assert list(sources) == [applied[0].url]
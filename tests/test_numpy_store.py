@@ -0,0 +1,106 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src import numpy_store
+from src.numpy_store import NumpyVectorStore
+
+DIM = 16
+
+
+class FakeEmbeddings:
+    """Maps "doc-N" to the N-th unit vector and every other text to the last axis."""
+
+    def _vector(self, text):
+        vector = [0.0] * DIM
+        vector[int(text.split("-")[1]) if text.startswith("doc-") else DIM - 1] = 1.0
+        return vector
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NumpyVectorStore(FakeEmbeddings(), str(tmp_path / "index"))
+
+
+def test_search_filters_and_mmr(store):
+    store.add_texts(
+        [f"doc-{i}" for i in range(4)],
+        metadatas=[{"doc_type": "tos" if i % 2 else "privacy"} for i in range(4)],
+        ids=[f"id-{i}" for i in range(4)]
+    )
+
+    doc, score = store.similarity_search_with_score("doc-2", k=1)[0]
+    assert (doc.id, doc.page_content, score) == ("id-2", "doc-2", pytest.approx(1.0))
+    assert {d.id for d in store.similarity_search("doc-2", k=4, filter={"doc_type": "tos"})} == {"id-1", "id-3"}
+    assert store.similarity_search("doc-2", k=4, filter={"doc_type": {"$in": ["privacy"]}})[0].id == "id-2"
+    assert store.max_marginal_relevance_search("doc-3", k=2, fetch_k=4)[0].id == "id-3"
+    assert [d.id for d in store.get_by_ids(["id-1", "missing"])] == ["id-1"]
+
+
+def test_upsert_delete_and_compaction(store, monkeypatch):
+    monkeypatch.setattr(numpy_store, "COMPACT_MIN_DEAD", 1)
+    store.add_texts(["filler-a", "filler-b", "doc-1"], ids=["a", "b", "one"])
+    store.add_texts(["doc-2"], ids=["one"])
+    store.delete(["a", "b"])
+
+    assert store.stats()["count"] == 1
+    assert store.stats()["dead_rows"] == 0
+    assert store.similarity_search("doc-2", k=1)[0].id == "one"
+    reopened = NumpyVectorStore(FakeEmbeddings(), store.path)
+    assert reopened.ids() == ["one"]
+    assert reopened.similarity_search("doc-2", k=1)[0].page_content == "doc-2"
+
+
+def test_repeated_upserts_compact_without_deletes(store, monkeypatch):
+    monkeypatch.setattr(numpy_store, "COMPACT_MIN_DEAD", 2)
+    for i in range(3):
+        store.add_texts([f"doc-{i}"], ids=["one"])
+
+    assert store.stats()["count"] == 1
+    assert store.stats()["dead_rows"] == 0
+    assert store.similarity_search("doc-2", k=1)[0].page_content == "doc-2"
+
+
+def test_search_results_stay_consistent_while_compacting(store, monkeypatch):
+    monkeypatch.setattr(numpy_store, "COMPACT_MIN_DEAD", 1)
+    targets = [f"doc-{i}" for i in range(8)]
+    store.add_texts(targets, ids=targets)
+    stop = threading.Event()
+    errors = []
+
+    def churn():
+        # Each round adds dead rows ahead of the targets and compacts them away,
+        # renumbering every row.
+        round_ = 0
+        while not stop.is_set():
+            fillers = [f"filler-{round_}-{i}" for i in range(20)]
+            store.add_texts(fillers, ids=fillers)
+            store.add_texts(targets, ids=targets)
+            store.delete(fillers)
+            round_ += 1
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for n in range(2000):
+            target = targets[n % len(targets)]
+            query = np.asarray(FakeEmbeddings().embed_query(target))
+            try:
+                docs = store.similarity_search_by_vector(query.tolist(), k=1)
+                mmr = store.max_marginal_relevance_search(target, k=1, fetch_k=2)
+            except IndexError as e:
+                errors.append(e)
+                continue
+            if docs[0].page_content != target or mmr[0].page_content != target:
+                errors.append((target, docs[0].page_content, mmr[0].page_content))
+    finally:
+        stop.set()
+        writer.join()
+    assert errors == []
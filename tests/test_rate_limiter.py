@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from src import rate_limiter
+from src.rate_limiter import BATCH, INTERACTIVE, RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock advanced only by sleeps, shared by every thread."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+        self._lock = threading.Lock()
+
+    def monotonic(self):
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.slept.append(seconds)
+            self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_acquire_waits_for_the_token_budget(clock):
+    limiter = RateLimiter(tpm=600)
+
+    limiter.acquire(600)
+    limiter.acquire(60)
+
+    # 60 tokens refill in 6 seconds at 10 tokens per second.
+    assert sum(clock.slept) == pytest.approx(6.0)
+    assert limiter.stats()["granted_tokens"] == 660
+
+
+def test_throttled_seconds_counts_every_wait_across_threads(clock):
+    limiter = RateLimiter(rpm=60)
+    threads = [threading.Thread(target=limiter.acquire, args=(1,)) for _ in range(200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = limiter.stats()
+    assert stats["granted"] == 200
+    assert stats["throttled_seconds"] == pytest.approx(round(sum(clock.slept), 3))
+
+
+def test_batch_callers_yield_to_waiting_interactive_callers(clock):
+    limiter = RateLimiter(rpm=60)
+    limiter._set_waiting(INTERACTIVE, 1)
+
+    assert limiter._try_acquire(1, BATCH) == limiter.max_sleep
+    assert limiter._try_acquire(1, INTERACTIVE) == 0.0
+
+
+def test_rate_limit_backoff_pauses_every_caller(clock):
+    limiter = RateLimiter()
+
+    delay = limiter.backoff(0, retry_after=5)
+
+    assert delay >= 5
+    assert limiter._try_acquire(1, INTERACTIVE) == pytest.approx(delay)
+    assert limiter.stats()["rate_limit_errors"] == 1
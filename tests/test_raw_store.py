@@ -0,0 +1,54 @@
+import sqlite3
+import threading
+
+from src import raw_store
+from src.raw_store import RawStore
+
+
+def test_pages_round_trip_and_share_identical_objects(tmp_path):
+    store = RawStore(str(tmp_path / "raw"))
+    text_hash = store.save_page("https://a.example/tos", b"<p>Terms</p>", "Terms", "text/html", '"v1"')
+    assert store.save_page("https://b.example/tos", b"<p>Terms</p>", "Terms") == text_hash
+
+    page = store.get("https://a.example/tos")
+    assert (page["content_type"], page["etag"], page["last_modified"]) == ("text/html", '"v1"', None)
+    assert store.get_bytes(page["raw_hash"]) == b"<p>Terms</p>"
+    assert store.get_text(text_hash) == "Terms"
+    assert len(list((tmp_path / "raw" / "objects").rglob("*.z"))) == 2
+    assert store.get("https://missing.example") is None
+
+    assert [p["url"] for p in store.pages()] == ["https://a.example/tos", "https://b.example/tos"]
+    assert [p["url"] for p in store.pages(["https://b.example/tos", "https://missing.example"])] == [
+        "https://b.example/tos"
+    ]
+    assert RawStore(str(tmp_path / "raw")).get("https://b.example/tos")["text_hash"] == text_hash
+
+
+def test_large_objects_are_read_through_mmap(tmp_path, monkeypatch):
+    monkeypatch.setattr(raw_store, "MMAP_THRESHOLD", 16)
+    store = RawStore(str(tmp_path / "raw"))
+    data = bytes(range(256)) * 64
+    assert store.get_bytes(store.put_bytes(data)) == data
+
+
+def test_index_reuses_one_connection_per_thread(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def counting_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(raw_store.sqlite3, "connect", counting_connect)
+    store = RawStore(str(tmp_path / "raw"))
+    for i in range(20):
+        store.save_page(f"https://example.com/{i}", b"body", "text")
+        store.get(f"https://example.com/{i}")
+    assert len(list(store.pages())) == 20
+    assert len(opened) == 1
+
+    thread = threading.Thread(target=lambda: store.get("https://example.com/0"))
+    thread.start()
+    thread.join()
+    assert len(opened) == 2
@@ -0,0 +1,44 @@
+import sqlite3
+import threading
+
+from src import section_cache
+from src.section_cache import SQLiteBackend
+
+
+def test_sqlite_backend_reuses_one_connection_per_thread(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def counting_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(section_cache.sqlite3, "connect", counting_connect)
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), max_entries=10)
+
+    for i in range(50):
+        backend.set(f"k{i}", f"v{i}")
+        backend.get(f"k{i}")
+    assert len(backend) == 10
+    assert len(opened) == 1
+
+    thread = threading.Thread(target=lambda: backend.get("k49"))
+    thread.start()
+    thread.join()
+    assert len(opened) == 2
+
+
+def test_sqlite_backend_commits_between_connections(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteBackend(path).set("key", "value")
+    assert SQLiteBackend(path).get("key") == "value"
+
+
+def test_sqlite_backend_expires_entries(tmp_path, monkeypatch):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), ttl=10)
+    monkeypatch.setattr(section_cache.time, "time", lambda: 1000.0)
+    backend.set("key", "value")
+    monkeypatch.setattr(section_cache.time, "time", lambda: 1011.0)
+    assert backend.get("key") is None
+    assert backend.evictions == 1